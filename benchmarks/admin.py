@@ -0,0 +1,130 @@
+"""Время страниц списка заметок в админке на большой таблице.
+
+Заметки создаются одним INSERT ... SELECT без триггеров
+полнотекстового индекса, индекс строится после вставки. Режимы:
+``default`` - ModelAdmin без настроек, ``tuned`` - NoteAdmin проекта.
+Для первой и дальней страницы, поиска и фильтра по автору выводятся
+время ответа, число SQL-запросов и укладывается ли p95 в --budget-ms.
+"""
+import time
+
+from benchmarks.core import (
+    make_parser, report, setup, summarize, test_database
+)
+
+MODES = ('default', 'tuned')
+
+
+def fast_seed(users, notes):
+    """Создаёт пользователей и notes заметок, возвращает суперпользователя."""
+    from django.contrib.auth import get_user_model
+    from django.db import connection
+
+    from notes import search
+    from notes.models import RevisionCounter
+
+    user_model = get_user_model()
+    authors = user_model.objects.bulk_create(
+        user_model(username=f'bench-{index}') for index in range(users)
+    )
+    first_id = user_model.objects.get(username=authors[0].username).pk
+    with connection.schema_editor() as schema_editor:
+        search.uninstall(schema_editor)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            INSERT INTO notes_note
+                (title, text, slug, author_id, updated_at, revision)
+            WITH RECURSIVE seq(x) AS (
+                SELECT 1 UNION ALL SELECT x + 1 FROM seq WHERE x < %s
+            )
+            SELECT 'Заметка ' || x, 'Текст заметки номер ' || x,
+                   'note-' || x, %s + x %% %s, datetime('now'), x
+            FROM seq
+            """,
+            [notes, first_id, users],
+        )
+    RevisionCounter.objects.update_or_create(pk=1, defaults={'value': notes})
+    with connection.schema_editor() as schema_editor:
+        search.install(schema_editor)
+    return user_model.objects.create_superuser('bench-admin', '', 'password')
+
+
+def register_admin(mode):
+    from django.contrib import admin
+
+    from notes.admin import NoteAdmin
+    from notes.models import Note
+
+    admin.site.unregister(Note)
+    if mode == 'default':
+        admin.site.register(
+            Note, list_display=('id', 'title', 'slug', 'author'),
+            search_fields=('title',),
+        )
+    else:
+        admin.site.register(Note, NoteAdmin)
+
+
+def run_page(client, params, repeat):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from django.urls import reverse
+
+    url = reverse('admin:notes_note_changelist')
+    client.get(url, params)
+    timings, queries = [], 0
+    for _ in range(repeat):
+        with CaptureQueriesContext(connection) as context:
+            start = time.perf_counter()
+            response = client.get(url, params)
+            timings.append(time.perf_counter() - start)
+        queries = len(context.captured_queries)
+    result = summarize(timings)
+    result.update({'status': response.status_code, 'queries': queries})
+    return result
+
+
+def main():
+    parser = make_parser(__doc__)
+    parser.set_defaults(users=100, notes=1_000_000, repeat=10)
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=MODES)
+    parser.add_argument('--budget-ms', type=float, default=100)
+    parser.add_argument('--no-analyze', action='store_true',
+                        help='Не собирать статистику ANALYZE.')
+    args = parser.parse_args()
+    setup()
+    from django.db import connection
+    from django.test import Client
+
+    with test_database(args.db_file, on_disk=True):
+        start = time.perf_counter()
+        superuser = fast_seed(args.users, args.notes)
+        if not args.no_analyze:
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+        result = {
+            'notes': args.notes,
+            'seed_s': time.perf_counter() - start,
+            'modes': {},
+        }
+        client = Client()
+        client.force_login(superuser)
+        pages = {
+            'first': {},
+            'deep': {'p': 50},
+            'search': {'q': str(args.notes // 2)},
+            'author': {'author__id__exact': superuser.pk - 1},
+        }
+        for mode in args.modes:
+            register_admin(mode)
+            result['modes'][mode] = {}
+            for name, params in pages.items():
+                page = run_page(client, params, args.repeat)
+                page['within_budget'] = page['p95_ms'] <= args.budget_ms
+                result['modes'][mode][name] = page
+        report(result, args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""Сравнение асинхронных представлений под ASGI с WSGI.
+
+Одинаковое число одновременных клиентов читает список и заметки:
+под WSGI каждый клиент - поток с тестовым клиентом Django, под ASGI -
+корутина с AsyncClient в одном цикле событий. Выводятся запросы
+в секунду и пиковая память Python на одно соединение.
+"""
+import asyncio
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.core import (
+    make_parser, report, seed, setup, summarize, test_database
+)
+
+
+def urls_for(author):
+    from django.urls import reverse
+
+    from notes.models import Note
+
+    slugs = Note.objects.filter(author=author).values_list('slug', flat=True)
+    return [reverse('notes:list')] + [
+        reverse('notes:detail', args=(slug,)) for slug in slugs[:20]
+    ]
+
+
+def run_wsgi(authors, requests):
+    from django.db import connection
+    from django.test import Client
+
+    def client_loop(author):
+        client = Client()
+        client.force_login(author)
+        urls = urls_for(author)
+        timings = []
+        for index in range(requests):
+            start = time.perf_counter()
+            client.get(urls[index % len(urls)])
+            timings.append(time.perf_counter() - start)
+        connection.close()
+        return timings
+
+    with ThreadPoolExecutor(max_workers=len(authors)) as executor:
+        return sum(executor.map(client_loop, authors), [])
+
+
+def run_asgi(authors, requests):
+    from asgiref.sync import sync_to_async
+    from django.test import AsyncClient
+
+    async def client_loop(author):
+        client = AsyncClient()
+        await sync_to_async(client.force_login)(author)
+        urls = await sync_to_async(urls_for)(author)
+        timings = []
+        for index in range(requests):
+            start = time.perf_counter()
+            await client.get(urls[index % len(urls)])
+            timings.append(time.perf_counter() - start)
+        return timings
+
+    async def main():
+        results = await asyncio.gather(*map(client_loop, authors))
+        return sum(results, [])
+
+    return asyncio.run(main())
+
+
+def main():
+    parser = make_parser(__doc__)
+    parser.set_defaults(notes=200, text_size=1024)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=50,
+                        help='Количество запросов на одного клиента.')
+    args = parser.parse_args()
+    setup()
+    from django.conf import settings
+    from django.test.utils import override_settings
+
+    settings.CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+    }
+    settings.NOTES_CACHE_ALIAS = 'default'
+    with test_database(args.db_file, on_disk=True):
+        authors = seed(args.concurrency, args.notes, args.text_size)
+        result = {'concurrency': args.concurrency, 'requests': args.requests}
+        modes = {
+            'wsgi': ('yanote.urls', run_wsgi),
+            'asgi': ('yanote.urls_async', run_asgi),
+        }
+        for mode, (urlconf, run) in modes.items():
+            with override_settings(ROOT_URLCONF=urlconf):
+                tracemalloc.start()
+                start = time.perf_counter()
+                timings = run(authors, args.requests)
+                elapsed = time.perf_counter() - start
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+            result[mode] = summarize(timings)
+            result[mode]['requests_per_second'] = len(timings) / elapsed
+            result[mode]['peak_kb_per_connection'] = (
+                peak / 1024 / args.concurrency
+            )
+        report(result, args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""SQL-запросы на аутентифицированный запрос с кешем сессий и без него.
+
+Режим ``db`` - сессии в базе и ModelBackend, как в Django
+по умолчанию, ``cached`` - настройки проекта: сессии cached_db
+и CachedModelBackend. Для notes:list и notes:detail выводятся время
+ответа и число запросов к сессиям, пользователям и всего. Кеш страниц
+отключён, чтобы представления выполняли свои запросы.
+"""
+from benchmarks.core import (
+    make_parser, report, seed, setup, summarize, test_database
+)
+
+MODES = {
+    'db': {
+        'SESSION_ENGINE': 'django.contrib.sessions.backends.db',
+        'AUTHENTICATION_BACKENDS': [
+            'django.contrib.auth.backends.ModelBackend',
+        ],
+    },
+    'cached': {
+        'SESSION_ENGINE': 'django.contrib.sessions.backends.cached_db',
+        'AUTHENTICATION_BACKENDS': ['notes.backends.CachedModelBackend'],
+    },
+}
+TABLES = {'session': 'django_session', 'user': 'auth_user'}
+
+
+def run_view(client, url, repeat):
+    import time
+
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    client.get(url)
+    timings, queries = [], {name: 0 for name in (*TABLES, 'total')}
+    for _ in range(repeat):
+        with CaptureQueriesContext(connection) as context:
+            start = time.perf_counter()
+            client.get(url)
+            timings.append(time.perf_counter() - start)
+        for query in context.captured_queries:
+            queries['total'] += 1
+            for name, table in TABLES.items():
+                queries[name] += f'"{table}"' in query['sql']
+    result = summarize(timings)
+    result.update({
+        f'{name}_queries': count / repeat for name, count in queries.items()
+    })
+    return result
+
+
+def main():
+    parser = make_parser(__doc__)
+    parser.set_defaults(notes=100, text_size=1024, repeat=200)
+    args = parser.parse_args()
+    setup()
+    from django.conf import settings
+    from django.test import Client
+    from django.urls import reverse
+
+    from notes.models import Note
+
+    settings.CACHES['pages'] = {
+        'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+    }
+    settings.NOTES_CACHE_ALIAS = 'pages'
+    with test_database(args.db_file):
+        author, *_ = seed(args.users, args.notes, args.text_size)
+        slug = Note.objects.filter(author=author).values_list(
+            'slug', flat=True
+        )[0]
+        urls = {
+            'list': reverse('notes:list'),
+            'detail': reverse('notes:detail', args=(slug,)),
+        }
+        result = {'notes': args.notes, 'repeat': args.repeat, 'modes': {}}
+        for mode, overrides in MODES.items():
+            for name, value in overrides.items():
+                setattr(settings, name, value)
+            # Движок сессий выбирается при создании обработчика клиента.
+            client = Client()
+            client.force_login(author)
+            result['modes'][mode] = {
+                name: run_view(client, url, args.repeat)
+                for name, url in urls.items()
+            }
+        report(result, args.output)
+
+
+if __name__ == '__main__':
+    main()
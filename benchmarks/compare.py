@@ -0,0 +1,40 @@
+"""Сравнение двух JSON-отчётов бенчмарка.
+
+``python -m benchmarks.compare old.json new.json`` печатает для каждой
+числовой метрики старое и новое значение и изменение в процентах.
+"""
+import argparse
+import json
+
+
+def flatten(data, prefix=''):
+    """Числовые значения вложенного отчёта с путями через точку."""
+    values = {}
+    for key, value in data.items():
+        path = f'{prefix}{key}'
+        if isinstance(value, dict):
+            values.update(flatten(value, f'{path}.'))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            values[path] = value
+    return values
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('old')
+    parser.add_argument('new')
+    args = parser.parse_args()
+    with open(args.old, encoding='utf-8') as file:
+        old = flatten(json.load(file))
+    with open(args.new, encoding='utf-8') as file:
+        new = flatten(json.load(file))
+    for path in sorted(old.keys() & new.keys()):
+        change = (
+            (new[path] - old[path]) / old[path] * 100 if old[path] else 0
+        )
+        print(f'{path:45} {old[path]:>14.3f} {new[path]:>14.3f} '
+              f'{change:>+8.1f}%')
+
+
+if __name__ == '__main__':
+    main()
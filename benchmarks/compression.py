@@ -0,0 +1,101 @@
+"""Сжатие больших текстов заметок: размер базы и цена чтения.
+
+Для режимов ``raw`` (без сжатия), ``zlib`` и ``lzma`` создаётся база
+с заметками-логами размером --text-size и выводятся размер файла базы,
+время записи, время ответа notes:detail и процессорное время на него.
+Перед каждым запросом соединение закрывается, поэтому страницы базы
+читаются заново (холодный кеш SQLite). Кеш страниц заметок отключён.
+"""
+import time
+
+from benchmarks.core import (
+    make_parser, percentile, report, setup, summarize, test_database
+)
+
+MODES = ('raw', 'zlib', 'lzma')
+
+
+def make_log(size):
+    lines, index = [], 0
+    while sum(map(len, lines)) < size:
+        lines.append(
+            f'2026-10-18 12:{index // 60 % 60:02}:{index % 60:02} '
+            f'INFO worker-{index % 16} request_id={index * 7919 % 100003} '
+            f'status={200 + index % 3} duration_ms={index * 31 % 997}\n'
+        )
+        index += 1
+    return ''.join(lines)[:size]
+
+
+def database_size(connection):
+    with connection.cursor() as cursor:
+        cursor.execute('VACUUM')
+        cursor.execute('PRAGMA page_count')
+        pages = cursor.fetchone()[0]
+        cursor.execute('PRAGMA page_size')
+        return pages * cursor.fetchone()[0]
+
+
+def run_mode(mode, args, text):
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from django.test import Client
+    from django.urls import reverse
+
+    from notes.models import Note
+
+    settings.NOTES_COMPRESS_THRESHOLD = None if mode == 'raw' else 1024
+    settings.NOTES_COMPRESS_ALGORITHM = 'zlib' if mode == 'raw' else mode
+    with test_database(args.db_file, on_disk=True) as connection:
+        author = get_user_model().objects.create(username='bench')
+        start = time.perf_counter()
+        Note.objects.bulk_create(
+            Note(title=f'Лог {index}', text=text, slug=f'log-{index}',
+                 author=author)
+            for index in range(args.notes)
+        )
+        write_s = time.perf_counter() - start
+        size = database_size(connection)
+        client = Client()
+        client.force_login(author)
+        timings, cpu = [], []
+        for index in range(args.repeat):
+            url = reverse('notes:detail', args=(f'log-{index % args.notes}',))
+            connection.close()
+            start, start_cpu = time.perf_counter(), time.process_time()
+            client.get(url)
+            timings.append(time.perf_counter() - start)
+            cpu.append(time.process_time() - start_cpu)
+        result = summarize(timings)
+        result.update({
+            'db_size_kb': size // 1024,
+            'write_ms_per_note': write_s * 1000 / args.notes,
+            'cpu_mean_ms': sum(cpu) * 1000 / len(cpu),
+            'cpu_p95_ms': percentile(cpu, 95) * 1000,
+        })
+        return result
+
+
+def main():
+    parser = make_parser(__doc__)
+    parser.set_defaults(notes=200, text_size=256 * 1024, repeat=100)
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=MODES)
+    args = parser.parse_args()
+    setup()
+    from django.conf import settings
+
+    settings.CACHES['pages'] = {
+        'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+    }
+    settings.NOTES_CACHE_ALIAS = 'pages'
+    text = make_log(args.text_size)
+    result = {
+        'notes': args.notes,
+        'text_size': args.text_size,
+        'modes': {mode: run_mode(mode, args, text) for mode in args.modes},
+    }
+    report(result, args.output)
+
+
+if __name__ == '__main__':
+    main()
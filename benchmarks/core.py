@@ -0,0 +1,132 @@
+"""Общая обвязка бенчмарков.
+
+Каждый бенчмарк - модуль, который запускается из корня проекта
+командой ``python -m benchmarks.<имя> [параметры]``. Данные создаются
+в отдельной тестовой базе, рабочая база не затрагивается. Результаты
+печатаются в JSON, чтобы их можно было сравнивать между релизами.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+
+import django
+
+
+def setup():
+    """Настраивает Django с настройками проекта."""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanote.settings')
+    django.setup()
+
+
+def make_parser(description):
+    """Парсер с общими для всех бенчмарков параметрами."""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('--users', type=int, default=1)
+    parser.add_argument('--notes', type=int, default=10000,
+                        help='Количество заметок у каждого пользователя.')
+    parser.add_argument('--text-size', type=int, default=4096,
+                        help='Размер текста заметки в символах.')
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--db-file', default=None,
+                        help='Файл тестовой базы вместо базы в памяти.')
+    parser.add_argument('--output', default=None,
+                        help='Файл для JSON-отчёта, по умолчанию stdout.')
+    return parser
+
+
+@contextmanager
+def test_database(db_file=None, on_disk=False):
+    """Создаёт тестовую базу на время бенчмарка и удаляет её после.
+
+    Для бенчмарков с параллельными потоками нужен on_disk: общая
+    база SQLite в памяти не ждёт освобождения блокировок.
+    """
+    from django.conf import settings
+    from django.db import connection
+    from django.test.utils import (
+        setup_test_environment, teardown_test_environment
+    )
+
+    if on_disk and not db_file:
+        db_file = os.path.join(tempfile.mkdtemp(), 'benchmark.sqlite3')
+    if db_file:
+        settings.DATABASES['default'].setdefault('TEST', {})
+        settings.DATABASES['default']['TEST']['NAME'] = db_file
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def seed(users, notes_per_user, text_size, batch_size=2000):
+    """Создаёт пользователей и заметки пачками, возвращает пользователей."""
+    from django.contrib.auth import get_user_model
+
+    from notes.models import Note
+
+    user_model = get_user_model()
+    text = ('Lorem ipsum dolor sit amet. ' * (text_size // 28 + 1))
+    text = text[:text_size]
+    authors = []
+    for user_index in range(users):
+        author = user_model.objects.create(username=f'bench-{user_index}')
+        authors.append(author)
+        Note.objects.bulk_create(
+            (
+                Note(
+                    title=f'Заметка {index}',
+                    text=text,
+                    slug=f'bench-{user_index}-{index}',
+                    author=author,
+                )
+                for index in range(notes_per_user)
+            ),
+            batch_size=batch_size,
+        )
+    return authors
+
+
+def measure(func, repeat):
+    """Время выполнения func в секундах для каждого из repeat запусков."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def percentile(values, percent):
+    """Перцентиль по методу ближайшего ранга."""
+    ordered = sorted(values)
+    index = max(0, round(percent / 100 * len(ordered)) - 1)
+    return ordered[min(index, len(ordered) - 1)]
+
+
+def summarize(timings):
+    """Сводка по замерам времени в миллисекундах."""
+    return {
+        'runs': len(timings),
+        'mean_ms': statistics.mean(timings) * 1000,
+        'p50_ms': percentile(timings, 50) * 1000,
+        'p95_ms': percentile(timings, 95) * 1000,
+        'p99_ms': percentile(timings, 99) * 1000,
+    }
+
+
+def report(result, output=None):
+    """Печатает результат в JSON или сохраняет его в файл."""
+    data = json.dumps(result, ensure_ascii=False, indent=2)
+    if output:
+        with open(output, 'w', encoding='utf-8') as file:
+            file.write(data + '\n')
+    else:
+        sys.stdout.write(data + '\n')
@@ -0,0 +1,160 @@
+"""Нагрузочный бенчмарк сценариев работы с заметками.
+
+Каждый поток - отдельный пользователь со своим тестовым клиентом Django,
+запросы проходят весь стек middleware. Для каждого сценария (notes:add,
+notes:list, notes:detail, notes:edit, notes:delete) выводятся
+перцентили времени ответа, число SQL-запросов на запрос и пиковая
+память. Результат - JSON, который можно сравнивать между релизами.
+"""
+import random
+import resource
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.core import (
+    make_parser, percentile, report, seed, setup, summarize, test_database
+)
+
+FLOWS = ('add', 'list', 'detail', 'edit', 'delete')
+
+
+class Worker:
+    """Пользователь, который выполняет запросы сценариев."""
+
+    def __init__(self, user, notes):
+        from django.test import Client
+
+        self.client = Client()
+        self.client.force_login(user)
+        self.slugs = list(notes)
+        self.counter = 0
+
+    def form_data(self):
+        self.counter += 1
+        return {
+            'title': f'Новая заметка {self.counter}',
+            'text': 'Текст новой заметки',
+            'slug': '',
+        }
+
+    def request(self, flow):
+        from django.urls import reverse
+
+        if flow == 'add':
+            response = self.client.post(
+                reverse('notes:add'), self.form_data()
+            )
+        elif flow == 'list':
+            response = self.client.get(reverse('notes:list'))
+        elif flow == 'detail':
+            slug = random.choice(self.slugs)
+            response = self.client.get(reverse('notes:detail', args=(slug,)))
+        elif flow == 'edit':
+            slug = random.choice(self.slugs)
+            response = self.client.post(
+                reverse('notes:edit', args=(slug,)),
+                {**self.form_data(), 'slug': slug},
+            )
+        else:
+            response = self.client.post(
+                reverse('notes:delete', args=(self.slugs.pop(),))
+            )
+        return response.status_code < 400
+
+
+def run_flow(workers, flow, requests, concurrency):
+    """Выполняет requests запросов сценария в concurrency потоков."""
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    timings, queries, errors = [], [], []
+    lock = threading.Lock()
+
+    def worker_loop(worker):
+        for _ in range(requests // len(workers)):
+            with CaptureQueriesContext(connection) as context:
+                start = time.perf_counter()
+                ok = worker.request(flow)
+                elapsed = time.perf_counter() - start
+            with lock:
+                timings.append(elapsed)
+                queries.append(len(context.captured_queries))
+                errors.append(not ok)
+        connection.close()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(worker_loop, workers))
+    result = summarize(timings)
+    result.update({
+        'errors': sum(errors),
+        'queries_mean': sum(queries) / max(len(queries), 1),
+        'queries_p95': percentile(queries, 95) if queries else 0,
+        'queries_max': max(queries, default=0),
+    })
+    return result
+
+
+def main():
+    parser = make_parser(__doc__)
+    parser.set_defaults(notes=1000, text_size=1024)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--requests', type=int, default=200,
+                        help='Количество запросов на каждый сценарий.')
+    parser.add_argument('--flows', nargs='+', choices=FLOWS, default=FLOWS)
+    parser.add_argument('--no-page-cache', action='store_true',
+                        help='Отключить кеш страниц заметок.')
+    parser.add_argument('--tracemalloc', action='store_true',
+                        help='Замерять пиковую память Python по сценариям.')
+    args = parser.parse_args()
+    args.users = max(args.users, args.concurrency)
+    # Каждый запрос notes:delete удаляет одну из заметок пользователя,
+    # и хотя бы одна остаётся для notes:detail и notes:edit.
+    args.notes = max(args.notes, args.requests // args.users + 1)
+    setup()
+    from django.conf import settings
+    from notes.models import Note
+
+    # Бенчмарк замеряет сами запросы, ограничение частоты ему мешает.
+    settings.NOTES_RATE_LIMIT_RATE = None
+    if args.no_page_cache:
+        settings.CACHES['default'] = {
+            'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+        }
+        settings.NOTES_CACHE_ALIAS = 'default'
+    random.seed(0)
+    with test_database(args.db_file, on_disk=args.concurrency > 1):
+        authors = seed(args.users, args.notes, args.text_size)
+        workers = [
+            Worker(author, Note.objects.filter(
+                author=author
+            ).values_list('slug', flat=True))
+            for author in authors
+        ]
+        result = {
+            'config': {
+                name: value for name, value in vars(args).items()
+                if name != 'output'
+            },
+            'flows': {},
+        }
+        for flow in args.flows:
+            if args.tracemalloc:
+                tracemalloc.start()
+            result['flows'][flow] = run_flow(
+                workers, flow, args.requests, args.concurrency
+            )
+            if args.tracemalloc:
+                result['flows'][flow]['tracemalloc_peak_kb'] = (
+                    tracemalloc.get_traced_memory()[1] // 1024
+                )
+                tracemalloc.stop()
+        result['peak_rss_kb'] = resource.getrusage(
+            resource.RUSAGE_SELF
+        ).ru_maxrss
+        report(result, args.output)
+
+
+if __name__ == '__main__':
+    main()
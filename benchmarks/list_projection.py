@@ -0,0 +1,51 @@
+"""Выигрыш от выборки только отображаемых в списке полей.
+
+Сравнивает чтение всех заметок пользователя целиком и через
+``Note.objects.for_list()``: время и объём прочитанных данных.
+"""
+from benchmarks.core import (
+    make_parser, measure, report, seed, setup, summarize, test_database
+)
+
+LIST_FIELDS = ('id', 'slug', 'title')
+
+
+def read_bytes(queryset, fields):
+    """Объём значений указанных полей, полученных из базы, в байтах."""
+    return sum(
+        len(str(value).encode())
+        for row in queryset.values_list(*fields).iterator()
+        for value in row
+    )
+
+
+def main():
+    args = make_parser(__doc__).parse_args()
+    setup()
+    from notes.models import Note
+
+    with test_database(args.db_file):
+        author, *_ = seed(args.users, args.notes, args.text_size)
+        notes = Note.objects.filter(author=author)
+        all_fields = [field.attname for field in Note._meta.concrete_fields]
+        cases = {
+            'full': (notes, all_fields),
+            'for_list': (notes.for_list(), LIST_FIELDS),
+        }
+        result = {'notes': args.notes, 'text_size': args.text_size}
+        for name, (queryset, fields) in cases.items():
+            result[name] = summarize(measure(
+                lambda: list(queryset.all().iterator()), args.repeat
+            ))
+            result[name]['bytes'] = read_bytes(notes, fields)
+        result['bytes_saved'] = (
+            result['full']['bytes'] - result['for_list']['bytes']
+        )
+        result['time_saved_ms'] = (
+            result['full']['mean_ms'] - result['for_list']['mean_ms']
+        )
+        report(result, args.output)
+
+
+if __name__ == '__main__':
+    main()
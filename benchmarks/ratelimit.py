@@ -0,0 +1,175 @@
+"""Время записи обычных пользователей рядом с клиентом-нарушителем.
+
+Обычные пользователи изменяют свои заметки (notes:edit) с паузой
+--think-time между запросами. Нарушитель в --abusers потоков без пауз
+создаёт (notes:add) и изменяет заметки. Для каждого режима из --modes
+выводятся перцентили времени записи обычных пользователей
+и число принятых и отклонённых (429) запросов нарушителя:
+``off`` - без ограничения частоты, ``on`` - с NOTES_RATE_LIMIT_RATE
+и NOTES_RATE_LIMIT_BURST.
+
+Нарушитель работает в том же процессе, поэтому даже отклонённые
+запросы занимают процессор; на одном ядре это заметно в задержке
+обычных пользователей и в режиме ``on``.
+"""
+import random
+import threading
+import time
+
+from benchmarks.core import (
+    make_parser, report, seed, setup, summarize, test_database
+)
+
+MODES = ('off', 'on')
+
+
+def make_client(user):
+    from django.test import Client
+
+    client = Client()
+    client.force_login(user)
+    return client
+
+
+def edit(client, slug, counter):
+    from django.urls import reverse
+
+    return client.post(reverse('notes:edit', args=(slug,)), {
+        'title': f'Правка {counter}', 'text': 'Текст', 'slug': slug,
+    })
+
+
+def good_user(user, slugs, think_time, stop, stats):
+    from django.db import connection
+
+    client = make_client(user)
+    counter = 0
+    while not stop.wait(random.uniform(0, 2 * think_time)):
+        counter += 1
+        start = time.perf_counter()
+        response = edit(client, random.choice(slugs), counter)
+        stats.add('good', time.perf_counter() - start, response.status_code)
+    connection.close()
+
+
+def abuser(user, slugs, stop, stats):
+    from django.db import connection
+    from django.urls import reverse
+
+    client = make_client(user)
+    counter = 0
+    while not stop.is_set():
+        counter += 1
+        start = time.perf_counter()
+        if counter % 2:
+            response = client.post(reverse('notes:add'), {
+                'title': f'Спам {counter}', 'text': 'Текст', 'slug': '',
+            })
+        else:
+            response = edit(client, random.choice(slugs), counter)
+        stats.add('abusive', time.perf_counter() - start, response.status_code)
+    connection.close()
+
+
+class Stats:
+    """Замеры времени принятых запросов и число отклонённых."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.timings = {'good': [], 'abusive': []}
+        self.limited = {'good': 0, 'abusive': 0}
+        self.errors = {'good': 0, 'abusive': 0}
+
+    def add(self, kind, elapsed, status):
+        with self.lock:
+            if status == 429:
+                self.limited[kind] += 1
+                return
+            self.timings[kind].append(elapsed)
+            self.errors[kind] += status >= 400
+
+    def result(self, duration):
+        return {
+            kind: {
+                **(summarize(timings) if timings else {'runs': 0}),
+                'accepted_per_second': len(timings) / duration,
+                'limited': self.limited[kind],
+                'errors': self.errors[kind],
+            }
+            for kind, timings in self.timings.items()
+        }
+
+
+def run_mode(mode, args):
+    from django.conf import settings
+    from django.core.cache import cache
+    from django.db import connection
+
+    from notes.models import Note
+
+    settings.NOTES_RATE_LIMIT_RATE = args.rate if mode == 'on' else None
+    cache.clear()
+    with test_database(args.db_file, on_disk=True):
+        users = seed(args.users + 1, args.notes, args.text_size)
+        slugs = {
+            user.id: list(Note.objects.filter(author=user).values_list(
+                'slug', flat=True
+            ))
+            for user in users
+        }
+        connection.close()
+        stats = Stats()
+        stop = threading.Event()
+        bad, *good = users
+        threads = [
+            threading.Thread(target=good_user, args=(
+                user, slugs[user.id], args.think_time, stop, stats
+            ))
+            for user in good
+        ] + [
+            threading.Thread(target=abuser, args=(
+                bad, slugs[bad.id], stop, stats
+            ))
+            for _ in range(args.abusers)
+        ]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        time.sleep(args.duration)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        return stats.result(time.perf_counter() - start)
+
+
+def main():
+    parser = make_parser(__doc__)
+    parser.set_defaults(users=4, notes=200, text_size=1024)
+    parser.add_argument('--abusers', type=int, default=4,
+                        help='Потоков нарушителя.')
+    parser.add_argument('--think-time', type=float, default=0.2,
+                        help='Средняя пауза обычного пользователя, секунды.')
+    parser.add_argument('--duration', type=float, default=10,
+                        help='Длительность замера каждого режима в секундах.')
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=MODES)
+    args = parser.parse_args()
+    setup()
+    from django.conf import settings
+
+    args.rate = settings.NOTES_RATE_LIMIT_RATE
+    random.seed(0)
+    result = {
+        'config': {
+            name: value for name, value in vars(args).items()
+            if name != 'output'
+        },
+        'burst': settings.NOTES_RATE_LIMIT_BURST,
+        'modes': {},
+    }
+    for mode in args.modes:
+        result['modes'][mode] = run_mode(mode, args)
+    report(result, args.output)
+
+
+if __name__ == '__main__':
+    main()
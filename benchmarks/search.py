@@ -0,0 +1,57 @@
+"""Время полнотекстового поиска по заметкам пользователя.
+
+Заметки многих пользователей содержат одни и те же слова. Режим
+``author`` ограничивает выборку автором внутри индекса, как
+представление notes:search, ``join`` - только соединением с таблицей
+заметок, тогда FTS5 находит и ранжирует заметки всех пользователей.
+"""
+import random
+
+from benchmarks.core import (
+    make_parser, measure, report, seed, setup, summarize, test_database
+)
+
+WORDS = (
+    'борщ', 'поезд', 'отпуск', 'покупки', 'проект', 'встреча', 'отчёт',
+    'книга', 'фильм', 'ремонт', 'дача', 'рецепт', 'спорт', 'врач',
+)
+
+
+def chunks(ids, size=500):
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+
+def main():
+    parser = make_parser(__doc__)
+    parser.set_defaults(users=100, notes=2000, text_size=512)
+    args = parser.parse_args()
+    setup()
+    from notes.models import Note
+    from notes.search import search
+
+    with test_database(args.db_file):
+        author, *_ = seed(args.users, args.notes, args.text_size)
+        random.seed(0)
+        note_ids = list(Note.objects.values_list('id', flat=True))
+        # Каждое слово - в заголовках около 5% заметок каждого автора.
+        for word in WORDS:
+            for ids in chunks(random.sample(
+                note_ids, k=len(note_ids) // 20
+            )):
+                Note.objects.filter(id__in=ids).update(title=word)
+        notes = Note.objects.filter(author=author).for_list()
+        result = {'users': args.users, 'notes': args.notes * args.users}
+        for mode, author_id in (('author', author.pk), ('join', None)):
+            result[mode] = {
+                query: summarize(measure(
+                    lambda: list(search(notes, query, author_id)[:100]),
+                    args.repeat,
+                ))
+                for query in ('борщ', 'поез', 'отпуск ремонт', 'Lorem')
+            }
+        report(result, args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,168 @@
+"""Пропускная способность чтения SQLite во время записи.
+
+Читатели запрашивают notes:list и notes:detail, писатели в это время
+создают (notes:add) и изменяют (notes:edit) заметки. Запросы проходят
+весь стек Django через тестовый клиент, кеш страниц отключён, чтобы
+чтение шло в базу. Замер выполняется для каждого режима из --modes:
+``default`` - журнал DELETE и synchronous=FULL, как у SQLite
+по умолчанию, ``tuned`` - PRAGMA из NOTES_SQLITE_PRAGMAS.
+"""
+import random
+import threading
+import time
+
+from benchmarks.core import (
+    make_parser, report, seed, setup, summarize, test_database
+)
+
+MODES = ('default', 'tuned')
+DEFAULT_PRAGMAS = {'journal_mode': 'DELETE', 'synchronous': 'FULL'}
+
+
+def make_client(user):
+    from django.test import Client
+
+    client = Client()
+    client.force_login(user)
+    return client
+
+
+def reader(user, slugs, stop, stats):
+    from django.db import connection
+    from django.urls import reverse
+
+    client = make_client(user)
+    while not stop.is_set():
+        if random.random() < 0.5:
+            url = reverse('notes:list')
+        else:
+            url = reverse('notes:detail', args=(random.choice(slugs),))
+        start = time.perf_counter()
+        response = client.get(url)
+        stats.add('read', time.perf_counter() - start, response.status_code)
+    connection.close()
+
+
+def writer(user, slugs, stop, stats):
+    from django.db import connection
+    from django.urls import reverse
+
+    client = make_client(user)
+    counter = 0
+    while not stop.is_set():
+        counter += 1
+        data = {'title': f'Запись {counter}', 'text': 'Текст', 'slug': ''}
+        if counter % 2:
+            url = reverse('notes:add')
+        else:
+            slug = random.choice(slugs)
+            url = reverse('notes:edit', args=(slug,))
+            data['slug'] = slug
+        start = time.perf_counter()
+        response = client.post(url, data)
+        stats.add('write', time.perf_counter() - start, response.status_code)
+    connection.close()
+
+
+class Stats:
+    """Замеры времени и ошибки по видам запросов."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.timings = {'read': [], 'write': []}
+        self.errors = {'read': 0, 'write': 0}
+
+    def add(self, kind, elapsed, status):
+        with self.lock:
+            self.timings[kind].append(elapsed)
+            self.errors[kind] += status >= 400
+
+    def result(self, duration):
+        return {
+            kind: {
+                **(summarize(timings) if timings else {'runs': 0}),
+                'per_second': len(timings) / duration,
+                'errors': self.errors[kind],
+            }
+            for kind, timings in self.timings.items()
+        }
+
+
+def run_mode(mode, args):
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from django.db import connection
+
+    from notes.models import Note
+
+    settings.NOTES_SQLITE_PRAGMAS = (
+        DEFAULT_PRAGMAS if mode == 'default' else args.tuned_pragmas
+    )
+    with test_database(args.db_file, on_disk=True):
+        connection.close()
+        seed(args.users, args.notes, args.text_size)
+        users = list(get_user_model().objects.order_by('id'))
+        slugs = {
+            user.id: list(Note.objects.filter(author=user).values_list(
+                'slug', flat=True
+            ))
+            for user in users
+        }
+        # Соединения потоков должны открыться с PRAGMA режима.
+        connection.close()
+        stats = Stats()
+        stop = threading.Event()
+        threads = [
+            threading.Thread(target=target, args=(
+                users[index % len(users)],
+                slugs[users[index % len(users)].id],
+                stop, stats,
+            ))
+            for count, target in (
+                (args.readers, reader), (args.writers, writer)
+            )
+            for index in range(count)
+        ]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        time.sleep(args.duration)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        return stats.result(time.perf_counter() - start)
+
+
+def main():
+    parser = make_parser(__doc__)
+    parser.set_defaults(users=4, notes=1000, text_size=1024)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--duration', type=float, default=10,
+                        help='Длительность замера каждого режима в секундах.')
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=MODES)
+    args = parser.parse_args()
+    setup()
+    from django.conf import settings
+
+    settings.CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+    }
+    settings.NOTES_CACHE_ALIAS = 'default'
+    args.tuned_pragmas = dict(settings.NOTES_SQLITE_PRAGMAS)
+    random.seed(0)
+    result = {
+        'config': {
+            name: value for name, value in vars(args).items()
+            if name not in ('output', 'tuned_pragmas')
+        },
+        'pragmas': args.tuned_pragmas,
+        'modes': {},
+    }
+    for mode in args.modes:
+        result['modes'][mode] = run_mode(mode, args)
+    report(result, args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""Время рендеринга шаблонов templates/notes/.
+
+Режимы: ``plain`` - шаблон разбирается при каждом рендеринге,
+фрагмент шапки не кешируется; ``cached_loader`` - шаблоны
+из кеширующего загрузчика, шапка по-прежнему рендерится заново;
+``cached`` - настройки проекта: кеширующий загрузчик и кеш фрагмента
+шапки. База данных не используется: контекст собирается из
+несохранённых объектов.
+"""
+from pathlib import Path
+
+from benchmarks.core import make_parser, measure, report, setup, summarize
+
+MODES = ('plain', 'cached_loader', 'cached')
+
+
+def make_backend(cached):
+    from django.conf import settings
+    from django.template.backends.django import DjangoTemplates
+
+    options = dict(settings.TEMPLATES[0]['OPTIONS'])
+    loaders = [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ]
+    if cached:
+        loaders = [('django.template.loaders.cached.Loader', loaders)]
+    options['loaders'] = loaders
+    return DjangoTemplates({
+        'NAME': 'benchmark',
+        'DIRS': settings.TEMPLATES[0]['DIRS'],
+        'APP_DIRS': False,
+        'OPTIONS': options,
+    })
+
+
+def make_contexts(notes_count, text_size):
+    from django.contrib.auth import get_user_model
+
+    from notes.forms import NoteForm
+    from notes.models import Note
+
+    author = get_user_model()(id=1, username='bench')
+    notes = [
+        Note(id=index, title=f'Заметка {index}', slug=f'note-{index}',
+             text='Текст заметки. ' * (text_size // 15), author=author)
+        for index in range(1, notes_count + 1)
+    ]
+    note = notes[0]
+    return author, {
+        'delete.html': {'note': note, 'object': note},
+        'detail.html': {'note': note, 'object': note},
+        'form.html': {'form': NoteForm(instance=note)},
+        'home.html': {},
+        'list.html': {'object_list': notes},
+        'search.html': {'object_list': notes, 'query': 'заметка'},
+        'success.html': {},
+    }
+
+
+def main():
+    parser = make_parser(__doc__)
+    parser.set_defaults(notes=100, text_size=4096, repeat=500)
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=MODES)
+    args = parser.parse_args()
+    setup()
+    from django.conf import settings
+    from django.core.cache import cache
+    from django.test import RequestFactory
+
+    author, contexts = make_contexts(args.notes, args.text_size)
+    request = RequestFactory().get('/')
+    request.user = author
+    names = sorted(
+        path.name for path in
+        Path(settings.TEMPLATES[0]['DIRS'][0], 'notes').glob('*.html')
+    )
+    result = {'repeat': args.repeat, 'modes': {}}
+    for mode in args.modes:
+        backend = make_backend(cached=mode != 'plain')
+        result['modes'][mode] = {}
+        for name in names:
+            context = contexts.get(name, {})
+
+            def render():
+                if mode != 'cached':
+                    cache.clear()
+                template = backend.get_template(f'notes/{name}')
+                template.render(context, request)
+
+            render()
+            result['modes'][mode][name] = summarize(
+                measure(render, args.repeat)
+            )
+    report(result, args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,155 @@
-from django.contrib import admin
+from django.conf import settings
+from django.contrib import admin, messages
+from django.contrib.admin.views.main import ChangeList
+from django.contrib.auth import get_user_model
+from django.contrib.auth.admin import UserAdmin
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Count
+from django.utils.functional import cached_property
+from django.utils.text import capfirst
 
-from .models import Note
+from .jobs import enqueue
+from .models import Job, Note
+from .search import search
 
-admin.site.register(Note)
+LIST_FIELDS = ('id', 'slug', 'title', 'author__id', 'author__username')
+
+
+def estimate_count(model, using='default'):
+    """Примерное число строк таблицы без полного COUNT(*) или None.
+
+    В SQLite берётся статистика ANALYZE (sqlite_stat1), а без неё -
+    диапазон первичного ключа, в PostgreSQL - reltuples из pg_class.
+    """
+    connection = connections[using]
+    table = connection.ops.quote_name(model._meta.db_table)
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'"
+            )
+            if cursor.fetchone():
+                cursor.execute(
+                    'SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1',
+                    [model._meta.db_table],
+                )
+                row = cursor.fetchone()
+                if row:
+                    return int(row[0].split()[0])
+            cursor.execute(f'SELECT MAX(rowid) - MIN(rowid) + 1 FROM {table}')
+            return cursor.fetchone()[0] or 0
+        if connection.vendor == 'postgresql':
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class '
+                'WHERE oid = %s::regclass',
+                [model._meta.db_table],
+            )
+            row = cursor.fetchone()
+            if row and row[0] >= 0:
+                return row[0]
+    return None
+
+
+class EstimatedCountPaginator(Paginator):
+    """Пагинатор, который не считает большие таблицы целиком.
+
+    Без фильтров число строк оценивается по статистике таблицы,
+    с фильтрами и поиском считается не дальше NOTES_ADMIN_COUNT_LIMIT
+    строк. Точный COUNT(*) выполняется, только если строк меньше лимита.
+    """
+
+    @cached_property
+    def count(self):
+        limit = settings.NOTES_ADMIN_COUNT_LIMIT
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimate_count(queryset.model, queryset.db)
+            if estimate is not None and estimate > limit:
+                return estimate
+        return queryset.order_by()[:limit + 1].count()
+
+
+class NoteChangeList(ChangeList):
+    """Список заметок в админке без загрузки текста заметок."""
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).only(*LIST_FIELDS)
+
+
+@admin.register(Note)
+class NoteAdmin(admin.ModelAdmin):
+    list_display = ('id', 'title', 'slug', 'author')
+    list_select_related = ('author',)
+    raw_id_fields = ('author',)
+    search_fields = ('title', 'text')
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+
+    def get_changelist(self, request, **kwargs):
+        return NoteChangeList
+
+    def get_search_results(self, request, queryset, search_term):
+        """Поиск по полнотекстовому индексу заметок."""
+        if not search_term.strip():
+            return queryset, False
+        return search(queryset, search_term), False
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'kind', 'status', 'done', 'total', 'updated_at')
+    list_filter = ('status', 'kind')
+
+
+class DeferredDeleteUserAdmin(UserAdmin):
+    """Пользователи удаляются фоновой задачей delete_account.
+
+    Каскадное удаление всех заметок пользователя одной транзакцией
+    надолго заблокировало бы базу. Пользователь сразу блокируется,
+    а его данные удаляет run_jobs пачками.
+    """
+
+    def get_deleted_objects(self, objs, request):
+        """Сводка для страницы подтверждения: число заметок пользователей.
+
+        Стандартная реализация загружает все связанные объекты.
+        """
+        users = list(objs)
+        counts = dict(
+            Note.objects.filter(author__in=users).order_by()
+            .values_list('author').annotate(Count('id'))
+        )
+        deleted_objects = []
+        for user in users:
+            deleted_objects += [
+                f'{capfirst(user._meta.verbose_name)}: {user}',
+                [f'Заметок: {counts.get(user.pk, 0)}'],
+            ]
+        model_count = {
+            self.opts.verbose_name_plural: len(users),
+            Note._meta.verbose_name_plural: sum(counts.values()),
+        }
+        return deleted_objects, model_count, set(), []
+
+    def delete_model(self, request, obj):
+        self.delete_queryset(request, [obj])
+
+    def delete_queryset(self, request, queryset):
+        for user in queryset:
+            if user.is_active:
+                # save, а не update: сигнал сбросит пользователя в кеше.
+                user.is_active = False
+                user.save(update_fields=['is_active'])
+            enqueue('delete_account', user=request.user, user_id=user.pk)
+        self.message_user(
+            request,
+            'Пользователи заблокированы, удаление поставлено в очередь.',
+            messages.WARNING,
+        )
+
+
+User = get_user_model()
+if admin.site.is_registered(User):
+    admin.site.unregister(User)
+admin.site.register(User, DeferredDeleteUserAdmin)
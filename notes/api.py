@@ -0,0 +1,273 @@
+"""JSON API заметок для клиентов синхронизации.
+
+Доступ к заметкам ограничен так же, как в HTML-представлениях:
+через NoteBase.get_queryset. Каждая заметка отдаётся с ETag по её
+ревизии, поэтому клиент может запросить её с If-None-Match и получить
+пустой ответ 304, если заметка не изменилась, а при изменении
+и удалении передать If-Match и получить 412, если заметку уже изменили.
+
+Для синхронизации есть лента изменений: заметки и надгробия удалённых
+заметок с ревизией больше переданной, по возрастанию ревизии.
+
+Клиент аутентифицируется токеном (notes.tokens) в заголовке
+Authorization, такие запросы не проверяются на CSRF. Запросы с cookie
+сессии из браузера проверяются как обычно, но ошибка - тоже JSON.
+"""
+import json
+from hashlib import sha1
+from http import HTTPStatus
+
+from django.conf import settings
+from django.db import IntegrityError
+from django.http import Http404, HttpResponse, JsonResponse
+from django.middleware.csrf import CsrfViewMiddleware
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.decorators import method_decorator
+from django.utils.http import quote_etag
+from django.views import generic
+from django.views.decorators.csrf import csrf_exempt
+
+from .forms import NoteForm
+from .models import Tombstone
+from .pagination import KeysetPaginator
+from .ratelimit import retry_after
+from .slugs import is_slug_conflict
+from .tokens import get_token_user
+from .views import NoteBase
+
+LIST_FIELDS = ('id', 'slug', 'title', 'revision')
+DETAIL_FIELDS = ('id', 'slug', 'title', 'text', 'revision')
+TOMBSTONE_FIELDS = ('note_id', 'slug', 'revision')
+TOKEN_SCHEME = 'Token'
+
+csrf_check = CsrfViewMiddleware(lambda request: None)
+
+
+class BadRequest(Exception):
+    """Тело запроса не удалось разобрать."""
+
+
+def make_etag(*values):
+    digest = sha1('\0'.join(str(value) for value in values).encode())
+    return quote_etag(digest.hexdigest())
+
+
+def note_etag(note):
+    return make_etag(note.id, note.revision)
+
+
+def serialize_note(note, fields=DETAIL_FIELDS):
+    data = {field: getattr(note, field) for field in fields}
+    data['updated_at'] = note.updated_at
+    return data
+
+
+def note_response(note, status=HTTPStatus.OK):
+    response = JsonResponse(serialize_note(note), status=status)
+    response['ETag'] = note_etag(note)
+    return response
+
+
+def error_response(message, status, **extra):
+    return JsonResponse({'detail': message, **extra}, status=status)
+
+
+class ApiMixin(NoteBase):
+    """Общая часть представлений API: ошибки и тело запроса в JSON."""
+    read_from_replicas = True
+
+    def handle_no_permission(self):
+        return error_response(
+            'Требуется авторизация.', HTTPStatus.UNAUTHORIZED
+        )
+
+    def authenticate(self, request):
+        """Ответ с ошибкой аутентификации или CSRF, иначе None."""
+        header = request.META.get('HTTP_AUTHORIZATION')
+        if header is None:
+            if csrf_check.process_view(request, None, (), {}) is not None:
+                return error_response(
+                    'Ошибка проверки CSRF.', HTTPStatus.FORBIDDEN
+                )
+            return None
+        scheme, _, token = header.partition(' ')
+        user = get_token_user(token) if scheme == TOKEN_SCHEME else None
+        if user is None:
+            return error_response('Неверный токен.', HTTPStatus.UNAUTHORIZED)
+        request.user = user
+        return None
+
+    @method_decorator(csrf_exempt)
+    def dispatch(self, request, *args, **kwargs):
+        response = self.authenticate(request)
+        if response is not None:
+            return response
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        except BadRequest as error:
+            return error_response(str(error), HTTPStatus.BAD_REQUEST)
+        except Http404:
+            return error_response('Заметка не найдена.', HTTPStatus.NOT_FOUND)
+
+    def rate_limited(self, wait):
+        response = error_response(
+            'Слишком много изменений, повторите позже.',
+            HTTPStatus.TOO_MANY_REQUESTS,
+        )
+        response['Retry-After'] = retry_after(wait)
+        return response
+
+    def get_payload(self):
+        try:
+            payload = json.loads(self.request.body or b'{}')
+        except ValueError:
+            raise BadRequest('Тело запроса должно быть JSON-объектом.')
+        if not isinstance(payload, dict):
+            raise BadRequest('Тело запроса должно быть JSON-объектом.')
+        return payload
+
+    def save_form(self, form, status):
+        """Сохраняет заметку из формы или возвращает ошибки формы."""
+        if form.is_valid():
+            if form.is_unchanged():
+                return note_response(form.instance, status)
+            try:
+                note = form.save()
+            except IntegrityError as error:
+                if not is_slug_conflict(error):
+                    raise
+                form.add_slug_conflict()
+            else:
+                response = note_response(note, status)
+                response['Location'] = reverse(
+                    'notes:api-detail', args=(note.slug,)
+                )
+                return response
+        return error_response(
+            'Ошибка в данных заметки.', HTTPStatus.BAD_REQUEST,
+            errors=form.errors,
+        )
+
+
+class NoteListApi(ApiMixin, generic.View):
+    """Список заметок пользователя по курсору и создание заметки."""
+
+    def get(self, request):
+        paginator = KeysetPaginator(
+            self.get_queryset().only(*LIST_FIELDS, 'updated_at'),
+            settings.NOTES_PAGE_SIZE,
+        )
+        page = paginator.get_page(request.GET.get(paginator.cursor_kwarg))
+        notes = [serialize_note(note, LIST_FIELDS) for note in page]
+        etag = make_etag(*(
+            (note['id'], note['revision']) for note in notes
+        ), page.next_cursor)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = JsonResponse(
+                {'results': notes, 'next': page.next_cursor}
+            )
+            response['ETag'] = etag
+        return response
+
+    def post(self, request):
+        form = NoteForm(data=self.get_payload())
+        form.instance.author = request.user
+        return self.save_form(form, HTTPStatus.CREATED)
+
+
+class NoteDetailApi(ApiMixin, generic.View):
+    """Чтение, изменение и удаление заметки пользователя."""
+
+    def get_object(self, *fields):
+        notes = self.get_queryset()
+        if fields:
+            notes = notes.only(*fields)
+        return get_object_or_404(notes, slug=self.kwargs['slug'])
+
+    def check_preconditions(self, note):
+        """Ответ 304 или 412 по If-None-Match и If-Match, иначе None."""
+        return get_conditional_response(self.request, etag=note_etag(note))
+
+    def get(self, request, slug):
+        if 'HTTP_IF_NONE_MATCH' in request.META:
+            # Для проверки ETag достаточно ревизии, текст не читается.
+            response = self.check_preconditions(
+                self.get_object('id', 'revision')
+            )
+            if response is not None:
+                return response
+        return note_response(self.get_object())
+
+    def put(self, request, slug, partial=False):
+        note = self.get_object()
+        response = self.check_preconditions(note)
+        if response is not None:
+            return response
+        data = serialize_note(note) if partial else {}
+        data.update(self.get_payload())
+        return self.save_form(
+            NoteForm(data=data, instance=note), HTTPStatus.OK
+        )
+
+    def patch(self, request, slug):
+        return self.put(request, slug, partial=True)
+
+    def delete(self, request, slug):
+        note = self.get_object()
+        response = self.check_preconditions(note)
+        if response is not None:
+            return response
+        note.delete()
+        return HttpResponse(status=HTTPStatus.NO_CONTENT)
+
+
+class NoteChangesApi(ApiMixin, generic.View):
+    """Изменения заметок пользователя после ревизии ``since``.
+
+    Ответ содержит не больше ``limit`` изменений по возрастанию ревизии
+    и ревизию, с которой нужно запросить следующую порцию.
+    """
+
+    def get_int(self, name, default):
+        try:
+            value = int(self.request.GET.get(name, default))
+        except ValueError:
+            raise BadRequest(f'Параметр {name} должен быть целым числом.')
+        if value < 0:
+            raise BadRequest(f'Параметр {name} не может быть отрицательным.')
+        return value
+
+    def get(self, request):
+        since = self.get_int('since', 0)
+        limit = min(
+            self.get_int('limit', settings.NOTES_PAGE_SIZE) or 1,
+            settings.NOTES_MAX_PAGE_SIZE,
+        )
+        # Из каждой таблицы берётся на одну запись больше лимита:
+        # если вместе их больше лимита, изменения ещё остались.
+        notes = list(
+            self.get_queryset().filter(revision__gt=since)
+            .order_by('revision')[:limit + 1]
+        )
+        tombstones = list(
+            Tombstone.objects.filter(author=request.user, revision__gt=since)
+            .order_by('revision')[:limit + 1]
+        )
+        changes = sorted(
+            notes + tombstones, key=lambda change: change.revision
+        )[:limit]
+        return JsonResponse({
+            'notes': [
+                serialize_note(change) for change in changes
+                if not isinstance(change, Tombstone)
+            ],
+            'deleted': [
+                {field: getattr(change, field) for field in TOMBSTONE_FIELDS}
+                for change in changes if isinstance(change, Tombstone)
+            ],
+            'revision': changes[-1].revision if changes else since,
+            'has_more': len(notes) + len(tombstones) > limit,
+        })
@@ -1,6 +1,26 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
 
 
 class NotesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'notes'
+
+    def ready(self):
+        from .backends import check_session_cache, invalidate_user
+        from .cache import check_notes_cache
+        from .db import configure_sqlite
+
+        check_session_cache()
+        check_notes_cache()
+        connection_created.connect(
+            configure_sqlite, dispatch_uid='notes.configure_sqlite'
+        )
+        for signal in (post_save, post_delete):
+            signal.connect(
+                invalidate_user,
+                sender=settings.AUTH_USER_MODEL,
+                dispatch_uid='notes.invalidate_user',
+            )
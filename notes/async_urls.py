@@ -0,0 +1,29 @@
+"""Маршруты notes для ASGI: чтение обслуживают асинхронные представления.
+
+Имена и адреса совпадают с notes.urls, поэтому reverse и шаблоны
+работают одинаково под WSGI и ASGI.
+"""
+from django.urls import path
+
+from notes import async_views, urls
+
+app_name = urls.app_name
+
+ASYNC_VIEWS = {
+    'home': async_views.home,
+    'list': async_views.notes_list,
+    'detail': async_views.note_detail,
+    'search': async_views.note_search,
+    'api-list': async_views.api_list,
+    'api-detail': async_views.api_detail,
+    'api-changes': async_views.api_changes,
+}
+
+urlpatterns = [
+    path(
+        str(pattern.pattern),
+        ASYNC_VIEWS.get(pattern.name, pattern.callback),
+        name=pattern.name,
+    )
+    for pattern in urls.urlpatterns
+]
@@ -0,0 +1,51 @@
+"""Асинхронные версии представлений для чтения заметок под ASGI.
+
+В Django 3.2 у ORM ещё нет асинхронного интерфейса, поэтому всё
+представление выполняется за один переход в поток: загрузка
+пользователя, проверка доступа, запросы к базе, включая ленивые
+queryset из контекста шаблона, и рендеринг ответа вместе с фрагментами
+{% cache %}, Markdown текста заметки и сохранением страницы в кеш
+(CachedPageMixin). В цикле событий не выполняется ни ввод-вывод базы,
+ни ввод-вывод кешей. Синхронное представление под ASGI требует
+отдельных переходов в поток для представления и для рендеринга.
+
+Потоковый режим списка (``stream=1``) под ASGI в Django 3.2
+невозможен: ответ собирается целиком в том же потоке.
+"""
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.template.response import SimpleTemplateResponse
+
+from . import api, views
+
+
+def as_async_view(view_class, **initkwargs):
+    """Асинхронное представление из синхронного CBV."""
+    view = view_class.as_view(**initkwargs)
+
+    @sync_to_async
+    def respond(request, *args, **kwargs):
+        response = view(request, *args, **kwargs)
+        if isinstance(response, SimpleTemplateResponse):
+            response.render()
+        elif response.streaming:
+            response = HttpResponse(b''.join(response.streaming_content))
+        return response
+
+    async def async_view(request, *args, **kwargs):
+        return await respond(request, *args, **kwargs)
+
+    async_view.view_class = view_class
+    # API проверяет CSRF сам (ApiMixin.authenticate).
+    async_view.csrf_exempt = getattr(view, 'csrf_exempt', False)
+    async_view.__doc__ = view_class.__doc__
+    return async_view
+
+
+home = as_async_view(views.Home)
+notes_list = as_async_view(views.NotesList)
+note_detail = as_async_view(views.NoteDetail)
+note_search = as_async_view(views.NoteSearch)
+api_list = as_async_view(api.NoteListApi)
+api_detail = as_async_view(api.NoteDetailApi)
+api_changes = as_async_view(api.NoteChangesApi)
@@ -0,0 +1,52 @@
+"""Аутентификация с кешированием пользователя.
+
+AuthenticationMiddleware загружает пользователя сессии на каждом
+запросе. CachedModelBackend берёт его из кеша сессий SESSION_CACHE_ALIAS,
+а запись в кеше удаляется при любом сохранении или удалении
+пользователя, в том числе при смене пароля и блокировке. Вместе
+с сессиями cached_db аутентифицированный запрос не обращается к базе
+ни за сессией, ни за пользователем.
+
+Выход, смена пароля и блокировка должны действовать во всех рабочих
+процессах, поэтому кеш сессий обязан быть общим: с LocMemCache
+приложение не запускается (check_session_cache).
+"""
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+
+USER_KEY = 'notes:user:{user_id}'
+
+
+def get_cache():
+    return caches[settings.SESSION_CACHE_ALIAS]
+
+
+def check_session_cache():
+    """Запрещает кеш сессий, локальный для процесса."""
+    if isinstance(get_cache(), LocMemCache):
+        raise ImproperlyConfigured(
+            f'Кеш сессий {settings.SESSION_CACHE_ALIAS!r} должен быть общим '
+            'для всех рабочих процессов, LocMemCache не подходит.'
+        )
+
+
+def invalidate_user(sender, instance, **kwargs):
+    """Обработчик post_save и post_delete модели пользователя."""
+    get_cache().delete(USER_KEY.format(user_id=instance.pk))
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend, который кеширует пользователя по id."""
+
+    def get_user(self, user_id):
+        cache = get_cache()
+        key = USER_KEY.format(user_id=user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(key, user, settings.NOTES_USER_CACHE_TIMEOUT)
+        return user
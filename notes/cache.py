@@ -0,0 +1,90 @@
+"""Кеш страниц заметок с версией на каждого пользователя.
+
+Ключ страницы содержит id пользователя и текущую версию его заметок.
+Любое изменение заметок пользователя меняет версию, поэтому старые
+страницы больше не находятся и вытесняются из кеша по таймауту.
+
+Версия - случайный токен, а не счётчик: её смена - это одна запись
+без чтения, и два параллельных изменения никогда не дадут одно и то же
+значение. Поэтому схема корректна и для общего файлового кеша
+нескольких рабочих процессов, где ``incr`` не атомарен.
+
+Версия, сменённая в одном процессе, должна действовать во всех,
+поэтому кеш NOTES_CACHE_ALIAS обязан быть общим: с LocMemCache
+приложение не запускается (check_notes_cache).
+"""
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+
+VERSION_KEY = 'notes:version:{user_id}'
+PAGE_KEY = 'notes:page:{user_id}:{version}:{path}'
+
+
+def get_cache():
+    return caches[settings.NOTES_CACHE_ALIAS]
+
+
+def check_notes_cache():
+    """Запрещает кеш страниц, локальный для процесса."""
+    if isinstance(get_cache(), LocMemCache):
+        raise ImproperlyConfigured(
+            f'Кеш заметок {settings.NOTES_CACHE_ALIAS!r} должен быть общим '
+            'для всех рабочих процессов, LocMemCache не подходит.'
+        )
+
+
+def get_version(user_id):
+    """Текущая версия заметок пользователя."""
+    cache = get_cache()
+    key = VERSION_KEY.format(user_id=user_id)
+    version = cache.get(key)
+    if version is None:
+        version = uuid4().hex
+        if not cache.add(key, version, timeout=None):
+            version = cache.get(key, version)
+    return version
+
+
+def bump_version(*user_ids):
+    """Делает устаревшими все закешированные страницы пользователей."""
+    get_cache().set_many(
+        {VERSION_KEY.format(user_id=user_id): uuid4().hex
+         for user_id in user_ids},
+        timeout=None,
+    )
+
+
+def invalidate(*user_ids):
+    """Сбрасывает кеш страниц пользователей сразу и после фиксации.
+
+    Повторный сброс после фиксации транзакции отбрасывает страницы,
+    которые успели закешировать по старым данным до её фиксации.
+    """
+    bump_version(*user_ids)
+    transaction.on_commit(lambda: bump_version(*user_ids))
+
+
+def page_key(user_id, path):
+    """Ключ страницы по текущей версии заметок пользователя.
+
+    Ключ берётся один раз до чтения заметок, и страница сохраняется
+    под ним же: если запись сменит версию во время построения
+    страницы, старая страница окажется под старой версией и больше
+    не найдётся.
+    """
+    return PAGE_KEY.format(
+        user_id=user_id, version=get_version(user_id), path=path
+    )
+
+
+def get_page(key):
+    return get_cache().get(key)
+
+
+def set_page(key, content):
+    get_cache().set(key, content, settings.NOTES_CACHE_TIMEOUT)
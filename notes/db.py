@@ -0,0 +1,72 @@
+"""Настройка SQLite для высокой пропускной способности.
+
+При каждом новом соединении выполняются PRAGMA из NOTES_SQLITE_PRAGMAS:
+WAL позволяет читателям не ждать писателя, synchronous=NORMAL
+в режиме WAL убирает fsync на каждую фиксацию, mmap_size и cache_size
+уменьшают число системных вызовов при чтении. Соединения живут
+CONN_MAX_AGE секунд и переиспользуются между запросами.
+
+SQLite допускает одного писателя. Ожидание блокировки ограничено
+параметром timeout в OPTIONS, а транзакции, которые всё же получили
+"database is locked", повторяет retry_on_locked.
+"""
+import functools
+import random
+import time
+
+from django.conf import settings
+from django.db import OperationalError, connections
+
+from .fields import decompress
+
+LOCKED_MESSAGES = ('database is locked', 'database table is locked')
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    """Обработчик connection_created: применяет PRAGMA к соединению.
+
+    Регистрирует функцию notes_decompress: её вызывают триггеры
+    полнотекстового индекса из миграции 0005, которые действуют,
+    пока не применена 0007.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    connection.connection.create_function(
+        'notes_decompress', 1, decompress, deterministic=True
+    )
+    with connection.cursor() as cursor:
+        for name, value in settings.NOTES_SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def is_locked(error):
+    return any(message in str(error) for message in LOCKED_MESSAGES)
+
+
+def retry_on_locked(func=None, *, using='default'):
+    """Повторяет func, если SQLite ответила "database is locked".
+
+    Повтор возможен только вне транзакции: внутри atomic() ошибка
+    пробрасывается, её обработает внешний уровень. Задержка между
+    попытками растёт экспоненциально со случайной добавкой.
+    """
+    if func is None:
+        return functools.partial(retry_on_locked, using=using)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        attempts = settings.NOTES_SQLITE_LOCK_RETRIES
+        delay = settings.NOTES_SQLITE_LOCK_RETRY_DELAY
+        for attempt in range(attempts + 1):
+            try:
+                return func(*args, **kwargs)
+            except OperationalError as error:
+                if (
+                    attempt == attempts
+                    or not is_locked(error)
+                    or connections[using].in_atomic_block
+                ):
+                    raise
+            time.sleep(delay * 2 ** attempt * (1 + random.random()))
+
+    return wrapper
@@ -0,0 +1,81 @@
+"""Текстовое поле со сжатием больших значений.
+
+Значения длиннее NOTES_COMPRESS_THRESHOLD байт сжимаются алгоритмом
+NOTES_COMPRESS_ALGORITHM и хранятся в том же текстовом столбце
+в base64 с префиксом-маркером. Сжатое значение сохраняется, только
+если оно короче исходного. При чтении из базы значение распаковывается,
+поэтому формы, шаблоны и админка работают с обычной строкой.
+
+Условия по содержимому столбца (``icontains`` и т.п.) для сжатых
+значений не работают. Полнотекстовый индекс получает распакованный
+текст из Python (см. notes.search).
+"""
+import base64
+import lzma
+import zlib
+
+from django.conf import settings
+from django.db import models
+
+MARKER = '\x01'
+PLAIN = MARKER + 'p'
+CODECS = {
+    'zlib': (MARKER + 'z', zlib.compress, zlib.decompress),
+    'lzma': (MARKER + 'x', lzma.compress, lzma.decompress),
+}
+DECOMPRESSORS = {
+    prefix: decompressor for prefix, _, decompressor in CODECS.values()
+}
+PREFIX_LENGTH = 2
+
+
+def compress(value, algorithm=None, threshold=None):
+    """Значение для хранения в базе."""
+    if threshold is None:
+        threshold = settings.NOTES_COMPRESS_THRESHOLD
+    if threshold is not None and len(value) >= threshold:
+        data = value.encode()
+        if len(data) >= threshold:
+            prefix, compressor, _ = CODECS[
+                algorithm or settings.NOTES_COMPRESS_ALGORITHM
+            ]
+            packed = prefix + base64.b64encode(compressor(data)).decode()
+            if len(packed) < len(data):
+                return packed
+    if value.startswith(MARKER):
+        # Исходный текст с маркером экранируется, чтобы его
+        # не приняли за сжатый.
+        return PLAIN + value
+    return value
+
+
+def stored_as_is(value, threshold=None):
+    """True, если compress заведомо вернёт значение без изменений."""
+    if threshold is None:
+        threshold = settings.NOTES_COMPRESS_THRESHOLD
+    return not value.startswith(MARKER) and (
+        threshold is None or len(value) < threshold
+    )
+
+
+def decompress(value):
+    """Исходный текст из значения в базе."""
+    if not value or not value.startswith(MARKER):
+        return value
+    prefix, data = value[:PREFIX_LENGTH], value[PREFIX_LENGTH:]
+    if prefix == PLAIN:
+        return data
+    return DECOMPRESSORS[prefix](base64.b64decode(data)).decode()
+
+
+class CompressedTextField(models.TextField):
+    """TextField, который сжимает большие значения в базе."""
+
+    def from_db_value(self, value, expression, connection):
+        return decompress(value)
+
+    def get_prep_value(self, value):
+        value = super().get_prep_value(value)
+        if value is None:
+            return value
+        return compress(value)
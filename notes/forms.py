@@ -1,6 +1,5 @@
-from pytils.translit import slugify
-
 from django import forms
+from django.conf import settings
 from django.core.exceptions import ValidationError
 
 from .models import Note
@@ -15,15 +14,97 @@ class NoteForm(forms.ModelForm):
         model = Note
         fields = ('title', 'text', 'slug')
 
-    def clean_slug(self):
-        """Обрабатывает случай, если slug не уникален."""
-        cleaned_data = super().clean()
-        slug = cleaned_data.get('slug')
-        if not slug:
-            title = cleaned_data.get('title')
-            slug = slugify(title)[:100]
-        if Note.objects.filter(
-                slug=slug
-        ).exclude(id=self.instance.pk).exists():
-            raise ValidationError(slug + WARNING)
-        return slug
+    def validate_unique(self):
+        """Уникальность slug проверяет база данных при сохранении.
+
+        Пустой slug подбирается в Note.save, а конфликт заданного
+        пользователем slug превращается в ошибку формы через
+        add_slug_conflict.
+        """
+        exclude = [*self._get_validation_exclusions(), 'slug']
+        try:
+            self.instance.validate_unique(exclude=exclude)
+        except ValidationError as error:
+            self._update_errors(error)
+
+    def add_slug_conflict(self):
+        """Ошибка формы для slug, который уже занят."""
+        self.add_error('slug', self.cleaned_data['slug'] + WARNING)
+
+    def is_unchanged(self):
+        """Отправка существующей заметки без изменений, запись не нужна.
+
+        Так повторные отправки одной и той же правки не занимают базу
+        и не создают новых ревизий.
+        """
+        return (
+            settings.NOTES_SKIP_UNCHANGED_WRITES
+            and self.instance.pk is not None
+            and not self.has_changed()
+        )
+
+
+class BaseNoteBulkFormSet(forms.BaseModelFormSet):
+    """Набор форм для изменения нескольких заметок одним запросом."""
+
+    def get_queryset(self):
+        # Страница KeysetPaginator - уже загруженный список заметок.
+        if isinstance(self.queryset, list):
+            return self.queryset
+        return super().get_queryset()
+
+    def add_fields(self, form, index):
+        super().add_fields(form, index)
+        # Заметки форм набор загружает одним запросом, а ModelChoiceField
+        # проверял бы каждый id ещё одним.
+        form.fields[self.model._meta.pk.name] = forms.IntegerField(
+            initial=form.instance.pk, required=False,
+            widget=forms.HiddenInput,
+        )
+        # Подбор slug по заголовку выполняется по одной заметке,
+        # поэтому в наборе slug обязателен.
+        form.fields['slug'].required = True
+
+    def clean(self):
+        """Проверяет новые slug всех форм одним запросом."""
+        if any(self.errors):
+            return
+        changed = {}
+        for form in self.forms:
+            if form.instance.pk is None:
+                raise ValidationError(
+                    'Можно изменять только существующие заметки.'
+                )
+            if 'slug' not in form.changed_data:
+                continue
+            slug = form.cleaned_data['slug']
+            if slug in changed:
+                form.add_error('slug', slug + WARNING)
+            else:
+                changed[slug] = form
+        # Slug, который поменялся у формы, принадлежит другой
+        # заметке, даже если она сама есть в наборе.
+        taken = Note.objects.filter(slug__in=changed).values_list(
+            'slug', flat=True
+        )
+        for slug in taken:
+            changed[slug].add_error('slug', slug + WARNING)
+
+    def save(self, commit=True):
+        """Сохраняет изменённые заметки одним bulk_update."""
+        notes = [
+            form.instance for form in self.forms if not form.is_unchanged()
+        ]
+        Note.objects.bulk_save(notes, NoteForm.Meta.fields)
+        return notes
+
+
+NoteBulkFormSet = forms.modelformset_factory(
+    Note,
+    form=NoteForm,
+    formset=BaseNoteBulkFormSet,
+    extra=0,
+    max_num=settings.NOTES_BULK_EDIT_SIZE,
+    absolute_max=settings.NOTES_BULK_EDIT_SIZE,
+    validate_max=True,
+)
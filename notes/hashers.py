@@ -0,0 +1,122 @@
+"""Хэширование паролей с настраиваемой стоимостью.
+
+Параметры хэшеров читаются из настроек NOTES_SCRYPT_*, NOTES_ARGON2_*
+и NOTES_PBKDF2_ITERATIONS при каждом вызове. Если у сохранённого хэша
+другие параметры или другой алгоритм, чем у первого хэшера
+в PASSWORD_HASHERS, Django пересчитывает хэш при следующем входе
+пользователя (check_password вызывает set_password и сохраняет его).
+Стоимость хэширования на ядро замеряет команда benchmark_hashers.
+"""
+import base64
+import hashlib
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.utils.crypto import constant_time_compare
+from django.utils.translation import gettext_noop as _
+
+
+class ScryptPasswordHasher(hashers.BasePasswordHasher):
+    """scrypt из стандартной библиотеки, формат хэша как в Django 4.0.
+
+    ``scrypt$<n>$<соль>$<r>$<p>$<хэш>``: хэши переносятся без пересчёта
+    на встроенный ScryptPasswordHasher новых версий Django.
+    """
+
+    algorithm = 'scrypt'
+    dklen = 64
+
+    @property
+    def work_factor(self):
+        return settings.NOTES_SCRYPT_N
+
+    @property
+    def block_size(self):
+        return settings.NOTES_SCRYPT_R
+
+    @property
+    def parallelism(self):
+        return settings.NOTES_SCRYPT_P
+
+    def encode(self, password, salt, n=None, r=None, p=None):
+        assert password is not None
+        assert salt and '$' not in salt
+        n = n or self.work_factor
+        r = r or self.block_size
+        p = p or self.parallelism
+        hash = hashlib.scrypt(
+            password.encode(), salt=salt.encode(), n=n, r=r, p=p,
+            # OpenSSL по умолчанию ограничивает память 32 МБ, а scrypt
+            # нужно 128 * n * r * p байт и немного сверху.
+            maxmem=256 * n * r * p, dklen=self.dklen,
+        )
+        hash = base64.b64encode(hash).decode('ascii').strip()
+        return f'{self.algorithm}${n}${salt}${r}${p}${hash}'
+
+    def decode(self, encoded):
+        algorithm, n, salt, r, p, hash = encoded.split('$', 5)
+        assert algorithm == self.algorithm
+        return {
+            'algorithm': algorithm,
+            'work_factor': int(n),
+            'salt': salt,
+            'block_size': int(r),
+            'parallelism': int(p),
+            'hash': hash,
+        }
+
+    def verify(self, password, encoded):
+        decoded = self.decode(encoded)
+        encoded_2 = self.encode(
+            password, decoded['salt'], decoded['work_factor'],
+            decoded['block_size'], decoded['parallelism'],
+        )
+        return constant_time_compare(encoded, encoded_2)
+
+    def safe_summary(self, encoded):
+        decoded = self.decode(encoded)
+        return {
+            _('algorithm'): decoded['algorithm'],
+            _('work factor'): decoded['work_factor'],
+            _('block size'): decoded['block_size'],
+            _('parallelism'): decoded['parallelism'],
+            _('salt'): hashers.mask_hash(decoded['salt']),
+            _('hash'): hashers.mask_hash(decoded['hash']),
+        }
+
+    def must_update(self, encoded):
+        decoded = self.decode(encoded)
+        return (
+            (decoded['work_factor'], decoded['block_size'],
+             decoded['parallelism'])
+            != (self.work_factor, self.block_size, self.parallelism)
+            or hashers.must_update_salt(decoded['salt'], self.salt_entropy)
+        )
+
+    def harden_runtime(self, password, encoded):
+        # Досчитать scrypt до новой стоимости по частям нельзя.
+        pass
+
+
+class Argon2PasswordHasher(hashers.Argon2PasswordHasher):
+    """Argon2 с параметрами из настроек, нужен пакет argon2-cffi."""
+
+    @property
+    def time_cost(self):
+        return settings.NOTES_ARGON2_TIME_COST
+
+    @property
+    def memory_cost(self):
+        return settings.NOTES_ARGON2_MEMORY_COST
+
+    @property
+    def parallelism(self):
+        return settings.NOTES_ARGON2_PARALLELISM
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    """PBKDF2-SHA256 с числом итераций из настроек."""
+
+    @property
+    def iterations(self):
+        return settings.NOTES_PBKDF2_ITERATIONS
@@ -0,0 +1,177 @@
+"""Учёт SQL-запросов и времени обработки запросов по представлениям.
+
+InstrumentationMiddleware включается настройкой NOTES_INSTRUMENTATION.
+Для каждого запроса она считает число SQL-запросов, время в базе,
+время рендеринга шаблона и общее время и добавляет их в гистограммы
+по имени маршрута (``notes:list``, ``notes:detail`` и т.д.).
+Гистограммы хранятся в памяти процесса и отдаются представлением
+``metrics``.
+
+Настройка NOTES_QUERY_BUDGETS задаёт для маршрутов максимальное число
+SQL-запросов. Превышение пишется в лог, а при NOTES_QUERY_BUDGET_STRICT
+вызывает QueryBudgetExceeded - так тесты ловят N+1 запросы.
+"""
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed, PermissionDenied
+from django.db import connections
+from django.http import JsonResponse
+
+logger = logging.getLogger(__name__)
+
+QUERY_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100)
+TIME_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+UNRESOLVED = '<unresolved>'
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Представление выполнило больше SQL-запросов, чем разрешено."""
+
+
+class Histogram:
+    """Гистограмма с фиксированными верхними границами корзин."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+
+    def as_dict(self):
+        bounds = [*self.buckets, '+Inf']
+        return {
+            'count': self.count,
+            'sum': self.total,
+            'buckets': dict(zip(map(str, bounds), self.counts)),
+        }
+
+
+class Metrics:
+    """Гистограммы по маршрутам в памяти процесса."""
+
+    FIELDS = {
+        'queries': QUERY_BUCKETS,
+        'db_ms': TIME_BUCKETS_MS,
+        'render_ms': TIME_BUCKETS_MS,
+        'total_ms': TIME_BUCKETS_MS,
+    }
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.views = {}
+
+    def record(self, view_name, **values):
+        with self.lock:
+            histograms = self.views.get(view_name)
+            if histograms is None:
+                histograms = self.views[view_name] = {
+                    name: Histogram(buckets)
+                    for name, buckets in self.FIELDS.items()
+                }
+            for name, value in values.items():
+                histograms[name].observe(value)
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                view_name: {
+                    name: histogram.as_dict()
+                    for name, histogram in histograms.items()
+                }
+                for view_name, histograms in self.views.items()
+            }
+
+    def reset(self):
+        with self.lock:
+            self.views.clear()
+
+
+METRICS = Metrics()
+
+
+class QueryCounter:
+    """Обёртка выполнения SQL, которая считает запросы и их время."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+
+
+def get_view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match else UNRESOLVED
+
+
+def check_budget(view_name, queries):
+    budget = settings.NOTES_QUERY_BUDGETS.get(view_name)
+    if budget is None or queries <= budget:
+        return
+    message = (
+        f'{view_name}: {queries} SQL-запросов при бюджете {budget}'
+    )
+    if settings.NOTES_QUERY_BUDGET_STRICT:
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
+
+
+class InstrumentationMiddleware:
+    """Собирает метрики запроса по имени маршрута."""
+
+    def __init__(self, get_response):
+        if not settings.NOTES_INSTRUMENTATION:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        counter = QueryCounter()
+        request.render_ms = 0
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+            response = self.get_response(request)
+        total = time.perf_counter() - start
+        view_name = get_view_name(request)
+        METRICS.record(
+            view_name,
+            queries=counter.count,
+            db_ms=counter.duration * 1000,
+            render_ms=request.render_ms,
+            total_ms=total * 1000,
+        )
+        check_budget(view_name, counter.count)
+        return response
+
+    def process_template_response(self, request, response):
+        start = time.perf_counter()
+
+        def rendered(response):
+            request.render_ms = (time.perf_counter() - start) * 1000
+
+        response.add_post_render_callback(rendered)
+        return response
+
+
+def metrics_view(request):
+    """Накопленные метрики процесса, только для персонала."""
+    if not request.user.is_staff:
+        raise PermissionDenied
+    return JsonResponse(METRICS.snapshot())
@@ -0,0 +1,242 @@
+"""Очередь фоновых задач в базе данных.
+
+Задача - строка модели Job с именем обработчика и параметрами в JSON.
+Команда ``run_jobs`` запускает рабочие процессы, которые забирают
+задачи из очереди и выполняют их. Задача забирается условным UPDATE
+``status = queued``: из нескольких рабочих его выполнит только один,
+блокировки строк для этого не нужны, поэтому схема работает и в SQLite.
+
+Массовые операции над заметками выполняются пачками по
+NOTES_JOB_CHUNK_SIZE, каждая в своей короткой транзакции, с паузой
+NOTES_JOB_CHUNK_PAUSE между ними: запросы пользователей успевают
+записать свои изменения и не ждут окончания всей операции. После
+каждой пачки обновляется прогресс задачи, а пачку, которой SQLite
+ответила "database is locked", повторяет retry_on_locked.
+Обработчики идемпотентны:
+задачу, рабочий процесс которой упал, можно просто выполнить заново.
+"""
+import logging
+import os
+import socket
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import models, transaction
+from django.utils import timezone
+
+from .cache import invalidate
+from .db import retry_on_locked
+from .models import Job, Note, Tombstone, allocate_revisions
+
+logger = logging.getLogger(__name__)
+
+HANDLERS = {}
+
+
+def register(kind):
+    """Регистрирует обработчик задач вида kind."""
+    def decorator(handler):
+        HANDLERS[kind] = handler
+        return handler
+    return decorator
+
+
+def enqueue(kind, user=None, **payload):
+    """Ставит задачу в очередь."""
+    if kind not in HANDLERS:
+        raise ValueError(f'Неизвестный вид задачи: {kind}')
+    return Job.objects.create(kind=kind, user=user, payload=payload)
+
+
+def worker_name():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def claim(worker=None):
+    """Забирает самую старую задачу из очереди или возвращает None."""
+    queued = Job.objects.filter(status=Job.Status.QUEUED)
+    while True:
+        job_id = queued.order_by('id').values_list('id', flat=True).first()
+        if job_id is None:
+            return None
+        claimed = queued.filter(pk=job_id).update(
+            status=Job.Status.RUNNING,
+            worker=worker or worker_name(),
+            updated_at=timezone.now(),
+        )
+        if claimed:
+            return Job.objects.get(pk=job_id)
+
+
+def requeue_stale(seconds=None):
+    """Возвращает в очередь задачи, прогресс которых давно не менялся."""
+    if seconds is None:
+        seconds = settings.NOTES_JOB_STALE_SECONDS
+    cutoff = timezone.now() - timedelta(seconds=seconds)
+    return Job.objects.filter(
+        status=Job.Status.RUNNING, updated_at__lt=cutoff
+    ).update(status=Job.Status.QUEUED, worker='')
+
+
+def report_progress(job, done, total=None):
+    """Сохраняет прогресс задачи, он же служит признаком жизни."""
+    job.done = done
+    if total is not None:
+        job.total = total
+    Job.objects.filter(pk=job.pk).update(
+        done=job.done, total=job.total, updated_at=timezone.now()
+    )
+
+
+def run(job):
+    """Выполняет забранную задачу и сохраняет её итог."""
+    try:
+        HANDLERS[job.kind](job, **job.payload)
+    except Exception:
+        logger.exception('Задача %s завершилась с ошибкой', job)
+        job.status, job.error = Job.Status.FAILED, traceback.format_exc()
+    else:
+        job.status, job.error = Job.Status.DONE, ''
+    Job.objects.filter(pk=job.pk).update(
+        status=job.status, error=job.error, updated_at=timezone.now()
+    )
+    return job
+
+
+def work(once=False, poll_interval=None, worker=None):
+    """Цикл рабочего: выполняет задачи, пока они есть.
+
+    При once=True выходит, когда очередь пуста, иначе ждёт новые задачи.
+    Задачи упавших рабочих возвращаются в очередь при запуске и затем
+    не чаще раза в половину NOTES_JOB_STALE_SECONDS.
+    Возвращает число выполненных задач.
+    """
+    if poll_interval is None:
+        poll_interval = settings.NOTES_JOB_POLL_INTERVAL
+    worker = worker or worker_name()
+    count = 0
+    next_requeue = 0
+    while True:
+        if time.monotonic() >= next_requeue:
+            requeued = requeue_stale()
+            if requeued:
+                logger.warning('Возвращено в очередь задач: %s', requeued)
+            next_requeue = (
+                time.monotonic() + settings.NOTES_JOB_STALE_SECONDS / 2
+            )
+        job = claim(worker)
+        if job is None:
+            if once:
+                return count
+            time.sleep(poll_interval)
+            continue
+        run(job)
+        count += 1
+
+
+def chunks(queryset):
+    """Пачки id из queryset, пока он не опустеет.
+
+    queryset перечитывается перед каждой пачкой, поэтому обработанные
+    строки должны из него выпадать.
+    """
+    size = settings.NOTES_JOB_CHUNK_SIZE
+    while True:
+        ids = list(
+            queryset.order_by('id').values_list('id', flat=True)[:size]
+        )
+        if not ids:
+            return
+        yield ids
+        time.sleep(settings.NOTES_JOB_CHUNK_PAUSE)
+
+
+def select_notes(job, note_ids):
+    notes = Note.objects.filter(author_id=job.user_id)
+    if note_ids is not None:
+        notes = notes.filter(pk__in=note_ids)
+    return notes
+
+
+def delete_in_chunks(job, notes):
+    done = 0
+    report_progress(job, done, notes.count())
+    for ids in chunks(notes):
+        # Удаление через queryset оставляет надгробия и сбрасывает кеш.
+        retry_on_locked(Note.objects.filter(pk__in=ids).delete)()
+        done += len(ids)
+        report_progress(job, done)
+
+
+@register('delete_notes')
+def delete_notes(job, note_ids=None):
+    """Удаляет заметки пользователя задачи (все или note_ids)."""
+    delete_in_chunks(job, select_notes(job, note_ids))
+
+
+@register('move_notes')
+def move_notes(job, to_user_id, note_ids=None):
+    """Передаёт заметки пользователя задачи другому пользователю.
+
+    Старый владелец получает надгробия, новый - заметки с новыми
+    ревизиями, поэтому клиенты синхронизации обоих видят изменение.
+    """
+    if to_user_id == job.user_id:
+        raise ValueError('Заметки уже принадлежат этому пользователю.')
+    get_user_model().objects.get(pk=to_user_id)
+    notes = select_notes(job, note_ids)
+    done = 0
+    report_progress(job, done, notes.count())
+    for ids in chunks(notes):
+        move_chunk(ids, to_user_id)
+        invalidate(job.user_id, to_user_id)
+        done += len(ids)
+        report_progress(job, done)
+
+
+@retry_on_locked
+@transaction.atomic
+def move_chunk(ids, to_user_id):
+    moved = list(
+        Note.objects.filter(pk__in=ids).only('id', 'slug', 'author_id')
+    )
+    Tombstone.objects.create_for([
+        Tombstone(note_id=note.id, slug=note.slug, author_id=note.author_id)
+        for note in moved
+    ])
+    now = timezone.now()
+    for note, revision in zip(moved, allocate_revisions(len(moved))):
+        note.author_id = to_user_id
+        note.revision = revision
+        note.updated_at = now
+    Note.objects.bulk_update(moved, ['author', 'revision', 'updated_at'])
+
+
+@register('delete_account')
+def delete_account(job, user_id):
+    """Удаляет пользователя, предварительно удалив его данные пачками.
+
+    Без этого каскадное удаление всех заметок и надгробий выполнилось
+    бы одной транзакцией и надолго заблокировало базу.
+    """
+    user = get_user_model().objects.filter(pk=user_id).first()
+    if user is None:
+        return
+    notes = Note.objects.filter(author=user)
+    done = 0
+    report_progress(job, done, notes.count())
+    for ids in chunks(notes):
+        # Базовый QuerySet.delete: надгробия удаляемому
+        # пользователю не нужны.
+        retry_on_locked(models.QuerySet.delete)(
+            Note.objects.filter(pk__in=ids)
+        )
+        done += len(ids)
+        report_progress(job, done)
+    for ids in chunks(Tombstone.objects.filter(author=user)):
+        retry_on_locked(Tombstone.objects.filter(pk__in=ids).delete)()
+    retry_on_locked(user.delete)()
+    invalidate(user_id)
@@ -0,0 +1,21 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from notes.tokens import make_token
+
+
+class Command(BaseCommand):
+    help = 'Выводит токен JSON API пользователя.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+
+    def handle(self, *args, **options):
+        user_model = get_user_model()
+        try:
+            user = user_model.objects.get(username=options['username'])
+        except user_model.DoesNotExist:
+            raise CommandError(
+                f'Пользователь {options["username"]!r} не найден.'
+            )
+        self.stdout.write(make_token(user))
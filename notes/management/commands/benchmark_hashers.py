@@ -0,0 +1,125 @@
+import json
+import multiprocessing
+import os
+import time
+
+from django.conf import settings
+from django.contrib.auth.hashers import get_hasher, get_hashers
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+PASSWORD = 'correct horse battery staple'
+
+
+def hash_for(algorithm, duration):
+    """Хэширует пароль duration секунд, возвращает число хэшей и время."""
+    hasher = get_hasher(algorithm)
+    count = 0
+    start = time.perf_counter()
+    while True:
+        hasher.encode(PASSWORD, hasher.salt())
+        count += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= duration:
+            return count, elapsed
+
+
+def parse_setting(value):
+    name, sep, number = value.partition('=')
+    if not sep or not name.startswith('NOTES_') or not number.isdigit():
+        raise CommandError(f'Ожидается NOTES_<ИМЯ>=<число>: {value}.')
+    return name, int(number)
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет хэши паролей в секунду на ядро для хэшеров '
+        'из PASSWORD_HASHERS.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'algorithms', nargs='*',
+            help='Алгоритмы хэшеров, по умолчанию все из PASSWORD_HASHERS.',
+        )
+        parser.add_argument(
+            '--processes', type=int, default=os.cpu_count(),
+            help='Число процессов, по умолчанию по числу ядер.',
+        )
+        parser.add_argument('--duration', type=float, default=2.0,
+                            help='Секунд замера на каждый хэшер.')
+        parser.add_argument(
+            '--set', action='append', default=[], metavar='NAME=VALUE',
+            help='Параметр хэшера для замера, например NOTES_SCRYPT_N=32768.',
+        )
+        parser.add_argument('--json', action='store_true')
+
+    def benchmark(self, algorithm, processes, duration):
+        hasher = get_hasher(algorithm)
+        if hasher.library:
+            try:
+                hasher._load_library()
+            except ValueError as error:
+                return {'algorithm': algorithm, 'skipped': str(error)}
+        summary = hasher.safe_summary(hasher.encode(PASSWORD, hasher.salt()))
+        # Хэшеры читают параметры из настроек, дочерние процессы
+        # получают их вместе с памятью родителя.
+        context = multiprocessing.get_context('fork')
+        with context.Pool(processes) as pool:
+            results = pool.starmap(
+                hash_for, [(algorithm, duration)] * processes
+            )
+        per_process = [count / elapsed for count, elapsed in results]
+        total = sum(per_process)
+        return {
+            'algorithm': algorithm,
+            'params': {
+                str(name): value for name, value in summary.items()
+                if name not in ('algorithm', 'salt', 'hash')
+            },
+            'processes': processes,
+            'hashes_per_second': total,
+            'hashes_per_second_per_core': total / processes,
+            'ms_per_hash': processes * 1000 / total,
+        }
+
+    def handle(self, *args, **options):
+        if options['processes'] < 1:
+            raise CommandError('Нужен хотя бы один процесс.')
+        overrides = dict(map(parse_setting, options['set']))
+        with override_settings(**overrides):
+            algorithms = options['algorithms'] or [
+                hasher.algorithm for hasher in get_hashers()
+            ]
+            results = []
+            for algorithm in algorithms:
+                try:
+                    get_hasher(algorithm)
+                except ValueError as error:
+                    raise CommandError(error)
+                results.append(self.benchmark(
+                    algorithm, options['processes'], options['duration']
+                ))
+        if options['json']:
+            self.stdout.write(json.dumps(results, ensure_ascii=False))
+            return
+        for result in results:
+            if 'skipped' in result:
+                self.stdout.write(self.style.WARNING(
+                    f'{result["algorithm"]}: пропущен - {result["skipped"]}'
+                ))
+                continue
+            params = ', '.join(
+                f'{name}={value}' for name, value in result['params'].items()
+            )
+            self.stdout.write(self.style.SUCCESS(
+                f'{result["algorithm"]} ({params}): '
+                f'{result["hashes_per_second_per_core"]:.1f} хэшей/с '
+                f'на ядро, {result["hashes_per_second"]:.1f} хэшей/с '
+                f'на {result["processes"]} процессах, '
+                f'{result["ms_per_hash"]:.1f} мс на хэш.'
+            ))
+        self.stdout.write(
+            f'Ядер: {os.cpu_count()}, первый хэшер: '
+            f'{settings.PASSWORD_HASHERS[0]}.'
+        )
@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from notes.models import Note
+from notes.transfer import FORMATS, export_rows, guess_format, write_rows
+
+
+class Command(BaseCommand):
+    help = 'Экспортирует заметки в файл JSON Lines или CSV.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл или "-" для stdout.')
+        parser.add_argument('--format', choices=FORMATS)
+        parser.add_argument('--author', help='Только заметки этого автора.')
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or guess_format(path)
+        notes = Note.objects.all()
+        if options['author']:
+            notes = notes.filter(author__username=options['author'])
+        rows = export_rows(notes, options['chunk_size'])
+        start = time.perf_counter()
+        if path == '-':
+            count = write_rows(self.stdout, fmt, rows)
+            report = self.stderr
+        else:
+            with open(path, 'w', encoding='utf-8', newline='') as file:
+                count = write_rows(file, fmt, rows)
+            report = self.stdout
+        elapsed = time.perf_counter() - start
+        report.write(
+            f'Экспортировано: {count}, '
+            f'{count / max(elapsed, 1e-9):.0f} строк/с.'
+        )
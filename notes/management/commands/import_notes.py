@@ -0,0 +1,47 @@
+import sys
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from notes.transfer import FORMATS, Importer, guess_format, read_rows
+
+
+class Command(BaseCommand):
+    help = 'Импортирует заметки из файла JSON Lines или CSV.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл или "-" для stdin.')
+        parser.add_argument('--format', choices=FORMATS)
+        parser.add_argument(
+            '--author',
+            help='Автор для строк, в которых автор не указан.',
+        )
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        default_author = None
+        if options['author']:
+            default_author = get_user_model().objects.filter(
+                username=options['author']
+            ).first()
+            if default_author is None:
+                raise CommandError(
+                    f'Пользователь {options["author"]} не найден.'
+                )
+        path = options['path']
+        fmt = options['format'] or guess_format(path)
+        importer = Importer(default_author, options['chunk_size'])
+        start = time.perf_counter()
+        if path == '-':
+            importer.run(read_rows(sys.stdin, fmt))
+        else:
+            with open(path, encoding='utf-8', newline='') as file:
+                importer.run(read_rows(file, fmt))
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f'Импортировано: {importer.imported}, '
+            f'пропущено: {importer.skipped}, '
+            f'переименовано: {importer.renamed}, '
+            f'{importer.imported / max(elapsed, 1e-9):.0f} строк/с.'
+        ))
@@ -0,0 +1,87 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from notes.models import Note
+from notes.rendering import (
+    RENDERER_VERSION, get_shared_cache, render_batch, render_key
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Заранее рендерит Markdown всех заметок в общий кеш, например '
+        'после обновления рендерера.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count(),
+            help='Число процессов, по умолчанию по числу ядер.',
+        )
+        parser.add_argument('--chunk-size', type=int, default=200,
+                            help='Заметок на одно задание процесса.')
+        parser.add_argument('--force', action='store_true',
+                            help='Рендерить и то, что уже есть в кеше.')
+
+    def batches(self, cache, chunk_size, force):
+        """Пачки пар (ключ, текст), которых ещё нет в кеше."""
+        texts = Note.objects.values_list('text', flat=True).iterator(
+            chunk_size=chunk_size
+        )
+        while True:
+            chunk = list(islice(texts, chunk_size))
+            if not chunk:
+                return
+            items = {render_key(text): text for text in chunk}
+            self.total += len(chunk)
+            # Повторы между пачками не отслеживаются: множество ключей
+            # росло бы с таблицей. Их отсеет кеш, если пачка с тем же
+            # текстом уже сохранена.
+            cached = set() if force else set(cache.get_many(list(items)))
+            batch = [
+                (key, text) for key, text in items.items()
+                if key not in cached
+            ]
+            # Повторы текстов в пачке и уже отрендеренные в кеше.
+            self.skipped += len(chunk) - len(batch)
+            if batch:
+                yield batch
+
+    def handle(self, *args, **options):
+        cache = get_shared_cache()
+        if cache is None:
+            raise CommandError(
+                'Общий кеш не настроен: NOTES_MARKDOWN_CACHE_ALIAS.'
+            )
+        if options['workers'] < 1:
+            raise CommandError('Нужен хотя бы один процесс.')
+        self.total = self.skipped = 0
+        rendered = 0
+
+        def store(future):
+            cache.set_many(
+                dict(future.result()), settings.NOTES_MARKDOWN_CACHE_TIMEOUT
+            )
+            return len(future.result())
+
+        # Заданий в очереди не больше двух на процесс, чтобы не
+        # держать в памяти тексты всех заметок.
+        pending = deque()
+        with ProcessPoolExecutor(max_workers=options['workers']) as executor:
+            for batch in self.batches(
+                cache, options['chunk_size'], options['force']
+            ):
+                pending.append(executor.submit(render_batch, batch))
+                if len(pending) >= 2 * options['workers']:
+                    rendered += store(pending.popleft())
+            while pending:
+                rendered += store(pending.popleft())
+        self.stdout.write(self.style.SUCCESS(
+            f'Версия рендерера {RENDERER_VERSION}: заметок {self.total}, '
+            f'отрендерено {rendered}, пропущено {self.skipped}.'
+        ))
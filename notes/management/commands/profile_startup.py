@@ -0,0 +1,140 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Выполняется в чистом интерпретаторе с -X importtime: замеряет
+# django.setup(), создание WSGI-приложения (с прогревом шаблонов)
+# и первый запрос к нему.
+PROBE = '''
+import io, json, sys, time
+start = time.perf_counter()
+import django
+django.setup()
+setup = time.perf_counter()
+from yanote.wsgi import application
+from wsgiref.util import setup_testing_defaults
+wsgi = time.perf_counter()
+environ = {'PATH_INFO': sys.argv[1], 'wsgi.input': io.BytesIO()}
+setup_testing_defaults(environ)
+statuses = []
+body = application(environ, lambda status, headers: statuses.append(status))
+b''.join(body)
+done = time.perf_counter()
+print(json.dumps({
+    'status': statuses[0],
+    'setup_ms': (setup - start) * 1000,
+    'wsgi_ms': (wsgi - setup) * 1000,
+    'first_request_ms': (done - wsgi) * 1000,
+    'total_ms': (done - start) * 1000,
+}))
+'''
+TIMINGS = ('setup_ms', 'wsgi_ms', 'first_request_ms', 'total_ms')
+
+
+def parse_importtime(stderr):
+    """Собственное время импорта модулей в микросекундах."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|')
+        if self_us.strip().isdigit():
+            modules[name.strip()] = int(self_us)
+    return modules
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет время импорта, django.setup() и первого запроса '
+        'для модулей настроек.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'settings_modules', nargs='*',
+            help=(
+                'Модули настроек, по умолчанию текущий '
+                'и yanote.settings_slim.'
+            ),
+        )
+        parser.add_argument('--path', default='/',
+                            help='Адрес первого запроса.')
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--top', type=int, default=15,
+                            help='Сколько самых медленных модулей показать.')
+        parser.add_argument('--json', action='store_true')
+
+    def probe(self, settings_module, path):
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': settings_module}
+        process = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', PROBE, path],
+            cwd=settings.BASE_DIR, env=env,
+            capture_output=True, text=True,
+        )
+        if process.returncode:
+            raise CommandError(
+                f'{settings_module}: запуск завершился ошибкой\n'
+                f'{process.stderr[-2000:]}'
+            )
+        lines = process.stdout.strip().splitlines()
+        return json.loads(lines[-1]), parse_importtime(process.stderr)
+
+    def profile(self, settings_module, options):
+        runs, imports = [], defaultdict(list)
+        for _ in range(options['repeat']):
+            timings, modules = self.probe(settings_module, options['path'])
+            runs.append(timings)
+            for name, self_us in modules.items():
+                imports[name].append(self_us)
+        packages = defaultdict(float)
+        modules = {}
+        for name, values in imports.items():
+            median_ms = statistics.median(values) / 1000
+            modules[name] = median_ms
+            packages['.'.join(name.split('.')[:3])] += median_ms
+        return {
+            'status': runs[-1]['status'],
+            **{
+                name: statistics.median(run[name] for run in runs)
+                for name in TIMINGS
+            },
+            'modules_imported': len(modules),
+            'import_ms': sum(modules.values()),
+            'slowest_modules': dict(sorted(
+                modules.items(), key=lambda item: -item[1]
+            )[:options['top']]),
+            'slowest_packages': dict(sorted(
+                packages.items(), key=lambda item: -item[1]
+            )[:options['top']]),
+        }
+
+    def handle(self, *args, **options):
+        settings_modules = options['settings_modules'] or [
+            os.environ.get('DJANGO_SETTINGS_MODULE', 'yanote.settings'),
+            'yanote.settings_slim',
+        ]
+        result = {
+            module: self.profile(module, options)
+            for module in dict.fromkeys(settings_modules)
+        }
+        if options['json']:
+            self.stdout.write(json.dumps(result, indent=2))
+            return
+        for module, profile in result.items():
+            self.stdout.write(self.style.MIGRATE_HEADING(module))
+            self.stdout.write(
+                f'  ответ: {profile["status"]}, '
+                f'модулей: {profile["modules_imported"]}, '
+                f'импорт: {profile["import_ms"]:.1f} мс'
+            )
+            for name in TIMINGS:
+                self.stdout.write(f'  {name}: {profile[name]:.1f}')
+            self.stdout.write('  Самые медленные пакеты, мс:')
+            for name, value in profile['slowest_packages'].items():
+                self.stdout.write(f'    {value:8.1f}  {name}')
@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from notes import search
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает полнотекстовый индекс заметок.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        if not search.is_supported(connection):
+            raise CommandError('Полнотекстовый индекс есть только в SQLite.')
+        start = time.perf_counter()
+        search.rebuild_index(connection)
+        self.stdout.write(self.style.SUCCESS(
+            f'Индекс перестроен за {time.perf_counter() - start:.2f} с.'
+        ))
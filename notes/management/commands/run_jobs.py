@@ -0,0 +1,41 @@
+import multiprocessing
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from notes import jobs
+
+
+class Command(BaseCommand):
+    help = 'Запускает рабочие процессы очереди фоновых задач.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=1,
+                            help='Число рабочих процессов.')
+        parser.add_argument('--once', action='store_true',
+                            help='Выйти, когда очередь опустеет.')
+        parser.add_argument('--poll-interval', type=float, default=None,
+                            help='Пауза при пустой очереди, секунды.')
+
+    def handle(self, *args, **options):
+        kwargs = {
+            'once': options['once'],
+            'poll_interval': options['poll_interval'],
+        }
+        if options['workers'] <= 1:
+            count = jobs.work(**kwargs)
+            self.stdout.write(self.style.SUCCESS(
+                f'Выполнено задач: {count}.'
+            ))
+            return
+        # Дочерние процессы не должны разделять соединения с родителем.
+        connections.close_all()
+        processes = [
+            multiprocessing.Process(target=jobs.work, kwargs=kwargs)
+            for _ in range(options['workers'])
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        self.stdout.write(self.style.SUCCESS('Рабочие процессы завершены.'))
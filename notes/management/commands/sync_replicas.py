@@ -0,0 +1,32 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует основную базу SQLite в реплики из NOTES_READ_REPLICAS.'
+    )
+
+    def handle(self, *args, **options):
+        if not settings.NOTES_READ_REPLICAS:
+            raise CommandError('Реплики не настроены: NOTES_READ_REPLICAS.')
+        primary = connections[DEFAULT_DB_ALIAS]
+        if primary.vendor != 'sqlite':
+            raise CommandError('Копирование реплик есть только для SQLite.')
+        primary.ensure_connection()
+        for alias in settings.NOTES_READ_REPLICAS:
+            replica = connections[alias]
+            if replica.vendor != 'sqlite':
+                raise CommandError(f'Реплика {alias} - не SQLite.')
+            start = time.perf_counter()
+            replica.ensure_connection()
+            # Резервное копирование SQLite даёт согласованный снимок
+            # и не блокирует чтение основной базы.
+            primary.connection.backup(replica.connection)
+            self.stdout.write(self.style.SUCCESS(
+                f'{alias}: скопирована за '
+                f'{time.perf_counter() - start:.2f} с.'
+            ))
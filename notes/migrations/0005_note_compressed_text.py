@@ -0,0 +1,114 @@
+# Generated by Django 3.2.15 on 2026-10-18 20:22
+
+from django.db import migrations
+import notes.fields
+
+BATCH_SIZE = 500
+
+# SQL индекса на момент этой миграции: триггеры распаковывают текст
+# функцией notes_decompress из notes.db, в 0007 они заменены.
+FTS_TABLE = 'notes_note_fts'
+
+CREATE_SQL = (
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, text,
+        content='notes_note', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert
+    AFTER INSERT ON notes_note BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, text)
+        VALUES (new.id, new.title, notes_decompress(new.text));
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete
+    AFTER DELETE ON notes_note BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, text)
+        VALUES ('delete', old.id, old.title, notes_decompress(old.text));
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update
+    AFTER UPDATE OF title, text ON notes_note BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, text)
+        VALUES ('delete', old.id, old.title, notes_decompress(old.text));
+        INSERT INTO {FTS_TABLE}(rowid, title, text)
+        VALUES (new.id, new.title, notes_decompress(new.text));
+    END
+    """,
+    # Встроенная команда 'rebuild' читает столбцы notes_note как есть,
+    # поэтому индекс заполняется распакованным текстом вручную.
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('delete-all')",
+    f"""
+    INSERT INTO {FTS_TABLE}(rowid, title, text)
+    SELECT id, title, notes_decompress(text) FROM notes_note
+    """,
+)
+
+DROP_SQL = (
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_insert',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_delete',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_update',
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+)
+
+
+def batches(apps):
+    """Заметки пачками по BATCH_SIZE в порядке id."""
+    Note = apps.get_model('notes', 'Note')
+    last_id = 0
+    while True:
+        notes = list(
+            Note.objects.filter(id__gt=last_id).order_by('id')
+            .only('id', 'text')[:BATCH_SIZE]
+        )
+        if not notes:
+            return
+        yield Note, notes
+        last_id = notes[-1].id
+
+
+def compress_texts(apps, schema_editor):
+    # Поле сжимает значения при записи, достаточно их перезаписать.
+    for Note, notes in batches(apps):
+        Note.objects.bulk_update(notes, ['text'])
+
+
+def decompress_texts(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        for Note, notes in batches(apps):
+            cursor.executemany(
+                'UPDATE notes_note SET text = %s WHERE id = %s',
+                [(note.text, note.id) for note in notes],
+            )
+
+
+def reinstall_search(apps, schema_editor):
+    # Изменение поля пересоздаёт таблицу заметок вместе с триггерами,
+    # а триггеры теперь распаковывают текст.
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sql in DROP_SQL + CREATE_SQL:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0004_note_revisions'),
+    ]
+
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, reinstall_search),
+        migrations.AlterField(
+            model_name='note',
+            name='text',
+            field=notes.fields.CompressedTextField(help_text='Добавьте подробностей', verbose_name='Текст'),
+        ),
+        migrations.RunPython(compress_texts, decompress_texts),
+        migrations.RunPython(reinstall_search, migrations.RunPython.noop),
+    ]
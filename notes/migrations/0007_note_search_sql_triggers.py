@@ -0,0 +1,147 @@
+from django.db import migrations
+
+from notes.fields import decompress
+
+# Триггеры индекса на чистом SQL: запись в notes_note из sqlite3,
+# dbshell и скриптов восстановления не требует функции notes_decompress.
+# Сжатый текст в индекс записывает Python (notes.search.index_texts).
+FTS_TABLE = 'notes_note_fts'
+BATCH_SIZE = 1000
+
+INDEXED_TEXT = "CASE WHEN substr({0}, 1, 1) = char(1) THEN '' ELSE {0} END"
+
+CREATE_SQL = (
+    f"""
+    CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        title, text,
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER {FTS_TABLE}_insert
+    AFTER INSERT ON notes_note BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, text)
+        VALUES (new.id, new.title, {INDEXED_TEXT.format('new.text')});
+    END
+    """,
+    f"""
+    CREATE TRIGGER {FTS_TABLE}_delete
+    AFTER DELETE ON notes_note BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER {FTS_TABLE}_update_title
+    AFTER UPDATE OF title ON notes_note BEGIN
+        UPDATE {FTS_TABLE} SET title = new.title WHERE rowid = new.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER {FTS_TABLE}_update_text
+    AFTER UPDATE OF text ON notes_note BEGIN
+        UPDATE {FTS_TABLE} SET text = {INDEXED_TEXT.format('new.text')}
+        WHERE rowid = new.id;
+    END
+    """,
+)
+
+DROP_SQL = (
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_insert',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_delete',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_update_title',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_update_text',
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+)
+
+# Схема из 0005 для отката.
+OLD_CREATE_SQL = (
+    f"""
+    CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        title, text,
+        content='notes_note', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER {FTS_TABLE}_insert
+    AFTER INSERT ON notes_note BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, text)
+        VALUES (new.id, new.title, notes_decompress(new.text));
+    END
+    """,
+    f"""
+    CREATE TRIGGER {FTS_TABLE}_delete
+    AFTER DELETE ON notes_note BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, text)
+        VALUES ('delete', old.id, old.title, notes_decompress(old.text));
+    END
+    """,
+    f"""
+    CREATE TRIGGER {FTS_TABLE}_update
+    AFTER UPDATE OF title, text ON notes_note BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, text)
+        VALUES ('delete', old.id, old.title, notes_decompress(old.text));
+        INSERT INTO {FTS_TABLE}(rowid, title, text)
+        VALUES (new.id, new.title, notes_decompress(new.text));
+    END
+    """,
+    f"""
+    INSERT INTO {FTS_TABLE}(rowid, title, text)
+    SELECT id, title, notes_decompress(text) FROM notes_note
+    """,
+)
+
+OLD_DROP_SQL = DROP_SQL[:2] + (
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_update',
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+)
+
+
+def fill_index(schema_editor):
+    """Заполняет индекс пачками, распаковывая тексты в Python."""
+    last_id = 0
+    with schema_editor.connection.cursor() as cursor:
+        while True:
+            cursor.execute(
+                'SELECT id, title, text FROM notes_note WHERE id > %s '
+                'ORDER BY id LIMIT %s',
+                [last_id, BATCH_SIZE],
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                return
+            cursor.executemany(
+                f'INSERT INTO {FTS_TABLE}(rowid, title, text) '
+                'VALUES (%s, %s, %s)',
+                [
+                    (note_id, title, decompress(text))
+                    for note_id, title, text in rows
+                ],
+            )
+            last_id = rows[-1][0]
+
+
+def install(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sql in OLD_DROP_SQL + CREATE_SQL:
+        schema_editor.execute(sql)
+    fill_index(schema_editor)
+
+
+def uninstall(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sql in DROP_SQL + OLD_CREATE_SQL:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0006_job'),
+    ]
+
+    operations = [
+        migrations.RunPython(install, uninstall),
+    ]
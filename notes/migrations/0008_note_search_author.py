@@ -0,0 +1,169 @@
+from django.db import migrations
+
+from notes.fields import decompress
+
+# Индекс с автором заметки: поиск по заметкам пользователя ограничивает
+# выборку условием author: "<id>" внутри FTS5.
+FTS_TABLE = 'notes_note_fts'
+BATCH_SIZE = 1000
+
+INDEXED_TEXT = "CASE WHEN substr({0}, 1, 1) = char(1) THEN '' ELSE {0} END"
+
+CREATE_SQL = (
+    f"""
+    CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        title, text, author,
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    INSERT INTO {FTS_TABLE}({FTS_TABLE}, rank)
+    VALUES ('rank', 'bm25(1.0, 1.0, 0.0)')
+    """,
+    f"""
+    CREATE TRIGGER {FTS_TABLE}_insert
+    AFTER INSERT ON notes_note BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, text, author)
+        VALUES (
+            new.id, new.title, {INDEXED_TEXT.format('new.text')},
+            new.author_id
+        );
+    END
+    """,
+    f"""
+    CREATE TRIGGER {FTS_TABLE}_delete
+    AFTER DELETE ON notes_note BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER {FTS_TABLE}_update_title
+    AFTER UPDATE OF title ON notes_note BEGIN
+        UPDATE {FTS_TABLE} SET title = new.title WHERE rowid = new.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER {FTS_TABLE}_update_text
+    AFTER UPDATE OF text ON notes_note BEGIN
+        UPDATE {FTS_TABLE} SET text = {INDEXED_TEXT.format('new.text')}
+        WHERE rowid = new.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER {FTS_TABLE}_update_author
+    AFTER UPDATE OF author_id ON notes_note BEGIN
+        UPDATE {FTS_TABLE} SET author = new.author_id WHERE rowid = new.id;
+    END
+    """,
+)
+
+DROP_SQL = (
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_insert',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_delete',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_update_title',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_update_text',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_update_author',
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+)
+
+# Схема из 0007 для отката.
+OLD_CREATE_SQL = (
+    f"""
+    CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        title, text,
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER {FTS_TABLE}_insert
+    AFTER INSERT ON notes_note BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, text)
+        VALUES (new.id, new.title, {INDEXED_TEXT.format('new.text')});
+    END
+    """,
+    f"""
+    CREATE TRIGGER {FTS_TABLE}_delete
+    AFTER DELETE ON notes_note BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER {FTS_TABLE}_update_title
+    AFTER UPDATE OF title ON notes_note BEGIN
+        UPDATE {FTS_TABLE} SET title = new.title WHERE rowid = new.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER {FTS_TABLE}_update_text
+    AFTER UPDATE OF text ON notes_note BEGIN
+        UPDATE {FTS_TABLE} SET text = {INDEXED_TEXT.format('new.text')}
+        WHERE rowid = new.id;
+    END
+    """,
+)
+
+OLD_DROP_SQL = (
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_insert',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_delete',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_update_title',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_update_text',
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+)
+
+
+def fill_index(schema_editor, with_author):
+    """Заполняет индекс пачками, распаковывая тексты в Python."""
+    if with_author:
+        insert = (
+            f'INSERT INTO {FTS_TABLE}(rowid, title, text, author) '
+            'VALUES (%s, %s, %s, %s)'
+        )
+    else:
+        insert = (
+            f'INSERT INTO {FTS_TABLE}(rowid, title, text) '
+            'VALUES (%s, %s, %s)'
+        )
+    last_id = 0
+    with schema_editor.connection.cursor() as cursor:
+        while True:
+            cursor.execute(
+                'SELECT id, title, text, author_id FROM notes_note '
+                'WHERE id > %s ORDER BY id LIMIT %s',
+                [last_id, BATCH_SIZE],
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                return
+            cursor.executemany(insert, [
+                (note_id, title, decompress(text), author_id)
+                if with_author else (note_id, title, decompress(text))
+                for note_id, title, text, author_id in rows
+            ])
+            last_id = rows[-1][0]
+
+
+def install(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sql in OLD_DROP_SQL + CREATE_SQL:
+        schema_editor.execute(sql)
+    fill_index(schema_editor, with_author=True)
+
+
+def uninstall(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sql in DROP_SQL + OLD_CREATE_SQL:
+        schema_editor.execute(sql)
+    fill_index(schema_editor, with_author=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0007_note_search_sql_triggers'),
+    ]
+
+    operations = [
+        migrations.RunPython(install, uninstall),
+    ]
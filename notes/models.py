@@ -1,7 +1,122 @@
 from django.conf import settings
-from django.db import models
+from django.db import IntegrityError, connections, models, router, transaction
+from django.db.models import F
+from django.utils import timezone
 
-from pytils.translit import slugify
+from .cache import invalidate
+from .fields import CompressedTextField, stored_as_is
+from .search import index_texts
+from .slugs import is_slug_conflict, make_slug, slug_candidates
+
+
+class RevisionCounter(models.Model):
+    """Глобальный счётчик ревизий заметок для синхронизации."""
+    value = models.PositiveBigIntegerField(default=0)
+
+
+def supports_returning(connection):
+    """UPDATE ... RETURNING: PostgreSQL и SQLite с версии 3.35."""
+    if connection.vendor == 'sqlite':
+        return connection.Database.sqlite_version_info >= (3, 35)
+    return connection.vendor == 'postgresql'
+
+
+def increment_counter(count):
+    """Увеличивает счётчик ревизий, возвращает новое значение или None.
+
+    None - строки счётчика ещё нет. Где есть RETURNING, новое значение
+    читается тем же запросом, что и увеличивается.
+    """
+    connection = connections[router.db_for_write(RevisionCounter)]
+    if not supports_returning(connection):
+        counter = RevisionCounter.objects.filter(pk=1)
+        if not counter.update(value=F('value') + count):
+            return None
+        return counter.values_list('value', flat=True).get()
+    table = connection.ops.quote_name(RevisionCounter._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'UPDATE {table} SET value = value + %s WHERE id = 1 '
+            'RETURNING value',
+            [count],
+        )
+        row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def allocate_revisions(count=1):
+    """Выделяет count новых ревизий, возвращает их диапазон.
+
+    Счётчик увеличивается UPDATE внутри транзакции записи. Блокировка
+    строки счётчика держится до фиксации, поэтому ревизии становятся
+    видны клиентам в порядке возрастания и синхронизация по условию
+    ``revision > N`` ничего не пропускает. Вызывающий код обычно уже
+    в транзакции, поэтому точка сохранения не создаётся.
+    """
+    with transaction.atomic(savepoint=False):
+        last = increment_counter(count)
+        if last is None:
+            RevisionCounter.objects.create(pk=1, value=count)
+            last = count
+    return range(last - count + 1, last + 1)
+
+
+class NoteQuerySet(models.QuerySet):
+
+    def for_list(self):
+        """Только поля, которые выводятся в списках заметок."""
+        return self.only('id', 'slug', 'title')
+
+    def bulk_save(self, notes, fields):
+        """Сохраняет изменённые заметки одним UPDATE в одной транзакции.
+
+        Каждая заметка получает новую ревизию, как при Note.save.
+        Slug должны быть заполнены и уже проверены на уникальность.
+        """
+        if not notes:
+            return
+        now = timezone.now()
+        with transaction.atomic():
+            for note, revision in zip(notes, allocate_revisions(len(notes))):
+                note.revision = revision
+                note.updated_at = now
+            self.bulk_update(notes, [*fields, 'revision', 'updated_at'])
+            if 'text' in fields:
+                index_texts(notes, self.db)
+        invalidate(*{note.author_id for note in notes})
+
+    def bulk_create(self, objs, *args, **kwargs):
+        """Создаёт заметки и записывает в индекс их сжатые тексты.
+
+        SQLite не возвращает id из bulk_create, поэтому id сжатых
+        заметок ищутся по slug.
+        """
+        objs = super().bulk_create(objs, *args, **kwargs)
+        slugs = {
+            note.slug: note for note in objs
+            if note.pk is None and not stored_as_is(note.text)
+        }
+        if slugs and not kwargs.get('ignore_conflicts'):
+            for slug, pk in self.filter(slug__in=slugs).values_list(
+                'slug', 'pk'
+            ):
+                slugs[slug].pk = pk
+        index_texts([note for note in objs if note.pk is not None], self.db)
+        return objs
+
+    def delete(self):
+        """Удаляет заметки, оставляя надгробия для синхронизации."""
+        with transaction.atomic():
+            tombstones = [
+                Tombstone(note_id=note_id, slug=slug, author_id=author_id)
+                for note_id, slug, author_id in self.values_list(
+                    'id', 'slug', 'author_id'
+                )
+            ]
+            Tombstone.objects.create_for(tombstones)
+            result = super().delete()
+        invalidate(*{tombstone.author_id for tombstone in tombstones})
+        return result
 
 
 class Note(models.Model):
@@ -11,7 +126,7 @@ class Note(models.Model):
         default='Название заметки',
         help_text='Дайте короткое название заметке'
     )
-    text = models.TextField(
+    text = CompressedTextField(
         'Текст',
         help_text='Добавьте подробностей'
     )
@@ -26,13 +141,160 @@ class Note(models.Model):
     author = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
+        # Поиск по автору обслуживают составные индексы из Meta.
+        db_index=False,
     )
+    updated_at = models.DateTimeField('Изменена', auto_now=True)
+    revision = models.PositiveBigIntegerField(
+        'Ревизия', default=0, editable=False
+    )
+
+    objects = NoteQuerySet.as_manager()
+
+    class Meta:
+        indexes = (
+            models.Index(
+                fields=('author', 'id'), name='note_author_id_idx'
+            ),
+            models.Index(
+                fields=('author', 'slug'), name='note_author_slug_idx'
+            ),
+            models.Index(
+                fields=('author', 'revision'), name='note_author_revision_idx'
+            ),
+        )
 
     def __str__(self):
         return self.title
 
     def save(self, *args, **kwargs):
-        if not self.slug:
-            max_slug_length = self._meta.get_field('slug').max_length
-            self.slug = slugify(self.title)[:max_slug_length]
-        super().save(*args, **kwargs)
+        """Сохраняет заметку, при пустом slug подбирает уникальный.
+
+        Запись выполняется в точке сохранения, чтобы конфликт slug
+        не ломал внешнюю транзакцию. Каждое сохранение получает новую
+        ревизию.
+        """
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {
+                *update_fields, 'revision', 'updated_at'
+            }
+        with transaction.atomic():
+            self.revision = allocate_revisions()[0]
+            if self.slug:
+                super().save(*args, **kwargs)
+            else:
+                self.save_with_unique_slug(*args, **kwargs)
+            if 'text' not in self.get_deferred_fields() and (
+                update_fields is None or 'text' in update_fields
+            ):
+                index_texts([self], self._state.db)
+        self.bump_cache_version()
+
+    def save_with_unique_slug(self, *args, **kwargs):
+        max_slug_length = self._meta.get_field('slug').max_length
+        slug = make_slug(self.title, max_slug_length)
+        for candidate in slug_candidates(slug, max_slug_length):
+            self.slug = candidate
+            try:
+                with transaction.atomic():
+                    super().save(*args, **kwargs)
+                return
+            except IntegrityError as error:
+                if not is_slug_conflict(error):
+                    self.slug = ''
+                    raise
+        self.slug = ''
+        raise IntegrityError(f'Не удалось подобрать уникальный slug: {slug}')
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            Tombstone.objects.create_for([Tombstone(
+                note_id=self.pk, slug=self.slug, author_id=self.author_id
+            )])
+            result = super().delete(*args, **kwargs)
+        self.bump_cache_version()
+        return result
+
+    def bump_cache_version(self):
+        """Сбрасывает кеш страниц автора."""
+        invalidate(self.author_id)
+
+
+class TombstoneQuerySet(models.QuerySet):
+
+    def create_for(self, tombstones):
+        """Сохраняет надгробия, выделив им новые ревизии."""
+        if not tombstones:
+            return []
+        revisions = allocate_revisions(len(tombstones))
+        for tombstone, revision in zip(tombstones, revisions):
+            tombstone.revision = revision
+        return self.bulk_create(tombstones)
+
+
+class Tombstone(models.Model):
+    """Запись об удалённой заметке для синхронизации клиентов."""
+    note_id = models.BigIntegerField()
+    slug = models.SlugField(max_length=100, db_index=False)
+    author = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        db_index=False,
+    )
+    revision = models.PositiveBigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    objects = TombstoneQuerySet.as_manager()
+
+    class Meta:
+        indexes = (
+            models.Index(
+                fields=('author', 'revision'),
+                name='tombstone_author_revision_idx',
+            ),
+        )
+
+
+class Job(models.Model):
+    """Фоновая задача, которую выполняет команда run_jobs."""
+
+    class Status(models.TextChoices):
+        QUEUED = 'queued', 'В очереди'
+        RUNNING = 'running', 'Выполняется'
+        DONE = 'done', 'Выполнена'
+        FAILED = 'failed', 'Ошибка'
+
+    kind = models.CharField(max_length=50)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(
+        max_length=10, choices=Status.choices, default=Status.QUEUED
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        db_index=False,
+    )
+    done = models.PositiveIntegerField(default=0)
+    total = models.PositiveIntegerField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    worker = models.CharField(max_length=100, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = (
+            models.Index(fields=('status', 'id'), name='job_status_idx'),
+            models.Index(fields=('user', 'id'), name='job_user_idx'),
+        )
+
+    def __str__(self):
+        return f'{self.kind} #{self.pk}'
+
+    @property
+    def percent(self):
+        if not self.total:
+            return 100 if self.status == self.Status.DONE else 0
+        return min(100, self.done * 100 // self.total)
@@ -0,0 +1,69 @@
+class KeysetRows(list):
+    """Загруженные строки страницы.
+
+    count() без аргумента возвращает число строк, как у QuerySet, для
+    кода, написанного под Paginator, где страница - срез QuerySet.
+    """
+
+    def count(self, *args):
+        if args:
+            return super().count(*args)
+        return len(self)
+
+
+class KeysetPage:
+    """Страница выборки, полученная по курсору."""
+
+    def __init__(self, object_list, next_cursor, cursor_kwarg):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.cursor_kwarg = cursor_kwarg
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return False
+
+    def has_other_pages(self):
+        return self.has_next()
+
+
+class KeysetPaginator:
+    """Постраничный вывод по курсору (keyset) вместо OFFSET.
+
+    Каждая страница выбирается условием ``key > cursor`` с сортировкой
+    по ``key``, поэтому стоимость запроса не зависит ни от номера
+    страницы, ни от общего числа записей: COUNT(*) не выполняется.
+    Выбирается на одну запись больше страницы: по ней видно, есть ли
+    следующая, без отдельного запроса.
+    """
+
+    def __init__(self, queryset, per_page, key='id', cursor_kwarg='after'):
+        self.queryset = queryset.order_by(key)
+        self.per_page = per_page
+        self.key = key
+        self.cursor_kwarg = cursor_kwarg
+
+    def parse_cursor(self, value):
+        """Курсор - целое неотрицательное число, иначе первая страница."""
+        try:
+            cursor = int(value)
+        except (TypeError, ValueError):
+            return None
+        return cursor if cursor >= 0 else None
+
+    def get_page(self, cursor):
+        queryset = self.queryset
+        cursor = self.parse_cursor(cursor)
+        if cursor is not None:
+            queryset = queryset.filter(**{f'{self.key}__gt': cursor})
+        rows = KeysetRows(queryset[:self.per_page + 1])
+        next_cursor = None
+        if len(rows) > self.per_page:
+            del rows[self.per_page:]
+            next_cursor = getattr(rows[-1], self.key)
+        return KeysetPage(rows, next_cursor, self.cursor_kwarg)
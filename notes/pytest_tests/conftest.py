@@ -1,10 +1,19 @@
 import pytest
 
+from django.conf import settings
+from django.core.cache import caches
 from django.test.client import Client
 
 from notes.models import Note
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Каждый тест начинается с пустыми кешами."""
+    for alias in settings.CACHES:
+        caches[alias].clear()
+
+
 @pytest.fixture
 def author(django_user_model):
     """Фикстура автора заметки."""
@@ -45,6 +54,27 @@ def note(author):
     return note
 
 
+@pytest.fixture
+def many_notes_count():
+    """Число заметок many_notes, модуль может переопределить фикстуру."""
+    return 5
+
+
+@pytest.fixture
+def many_notes(author, many_notes_count):
+    """Заметки автора, созданные одним bulk_create, в порядке id."""
+    Note.objects.bulk_create(
+        Note(
+            title=f'Заголовок {index}',
+            text='Текст заметки',
+            slug=f'note-{index}',
+            author=author,
+        )
+        for index in range(many_notes_count)
+    )
+    return list(Note.objects.filter(author=author).order_by('id'))
+
+
 @pytest.fixture
 def slug_for_args(note):
     """Возвращает кортеж который содержит слаг заметки (url-адрес)."""
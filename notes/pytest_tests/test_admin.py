@@ -0,0 +1,83 @@
+import pytest
+
+from http import HTTPStatus
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from notes.admin import estimate_count
+from notes.models import Note
+
+pytestmark = [pytest.mark.django_db]
+
+URL_CHANGELIST = reverse('admin:notes_note_changelist')
+
+
+def create_notes(author, count, title='Заметка'):
+    Note.objects.bulk_create(
+        Note(title=f'{title} {index}', text='Текст',
+             slug=f'{title.lower()}-{author.pk}-{index}', author=author)
+        for index in range(count)
+    )
+
+
+def changelist(client, **params):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(URL_CHANGELIST, params)
+    assert response.status_code == HTTPStatus.OK
+    return response, [query['sql'] for query in context.captured_queries]
+
+
+def test_changelist_queries_do_not_grow(admin_client, author, not_author):
+    """Авторы загружаются тем же запросом, что и заметки."""
+    create_notes(author, 3)
+    changelist(admin_client)
+    _, few = changelist(admin_client)
+    create_notes(not_author, 30)
+    response, many = changelist(admin_client)
+    assert len(many) == len(few)
+    assert 'Не автор' in response.content.decode()
+
+
+def test_large_table_is_not_counted(settings, admin_client, author):
+    """Большая таблица не считается COUNT(*), число строк оценивается."""
+    settings.NOTES_ADMIN_COUNT_LIMIT = 5
+    create_notes(author, 20)
+    response, queries = changelist(admin_client)
+    assert not [
+        sql for sql in queries if 'COUNT(' in sql and 'notes_note' in sql
+    ]
+    assert response.context['cl'].result_count == 20
+
+
+def test_filtered_count_is_bounded(settings, admin_client, author):
+    settings.NOTES_ADMIN_COUNT_LIMIT = 5
+    create_notes(author, 20)
+    response, _ = changelist(admin_client, author__id__exact=author.pk)
+    assert response.context['cl'].result_count == 6
+
+
+def test_search_uses_full_text_index(admin_client, author):
+    create_notes(author, 3, title='Борщ')
+    create_notes(author, 3, title='Отпуск')
+    response, queries = changelist(admin_client, q='борщ')
+    assert [note.title for note in response.context['cl'].result_list] == [
+        'Борщ 2', 'Борщ 1', 'Борщ 0'
+    ]
+    assert any('MATCH' in sql for sql in queries)
+
+
+def test_estimate_count_uses_statistics(author):
+    create_notes(author, 7)
+    Note.objects.filter(title='Заметка 0').delete()
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE notes_note')
+    assert estimate_count(Note) == 6
+
+
+def test_author_is_raw_id_field(admin_client, note):
+    response = admin_client.get(
+        reverse('admin:notes_note_change', args=(note.pk,))
+    )
+    assert 'vForeignKeyRawIdAdminField' in response.content.decode()
@@ -0,0 +1,258 @@
+import json
+
+import pytest
+
+from http import HTTPStatus
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import Client
+from django.urls import reverse
+
+from notes.models import Note
+from notes.tokens import make_token
+
+pytestmark = [pytest.mark.django_db]
+
+URL_API_LIST = reverse('notes:api-list')
+
+
+@pytest.fixture
+def url_api_detail(note):
+    return reverse('notes:api-detail', args=(note.slug,))
+
+
+def send(client, method, url, data, **headers):
+    return getattr(client, method)(
+        url, json.dumps(data), content_type='application/json', **headers
+    )
+
+
+def test_anonymous_gets_unauthorized(client):
+    """Анонимный пользователь получает 401 вместо редиректа."""
+    response = client.get(URL_API_LIST)
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+
+def test_list_only_own_notes(author_client, not_author_client, note):
+    """Список содержит только заметки пользователя и без текста."""
+    response = author_client.get(URL_API_LIST)
+    data = response.json()
+    assert data['next'] is None
+    assert [
+        (result['id'], result['slug'], result['title'], result['revision'])
+        for result in data['results']
+    ] == [(note.id, note.slug, note.title, note.revision)]
+    assert 'text' not in data['results'][0]
+    response = not_author_client.get(URL_API_LIST)
+    assert response.json()['results'] == []
+
+
+def test_detail_not_modified(author_client, url_api_detail, note):
+    """Неизменённая заметка отдаётся с 304 и пустым телом."""
+    response = author_client.get(url_api_detail)
+    assert response.json()['text'] == note.text
+    etag = response['ETag']
+    response = author_client.get(url_api_detail, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    assert response.content == b''
+    note.text = 'Другой текст'
+    note.save()
+    response = author_client.get(url_api_detail, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+    assert response['ETag'] != etag
+
+
+def test_list_not_modified(author_client, note):
+    """Неизменённый список отдаётся с 304."""
+    etag = author_client.get(URL_API_LIST)['ETag']
+    response = author_client.get(URL_API_LIST, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+
+def test_create_note(author_client, author, form_data):
+    """Создание заметки через API."""
+    response = send(author_client, 'post', URL_API_LIST, form_data)
+    assert response.status_code == HTTPStatus.CREATED
+    assert response['ETag']
+    note = Note.objects.get()
+    data = response.json()
+    assert data['id'] == note.id
+    assert data['revision'] == note.revision
+    for field, value in form_data.items():
+        assert data[field] == value
+    assert note.author == author
+
+
+def test_create_note_with_taken_slug(author_client, note, form_data):
+    """Занятый slug - ошибка 400 с описанием."""
+    form_data['slug'] = note.slug
+    response = send(author_client, 'post', URL_API_LIST, form_data)
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert 'slug' in response.json()['errors']
+    assert Note.objects.count() == 1
+
+
+def test_create_note_invalid_json(author_client):
+    """Некорректное тело запроса - ошибка 400."""
+    response = author_client.post(
+        URL_API_LIST, 'not json', content_type='application/json'
+    )
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_patch_note(author_client, url_api_detail, note):
+    """Частичное изменение заметки."""
+    response = send(author_client, 'patch', url_api_detail, {'text': 'Новый'})
+    assert response.status_code == HTTPStatus.OK
+    note.refresh_from_db()
+    assert (note.title, note.text) == ('Заголовок', 'Новый')
+
+
+def test_update_precondition_failed(author_client, url_api_detail, note):
+    """Изменение по устаревшему ETag отклоняется с 412."""
+    etag = author_client.get(url_api_detail)['ETag']
+    note.text = 'Изменено другим клиентом'
+    note.save()
+    response = send(
+        author_client, 'patch', url_api_detail, {'text': 'Новый'},
+        HTTP_IF_MATCH=etag,
+    )
+    assert response.status_code == HTTPStatus.PRECONDITION_FAILED
+    note.refresh_from_db()
+    assert note.text == 'Изменено другим клиентом'
+
+
+def test_delete_note(author_client, url_api_detail):
+    """Удаление заметки через API."""
+    response = author_client.delete(url_api_detail)
+    assert response.status_code == HTTPStatus.NO_CONTENT
+    assert Note.objects.count() == 0
+
+
+@pytest.mark.parametrize('method', ('get', 'patch', 'delete'))
+def test_other_user_gets_not_found(not_author_client, url_api_detail, method):
+    """Чужая заметка недоступна."""
+    response = getattr(not_author_client, method)(url_api_detail)
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert Note.objects.count() == 1
+
+
+def changes(client, since, limit=None):
+    params = {'since': since}
+    if limit:
+        params['limit'] = limit
+    return client.get(reverse('notes:api-changes'), params).json()
+
+
+def test_changes_since_revision(author_client, not_author, note, form_data):
+    """Лента изменений содержит только изменения после ревизии."""
+    since = note.revision
+    Note.objects.create(
+        title='Чужая', text='Текст', slug='alien', author=not_author
+    )
+    data = changes(author_client, since)
+    assert data == {
+        'notes': [], 'deleted': [], 'revision': since, 'has_more': False
+    }
+    send(author_client, 'post', URL_API_LIST, form_data)
+    note.text = 'Новый текст'
+    note.save()
+    data = changes(author_client, since)
+    assert [change['slug'] for change in data['notes']] == [
+        form_data['slug'], note.slug
+    ]
+    assert data['notes'][1]['text'] == 'Новый текст'
+    assert data['revision'] == note.revision
+    assert changes(author_client, data['revision'])['notes'] == []
+
+
+def test_changes_include_deleted(author_client, note, url_api_detail):
+    """Удаление заметки попадает в ленту изменений."""
+    since = note.revision
+    author_client.delete(url_api_detail)
+    data = changes(author_client, since)
+    assert data['notes'] == []
+    assert data['deleted'] == [{
+        'note_id': note.id, 'slug': note.slug, 'revision': since + 1,
+    }]
+
+
+def test_changes_paging(author_client, author):
+    """Лента изменений отдаётся порциями по ревизии."""
+    for index in range(3):
+        Note.objects.create(
+            title='Заметка', text='Текст', slug=f'note-{index}',
+            author=author,
+        )
+    Note.objects.filter(slug='note-0').delete()
+    data = changes(author_client, 0, limit=2)
+    assert [change['slug'] for change in data['notes']] == [
+        'note-1', 'note-2'
+    ]
+    assert data['has_more']
+    data = changes(author_client, data['revision'], limit=2)
+    assert data['deleted'][0]['slug'] == 'note-0'
+    assert not data['has_more']
+
+
+def test_note_with_slug_changes_is_reachable(author_client, author):
+    """Лента изменений не перекрывает заметку со slug changes."""
+    Note.objects.create(
+        title='Изменения', text='Текст', slug='changes', author=author
+    )
+    response = author_client.get(
+        reverse('notes:api-detail', args=('changes',))
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['title'] == 'Изменения'
+
+
+@pytest.fixture
+def token(author):
+    return make_token(author)
+
+
+@pytest.fixture
+def csrf_client():
+    return Client(enforce_csrf_checks=True)
+
+
+def test_token_client_skips_csrf(csrf_client, token, form_data):
+    """Запрос с токеном не требует CSRF-токена."""
+    response = send(
+        csrf_client, 'post', URL_API_LIST, form_data,
+        HTTP_AUTHORIZATION=f'Token {token}',
+    )
+    assert response.status_code == HTTPStatus.CREATED
+    assert Note.objects.filter(slug=form_data['slug']).exists()
+
+
+def test_session_client_gets_json_csrf_error(author, csrf_client, form_data):
+    """Запрос с cookie сессии без CSRF-токена получает JSON 403."""
+    csrf_client.force_login(author)
+    response = send(csrf_client, 'post', URL_API_LIST, form_data)
+    assert response.status_code == HTTPStatus.FORBIDDEN
+    assert response.json()['detail']
+    assert not Note.objects.exists()
+
+
+@pytest.mark.parametrize('header', ('Token 1:bad', 'Token ', 'Basic xyz'))
+def test_invalid_token_is_unauthorized(csrf_client, author, header):
+    response = csrf_client.get(URL_API_LIST, HTTP_AUTHORIZATION=header)
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+
+def test_password_change_revokes_token(csrf_client, author, token):
+    author.set_password('new-password')
+    author.save()
+    response = csrf_client.get(
+        URL_API_LIST, HTTP_AUTHORIZATION=f'Token {token}'
+    )
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+
+def test_api_token_command(author, token):
+    stdout = StringIO()
+    call_command('api_token', author.username, stdout=stdout)
+    assert stdout.getvalue().strip() == token
@@ -0,0 +1,142 @@
+import asyncio
+import json
+
+import pytest
+
+from http import HTTPStatus
+
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from django.urls import resolve, reverse
+
+from notes.routers import PIN_COOKIE
+from notes.tokens import make_token
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def async_urls(settings):
+    """Маршруты, как при запуске через ASGI."""
+    settings.ROOT_URLCONF = 'yanote.urls_async'
+
+
+@pytest.fixture
+def async_client(author):
+    client = AsyncClient()
+    client.force_login(author)
+    return client
+
+
+def get(client, url):
+    """GET-запрос асинхронным клиентом из синхронного теста."""
+    async def request():
+        return await client.get(url)
+    return async_to_sync(request)()
+
+
+@pytest.mark.parametrize(
+    'name, args',
+    (
+        ('notes:home', None),
+        ('notes:list', None),
+        ('notes:detail', pytest.lazy_fixture('slug_for_args')),
+        ('notes:search', None),
+        ('notes:api-list', None),
+        ('notes:api-detail', pytest.lazy_fixture('slug_for_args')),
+        ('notes:api-changes', None),
+    ),
+)
+def test_read_views_are_async(name, args):
+    """Представления для чтения под ASGI асинхронные."""
+    view = resolve(reverse(name, args=args)).func
+    assert asyncio.iscoroutinefunction(view)
+
+
+def test_async_list(async_client, note):
+    """Асинхронный список заметок."""
+    response = get(async_client, reverse('notes:list'))
+    assert response.status_code == HTTPStatus.OK
+    assert note.title in response.content.decode()
+
+
+def test_async_detail_and_search(async_client, note):
+    """Асинхронные заметка и поиск."""
+    response = get(async_client, reverse('notes:detail', args=(note.slug,)))
+    assert note.text in response.content.decode()
+    response = get(async_client, f'{reverse("notes:search")}?q=Текст')
+    assert note.slug in response.content.decode()
+
+
+def running_loop():
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def test_async_rendering_outside_event_loop(async_client, note, monkeypatch):
+    """Markdown и сохранение страницы в кеш выполняются в потоке."""
+    from notes import rendering, views
+
+    # Закреплённый клиент: ответ не рендерится внутри use_replicas().
+    async_client.cookies[PIN_COOKIE] = '1'
+
+    rendering.LOCAL_CACHE.clear()
+    loops = []
+    render_markdown = rendering.render_markdown
+    set_page = views.set_page
+
+    def spy_markdown(text):
+        loops.append(running_loop())
+        return render_markdown(text)
+
+    def spy_set_page(key, content):
+        loops.append(running_loop())
+        set_page(key, content)
+
+    monkeypatch.setattr(rendering, 'render_markdown', spy_markdown)
+    monkeypatch.setattr(views, 'set_page', spy_set_page)
+    response = get(async_client, reverse('notes:detail', args=(note.slug,)))
+    assert response.status_code == HTTPStatus.OK
+    assert loops == [None, None]
+
+
+def test_async_api(async_client, note):
+    """Асинхронные JSON-представления."""
+    url = reverse('notes:api-detail', args=(note.slug,))
+    response = get(async_client, url)
+    assert response.json()['text'] == note.text
+    response = get(async_client, reverse('notes:api-changes'))
+    assert response.json()['notes'][0]['slug'] == note.slug
+
+
+def test_async_api_token_skips_csrf(author, form_data):
+    """Запрос к API с токеном под ASGI не требует CSRF-токена."""
+    client = AsyncClient(enforce_csrf_checks=True)
+
+    async def request():
+        return await client.post(
+            reverse('notes:api-list'), json.dumps(form_data),
+            content_type='application/json',
+            # В Django 3.2 AsyncClient принимает заголовки по их именам.
+            authorization=f'Token {make_token(author)}',
+        )
+    response = async_to_sync(request)()
+    assert response.status_code == HTTPStatus.CREATED
+
+
+def test_async_redirects_anonymous(note):
+    """Анонимный пользователь перенаправляется на страницу входа."""
+    url = reverse('notes:list')
+    response = get(AsyncClient(), url)
+    assert response.status_code == HTTPStatus.FOUND
+    assert response.url == f'{reverse("users:login")}?next={url}'
+
+
+def test_async_detail_not_found_for_other_user(not_author, note):
+    """Чужая заметка недоступна."""
+    client = AsyncClient()
+    client.force_login(not_author)
+    response = get(client, reverse('notes:detail', args=(note.slug,)))
+    assert response.status_code == HTTPStatus.NOT_FOUND
@@ -0,0 +1,81 @@
+from http import HTTPStatus
+
+import pytest
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from notes.backends import check_session_cache
+
+pytestmark = [pytest.mark.django_db]
+
+
+def auth_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    return [
+        query['sql'] for query in context.captured_queries
+        if 'django_session' in query['sql'] or 'auth_user' in query['sql']
+    ]
+
+
+@pytest.mark.parametrize(
+    'name, args',
+    (
+        ('notes:list', None),
+        ('notes:detail', pytest.lazy_fixture('slug_for_args')),
+        ('notes:search', None),
+    )
+)
+def test_session_and_user_are_cached(author_client, name, args):
+    """Повторный запрос не читает сессию и пользователя из базы."""
+    url = reverse(name, args=args)
+    auth_queries(author_client, url)
+    assert auth_queries(author_client, url) == []
+
+
+@pytest.mark.parametrize('change', ('password', 'deactivate'))
+def test_user_change_invalidates_cache(author, author_client, change):
+    """После смены пароля или блокировки сессия больше не действует."""
+    url = reverse('notes:list')
+    auth_queries(author_client, url)
+    if change == 'password':
+        author.set_password('new-password')
+    else:
+        author.is_active = False
+    author.save()
+    response = author_client.get(url)
+    assert response.status_code == HTTPStatus.FOUND
+    assert response.url.startswith(reverse('users:login'))
+
+
+def test_user_delete_invalidates_cache(author, author_client):
+    url = reverse('notes:list')
+    auth_queries(author_client, url)
+    author.delete()
+    assert author_client.get(url).status_code == HTTPStatus.FOUND
+
+
+def test_session_cache_must_be_shared(settings):
+    settings.CACHES = {
+        **settings.CACHES,
+        'sessions': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+    }
+    with pytest.raises(ImproperlyConfigured, match='sessions'):
+        check_session_cache()
+
+
+def test_model_backend_sessions_stay_valid(author):
+    """Сессии, созданные через ModelBackend, продолжают действовать."""
+    client = Client()
+    client.force_login(
+        author, backend='django.contrib.auth.backends.ModelBackend'
+    )
+    response = client.get(reverse('notes:list'))
+    assert response.status_code == HTTPStatus.OK
@@ -0,0 +1,157 @@
+from http import HTTPStatus
+
+import pytest
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from notes.models import Note
+
+pytestmark = [pytest.mark.django_db]
+
+URL = reverse('notes:bulk-edit')
+LONG_TEXT = ' '.join(['Очень длинный текст заметки.'] * 1000)
+
+
+@pytest.fixture
+def notes(author):
+    return [
+        Note.objects.create(
+            title=f'Заметка {index}', text='Текст', slug=f'note-{index}',
+            author=author,
+        )
+        for index in range(3)
+    ]
+
+
+def formset_data(notes, **changes):
+    """Данные набора форм; changes - изменения по номеру заметки."""
+    data = {
+        'form-TOTAL_FORMS': len(notes),
+        'form-INITIAL_FORMS': len(notes),
+        'form-MIN_NUM_FORMS': 0,
+        'form-MAX_NUM_FORMS': 1000,
+    }
+    for index, note in enumerate(notes):
+        values = {
+            'id': note.pk, 'title': note.title, 'text': note.text,
+            'slug': note.slug,
+        }
+        values.update(changes.get(f'note{index}', {}))
+        data.update({
+            f'form-{index}-{name}': value for name, value in values.items()
+        })
+    return data
+
+
+def test_get_shows_only_own_notes(author_client, not_author, notes):
+    Note.objects.create(
+        title='Чужая', text='Текст', slug='other', author=not_author
+    )
+    response = author_client.get(URL)
+    assert response.status_code == HTTPStatus.OK
+    formset = response.context['formset']
+    assert [form.instance for form in formset] == notes
+
+
+def test_bulk_edit_in_few_queries(author_client, notes):
+    data = formset_data(
+        notes,
+        note0={'title': 'Новый заголовок', 'slug': 'renamed'},
+        note1={'text': LONG_TEXT},
+    )
+    revisions = [note.revision for note in notes]
+    # Сессия и пользователь - из кеша после первого запроса.
+    author_client.get(URL)
+    with CaptureQueriesContext(connection) as context:
+        response = author_client.post(URL, data)
+    assert response.status_code == HTTPStatus.FOUND
+    # Заметки, slug, счётчик ревизий (UPDATE ... RETURNING), bulk_update
+    # и сжатый текст в полнотекстовый индекс.
+    queries = [
+        query['sql'] for query in context.captured_queries
+        if 'SAVEPOINT' not in query['sql']
+    ]
+    assert len(queries) == 5
+    assert response.url == reverse('notes:success')
+    for note in notes:
+        note.refresh_from_db()
+    assert (notes[0].title, notes[0].slug) == ('Новый заголовок', 'renamed')
+    assert notes[1].text == LONG_TEXT
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT text FROM notes_note WHERE id = %s', [notes[1].pk]
+        )
+        assert len(cursor.fetchone()[0]) < len(LONG_TEXT)
+    assert notes[0].revision > revisions[0]
+    assert notes[1].revision > revisions[1]
+    assert notes[0].revision != notes[1].revision
+    assert notes[2].revision == revisions[2]
+
+
+def test_slug_taken_by_other_note(author_client, not_author, notes):
+    Note.objects.create(
+        title='Чужая', text='Текст', slug='other', author=not_author
+    )
+    data = formset_data(
+        notes,
+        note0={'slug': 'other'},
+        note1={'slug': notes[2].slug},
+        note2={'title': 'Без конфликта'},
+    )
+    response = author_client.post(URL, data)
+    assert response.status_code == HTTPStatus.OK
+    formset = response.context['formset']
+    assert 'slug' in formset.forms[0].errors
+    assert 'slug' in formset.forms[1].errors
+    assert not formset.forms[2].errors
+    assert not Note.objects.filter(title='Без конфликта').exists()
+
+
+def test_duplicate_slugs_in_request(author_client, notes):
+    data = formset_data(
+        notes, note0={'slug': 'same'}, note1={'slug': 'same'},
+    )
+    response = author_client.post(URL, data)
+    assert response.status_code == HTTPStatus.OK
+    assert 'slug' in response.context['formset'].forms[1].errors
+    assert not Note.objects.filter(slug='same').exists()
+
+
+def test_empty_slug_is_required(author_client, notes):
+    response = author_client.post(URL, formset_data(notes, note0={'slug': ''}))
+    assert response.status_code == HTTPStatus.OK
+    assert 'slug' in response.context['formset'].forms[0].errors
+
+
+@pytest.mark.parametrize('foreign', ('other_note', 'new_note'))
+def test_cannot_edit_or_create_foreign_notes(author_client, not_author,
+                                             notes, foreign):
+    other = Note.objects.create(
+        title='Чужая', text='Текст', slug='other', author=not_author
+    )
+    data = formset_data(notes)
+    if foreign == 'other_note':
+        data['form-0-id'] = other.pk
+    else:
+        data.update({
+            'form-TOTAL_FORMS': 4, 'form-3-title': 'Новая',
+            'form-3-text': 'Текст', 'form-3-slug': 'created',
+        })
+    data['form-0-title'] = 'Взлом'
+    response = author_client.post(URL, data)
+    assert response.status_code == HTTPStatus.OK
+    assert response.context['formset'].non_form_errors()
+    other.refresh_from_db()
+    assert other.title == 'Чужая'
+    assert Note.objects.count() == 4
+
+
+def test_unchanged_formset_writes_nothing(author_client, notes):
+    revisions = [note.revision for note in notes]
+    response = author_client.post(URL, formset_data(notes))
+    assert response.status_code == HTTPStatus.FOUND
+    assert [
+        note.revision for note in Note.objects.order_by('id')
+    ] == revisions
@@ -0,0 +1,134 @@
+import pytest
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from notes.cache import bump_version, check_notes_cache, get_version
+from notes.models import Note
+from notes.views import NoteDetail
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(
+    params=('locmem', 'filebased'),
+    autouse=True,
+)
+def cache_backend(request, settings, tmp_path):
+    """Тесты выполняются с локальным и с файловым кешем."""
+    backends = {
+        'locmem': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+        'filebased': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': str(tmp_path / 'cache'),
+        },
+    }
+    settings.CACHES = {
+        **settings.CACHES, settings.NOTES_CACHE_ALIAS: backends[request.param]
+    }
+
+
+def note_queries(client, url):
+    """Количество запросов к заметкам при GET-запросе к url."""
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    return response, sum(
+        'notes_note' in query['sql'] for query in context.captured_queries
+    )
+
+
+@pytest.mark.parametrize(
+    'name, args',
+    (
+        ('notes:detail', pytest.lazy_fixture('slug_for_args')),
+        ('notes:list', None),
+    ),
+)
+def test_page_is_cached(author_client, name, args):
+    """Повторный запрос страницы не обращается к заметкам."""
+    url = reverse(name, args=args)
+    first, first_queries = note_queries(author_client, url)
+    second, second_queries = note_queries(author_client, url)
+    assert first_queries > 0
+    assert second_queries == 0
+    assert second.content == first.content
+
+
+def test_cache_is_per_user(author_client, not_author_client, note):
+    """Закешированный список автора не показывается другому пользователю."""
+    url = reverse('notes:list')
+    author_client.get(url)
+    response = not_author_client.get(url)
+    assert note.title not in response.content.decode()
+
+
+def test_edit_invalidates_cache(author_client, note, form_data):
+    """После редактирования страница заметки показывает новые данные."""
+    author_client.get(reverse('notes:detail', args=(note.slug,)))
+    author_client.get(reverse('notes:list'))
+    author_client.post(reverse('notes:edit', args=(note.slug,)), form_data)
+    detail = author_client.get(
+        reverse('notes:detail', args=(form_data['slug'],))
+    )
+    assert form_data['text'] in detail.content.decode()
+    notes_list = author_client.get(reverse('notes:list'))
+    assert form_data['title'] in notes_list.content.decode()
+
+
+def test_delete_invalidates_cache(author_client, note):
+    """После удаления заметка пропадает из закешированного списка."""
+    url = reverse('notes:list')
+    author_client.get(url)
+    author_client.post(reverse('notes:delete', args=(note.slug,)))
+    assert note.title not in author_client.get(url).content.decode()
+
+
+def test_create_invalidates_cache(author_client, note, form_data):
+    """Новая заметка сразу появляется в списке."""
+    url = reverse('notes:list')
+    author_client.get(url)
+    author_client.post(reverse('notes:add'), form_data)
+    assert form_data['title'] in author_client.get(url).content.decode()
+
+
+def test_model_save_bumps_version(author, note):
+    """Сохранение заметки меняет версию кеша автора."""
+    version = get_version(author.pk)
+    note.save()
+    assert get_version(author.pk) != version
+    version = get_version(author.pk)
+    Note.objects.get(pk=note.pk).delete()
+    assert get_version(author.pk) != version
+
+
+def test_page_built_during_write_is_not_served(author_client, note,
+                                               monkeypatch):
+    """Страница по старым данным не сохраняется под новой версией."""
+    url = reverse('notes:detail', args=(note.slug,))
+    get_object = NoteDetail.get_object
+
+    def racing_write(self, *args, **kwargs):
+        old = get_object(self, *args, **kwargs)
+        Note.objects.filter(pk=note.pk).update(text='Новый текст')
+        bump_version(note.author_id)
+        return old
+
+    monkeypatch.setattr(NoteDetail, 'get_object', racing_write)
+    assert note.text in author_client.get(url).content.decode()
+    monkeypatch.undo()
+    assert 'Новый текст' in author_client.get(url).content.decode()
+
+
+def test_notes_cache_must_be_shared(settings):
+    settings.CACHES = {
+        **settings.CACHES,
+        settings.NOTES_CACHE_ALIAS: {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+    }
+    with pytest.raises(ImproperlyConfigured, match='notes'):
+        check_notes_cache()
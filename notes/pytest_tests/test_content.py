@@ -1,8 +1,14 @@
 import pytest
 
+from http import HTTPStatus
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from notes.forms import NoteForm
+from notes.models import Note
+from notes.pagination import KeysetPaginator
 
 
 @pytest.mark.parametrize(
@@ -37,3 +43,94 @@ def test_page_contains_form(author_client, name, args):
     response = author_client.get(url)
     assert 'form' in response.context
     assert isinstance(response.context['form'], NoteForm)
+
+
+@pytest.mark.django_db
+def test_notes_list_keyset_pagination(author_client, many_notes):
+    """Постраничный вывод заметок по курсору."""
+    url = reverse('notes:list')
+    response = author_client.get(url, {'per_page': 2})
+    page = response.context['page_obj']
+    assert list(response.context['object_list']) == many_notes[:2]
+    assert page.next_cursor == many_notes[1].id
+    response = author_client.get(
+        url, {'per_page': 2, 'after': page.next_cursor}
+    )
+    assert list(response.context['object_list']) == many_notes[2:4]
+    response = author_client.get(
+        url, {'per_page': 2, 'after': many_notes[3].id}
+    )
+    assert list(response.context['object_list']) == many_notes[4:]
+    assert not response.context['page_obj'].has_next()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('per_page, has_next', ((4, True), (5, False)))
+def test_keyset_page_in_one_query(author_client, many_notes, per_page,
+                                  has_next):
+    """Следующая страница видна по лишней записи, без запроса EXISTS."""
+    url = reverse('notes:list')
+    author_client.get(url)
+    with CaptureQueriesContext(connection) as context:
+        response = author_client.get(url, {'per_page': per_page})
+    assert response.context['page_obj'].has_next() is has_next
+    assert len(response.context['object_list']) == per_page
+    assert sum(
+        'notes_note' in query['sql'] for query in context.captured_queries
+    ) == 1
+
+
+@pytest.mark.django_db
+def test_keyset_page_keeps_prefetch(many_notes):
+    """Страница - загруженный список, prefetch_related выполняется."""
+    paginator = KeysetPaginator(Note.objects.prefetch_related('author'), 2)
+    with CaptureQueriesContext(connection) as context:
+        page = paginator.get_page(None)
+        assert {note.author.username for note in page} == {'Автор'}
+    assert len(context.captured_queries) == 2
+    assert page.object_list.count() == 2
+
+
+@pytest.mark.django_db
+def test_notes_list_page_size_limit(author_client, many_notes, settings):
+    """Размер страницы ограничен настройкой NOTES_MAX_PAGE_SIZE."""
+    settings.NOTES_MAX_PAGE_SIZE = 3
+    response = author_client.get(reverse('notes:list'), {'per_page': 100})
+    assert len(response.context['object_list']) == 3
+
+
+@pytest.mark.django_db
+def test_notes_list_streaming(author_client, not_author, many_notes):
+    """Потоковая отдача списка содержит все заметки автора."""
+    Note.objects.create(
+        title='Чужая', text='Текст', slug='alien', author=not_author
+    )
+    response = author_client.get(reverse('notes:list'), {'stream': 1})
+    assert response.streaming
+    content = b''.join(response.streaming_content).decode()
+    for note in many_notes:
+        assert reverse('notes:detail', args=(note.slug,)) in content
+    assert 'alien' not in content
+    assert '</html>' in content
+
+
+@pytest.mark.django_db
+def test_notes_list_defers_text(author_client, note):
+    """Список заметок не загружает текст заметок."""
+    response = author_client.get(reverse('notes:list'))
+    for listed_note in response.context['object_list']:
+        assert 'text' in listed_note.get_deferred_fields()
+
+
+def test_admin_changelist_defers_text(admin_client, note):
+    """Список заметок в админке не загружает текст заметок."""
+    with CaptureQueriesContext(connection) as context:
+        response = admin_client.get(reverse('admin:notes_note_changelist'))
+    assert response.status_code == HTTPStatus.OK
+    note_queries = [
+        query['sql'] for query in context.captured_queries
+        if query['sql'].startswith('SELECT "notes_note"."id"')
+    ]
+    assert note_queries
+    for sql in note_queries:
+        assert '"notes_note"."text"' not in sql
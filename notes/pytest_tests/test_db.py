@@ -0,0 +1,90 @@
+import sqlite3
+
+import pytest
+
+from django.db import OperationalError, connection, transaction
+
+from notes.db import configure_sqlite, retry_on_locked
+
+
+def pragma(name):
+    with connection.cursor() as cursor:
+        cursor.execute(f'PRAGMA {name}')
+        return cursor.fetchone()[0]
+
+
+@pytest.mark.django_db
+def test_pragmas_applied_to_new_connections():
+    """Новое соединение получает PRAGMA из настроек."""
+    connection.close()
+    connection.ensure_connection()
+    assert pragma('synchronous') == 1
+    assert pragma('cache_size') == -64 * 1024
+    assert pragma('temp_store') == 2
+
+
+def test_wal_enabled_for_file_database(tmp_path):
+    """База в файле переключается в режим WAL."""
+    db = sqlite3.connect(tmp_path / 'wal.sqlite3')
+
+    class Wrapper:
+        vendor = 'sqlite'
+        connection = db
+
+        def cursor(self):
+            return db
+
+    try:
+        configure_sqlite(sender=None, connection=Wrapper())
+        mode = db.execute('PRAGMA journal_mode').fetchone()[0]
+    finally:
+        db.close()
+    assert mode == 'wal'
+
+
+@pytest.fixture
+def flaky(settings):
+    settings.NOTES_SQLITE_LOCK_RETRIES = 2
+    settings.NOTES_SQLITE_LOCK_RETRY_DELAY = 0
+    calls = []
+
+    def func(failures, message='database is locked'):
+        calls.append(1)
+        if len(calls) <= failures:
+            raise OperationalError(message)
+        return len(calls)
+
+    return func, calls
+
+
+@pytest.mark.django_db(transaction=True)
+def test_retry_on_locked(flaky):
+    """Заблокированная запись повторяется до успеха."""
+    func, calls = flaky
+    assert retry_on_locked(func)(2) == 3
+
+
+@pytest.mark.django_db(transaction=True)
+def test_retry_gives_up(flaky):
+    """После исчерпания попыток ошибка пробрасывается."""
+    func, calls = flaky
+    with pytest.raises(OperationalError):
+        retry_on_locked(func)(3)
+    assert len(calls) == 3
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize('in_atomic, message', (
+    (True, 'database is locked'),
+    (False, 'no such table: notes_note'),
+))
+def test_no_retry(flaky, in_atomic, message):
+    """Внутри транзакции и при других ошибках повтора нет."""
+    func, calls = flaky
+    with pytest.raises(OperationalError):
+        if in_atomic:
+            with transaction.atomic():
+                retry_on_locked(func)(1, message)
+        else:
+            retry_on_locked(func)(1, message)
+    assert len(calls) == 1
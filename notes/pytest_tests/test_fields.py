@@ -0,0 +1,123 @@
+import sqlite3
+
+import pytest
+
+from http import HTTPStatus
+from secrets import token_urlsafe
+
+from django.db import connection
+from django.urls import reverse
+
+from notes.fields import MARKER, compress, decompress
+from notes.models import Note
+from notes.search import rebuild_index
+
+LOG = ''.join(
+    f'2026-10-18 12:00:{index % 60:02} INFO worker-{index % 8} '
+    f'обработан запрос {index}\n'
+    for index in range(2000)
+)
+
+
+def stored_text(note):
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT text FROM notes_note WHERE id = %s', [note.id])
+        return cursor.fetchone()[0]
+
+
+@pytest.mark.parametrize('algorithm', ('zlib', 'lzma'))
+def test_large_values_are_compressed(algorithm):
+    packed = compress(LOG, algorithm, threshold=1024)
+    assert packed.startswith(MARKER)
+    assert len(packed) < len(LOG.encode()) / 5
+    assert decompress(packed) == LOG
+
+
+@pytest.mark.parametrize('value', ('', 'Короткий текст', MARKER + 'zlib'))
+def test_small_values_round_trip(value):
+    packed = compress(value, threshold=1024)
+    assert decompress(packed) == value
+    if not value.startswith(MARKER):
+        assert packed == value
+
+
+def test_incompressible_value_is_stored_as_is():
+    value = token_urlsafe(3000)
+    assert compress(value, threshold=16) == value
+
+
+@pytest.mark.django_db
+def test_note_text_is_transparent(author, author_client):
+    """Заметка хранится сжатой, а читается и выводится как обычно."""
+    note = Note.objects.create(title='Лог', text=LOG, author=author)
+    assert stored_text(note).startswith(MARKER)
+    assert Note.objects.get(pk=note.pk).text == LOG
+    assert Note.objects.values_list('text', flat=True).get() == LOG
+    response = author_client.get(reverse('notes:detail', args=(note.slug,)))
+    assert response.status_code == HTTPStatus.OK
+    assert 'обработан запрос 1999' in response.content.decode()
+    response = author_client.get(reverse('notes:edit', args=(note.slug,)))
+    assert response.context['form'].initial['text'] == LOG
+
+
+@pytest.mark.django_db
+def test_compression_can_be_disabled(settings, author):
+    settings.NOTES_COMPRESS_THRESHOLD = None
+    note = Note.objects.create(title='Лог', text=LOG, author=author)
+    assert stored_text(note) == LOG
+
+
+@pytest.mark.django_db
+def test_search_indexes_compressed_text(author, author_client):
+    """Полнотекстовый индекс получает распакованный текст."""
+    note = Note.objects.create(title='Лог', text=LOG, author=author)
+    url = reverse('notes:search')
+    for rebuild in (False, True):
+        if rebuild:
+            rebuild_index()
+        response = author_client.get(url, {'q': 'worker-7'})
+        assert list(response.context['object_list']) == [note]
+    note.text = 'Пусто'
+    note.save()
+    response = author_client.get(url, {'q': 'worker-7'})
+    assert not response.context['object_list']
+
+
+@pytest.mark.django_db
+def test_search_indexes_bulk_created_compressed_text(author, author_client):
+    Note.objects.bulk_create(
+        Note(title='Лог', text=LOG, slug=f'log-{index}', author=author)
+        for index in range(2)
+    )
+    Note.objects.filter(slug='log-0').update(title='Журнал')
+    response = author_client.get(reverse('notes:search'), {'q': 'worker-7'})
+    assert {
+        note.slug for note in response.context['object_list']
+    } == {'log-0', 'log-1'}
+
+
+@pytest.mark.django_db
+def test_search_triggers_work_without_python_functions():
+    """Запись в notes_note возможна из соединения без notes_decompress."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT sql FROM sqlite_master WHERE name = 'notes_note' "
+            "OR name = 'notes_note_fts' OR type = 'trigger'"
+        )
+        schema = [row[0] for row in cursor.fetchall()]
+    plain = sqlite3.connect(':memory:')
+    for sql in schema:
+        plain.execute(sql)
+    plain.execute(
+        "INSERT INTO notes_note (title, text, slug, author_id, updated_at, "
+        "revision) VALUES ('Заметка', 'Текст', 'note', 1, '', 1)"
+    )
+    plain.execute(
+        "UPDATE notes_note SET title = 'Другая', text = ? WHERE slug = 'note'",
+        [compress(LOG)],
+    )
+    assert plain.execute(
+        "SELECT title, text FROM notes_note_fts WHERE rowid = 1"
+    ).fetchone() == ('Другая', '')
+    plain.execute('DELETE FROM notes_note')
+    assert not plain.execute('SELECT * FROM notes_note_fts').fetchall()
@@ -0,0 +1,82 @@
+import json
+from io import StringIO
+
+import pytest
+
+from django.contrib.auth.hashers import (
+    check_password, get_hasher, identify_hasher, make_password
+)
+from django.core.management import call_command
+from django.urls import reverse
+
+PASSWORD = 'Пароль-для-теста'
+# Малые параметры, чтобы тесты не тратили время на хэширование.
+FAST = {'NOTES_SCRYPT_N': 2 ** 10, 'NOTES_PBKDF2_ITERATIONS': 1000}
+
+
+@pytest.fixture(autouse=True)
+def fast_hashers(settings):
+    for name, value in FAST.items():
+        setattr(settings, name, value)
+
+
+def test_new_passwords_use_scrypt():
+    encoded = make_password(PASSWORD)
+    assert identify_hasher(encoded).algorithm == 'scrypt'
+    decoded = get_hasher('scrypt').decode(encoded)
+    assert (
+        decoded['work_factor'], decoded['block_size'], decoded['parallelism']
+    ) == (1024, 8, 1)
+    assert check_password(PASSWORD, encoded)
+    assert not check_password('другой пароль', encoded)
+
+
+def test_scrypt_must_update_on_changed_params(settings):
+    hasher = get_hasher('scrypt')
+    encoded = make_password(PASSWORD)
+    assert not hasher.must_update(encoded)
+    settings.NOTES_SCRYPT_N = 2 ** 11
+    assert hasher.must_update(encoded)
+    assert check_password(PASSWORD, encoded)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    'old_hash',
+    (
+        lambda: make_password(PASSWORD, hasher='pbkdf2_sha256'),
+        lambda: get_hasher('scrypt').encode(PASSWORD, 'salt' * 6, n=2 ** 9),
+    ),
+    ids=('pbkdf2', 'scrypt-cheaper'),
+)
+def test_password_is_rehashed_on_login(client, django_user_model, old_hash):
+    """Устаревший хэш пересчитывается при входе с текущими параметрами."""
+    user = django_user_model.objects.create(
+        username='Пользователь', password=old_hash()
+    )
+    response = client.post(
+        reverse('users:login'),
+        {'username': user.username, 'password': PASSWORD},
+    )
+    assert response.status_code == 302
+    user.refresh_from_db()
+    assert user.password.startswith('scrypt$1024$')
+    assert not get_hasher('scrypt').must_update(user.password)
+
+
+def test_benchmark_hashers_command():
+    out = StringIO()
+    call_command(
+        'benchmark_hashers', 'scrypt', 'argon2', processes=1, duration=0.01,
+        set=['NOTES_SCRYPT_N=512'], json=True, stdout=out,
+    )
+    scrypt, argon2 = json.loads(out.getvalue())
+    assert scrypt['params']['work factor'] == 512
+    assert scrypt['hashes_per_second_per_core'] > 0
+    assert scrypt['ms_per_hash'] > 0
+    try:
+        import argon2 as argon2_library  # noqa: F401
+    except ImportError:
+        assert 'skipped' in argon2
+    else:
+        assert argon2['hashes_per_second'] > 0
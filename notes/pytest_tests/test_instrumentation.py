@@ -0,0 +1,87 @@
+import pytest
+
+from http import HTTPStatus
+
+from django.urls import reverse
+
+from notes.instrumentation import METRICS, QueryBudgetExceeded
+
+pytestmark = [pytest.mark.django_db]
+
+QUERY_BUDGETS = {
+    'notes:home': 2,
+    'notes:list': 3,
+    'notes:detail': 3,
+    'notes:add': 9,
+    'notes:edit': 10,
+    'notes:delete': 11,
+    'notes:search': 3,
+    'notes:api-list': 3,
+    'notes:api-detail': 3,
+    'notes:api-changes': 4,
+}
+
+
+@pytest.fixture(autouse=True)
+def instrumentation(settings):
+    """Метрики включены, превышение бюджета запросов - ошибка."""
+    settings.NOTES_INSTRUMENTATION = True
+    settings.NOTES_QUERY_BUDGETS = QUERY_BUDGETS
+    settings.NOTES_QUERY_BUDGET_STRICT = True
+    METRICS.reset()
+    yield
+    METRICS.reset()
+
+
+@pytest.fixture
+def many_notes_count():
+    """Много заметок автора: N+1 запросы в списке стали бы заметны."""
+    return 30
+
+
+@pytest.mark.parametrize(
+    'name, args, method, data',
+    (
+        ('notes:home', None, 'get', None),
+        ('notes:list', None, 'get', None),
+        ('notes:detail', pytest.lazy_fixture('slug_for_args'), 'get', None),
+        ('notes:edit', pytest.lazy_fixture('slug_for_args'), 'get', None),
+        ('notes:search', None, 'get', {'q': 'Заметка'}),
+        ('notes:api-list', None, 'get', None),
+        ('notes:api-detail', pytest.lazy_fixture('slug_for_args'), 'get',
+         None),
+        ('notes:api-changes', None, 'get', None),
+        ('notes:add', None, 'post', pytest.lazy_fixture('form_data')),
+        ('notes:edit', pytest.lazy_fixture('slug_for_args'), 'post',
+         pytest.lazy_fixture('form_data')),
+        ('notes:delete', pytest.lazy_fixture('slug_for_args'), 'post', None),
+    ),
+)
+def test_views_fit_query_budget(
+    author_client, many_notes, name, args, method, data
+):
+    """Представления укладываются в бюджет SQL-запросов."""
+    response = getattr(author_client, method)(reverse(name, args=args), data)
+    assert response.status_code < HTTPStatus.BAD_REQUEST
+    metrics = METRICS.snapshot()[name]
+    assert metrics['queries']['count'] == 1
+    assert metrics['queries']['sum'] <= QUERY_BUDGETS[name]
+
+
+def test_budget_exceeded_fails(author_client, settings):
+    """Превышение бюджета запросов приводит к ошибке."""
+    settings.NOTES_QUERY_BUDGETS = {'notes:list': 1}
+    with pytest.raises(QueryBudgetExceeded):
+        author_client.get(reverse('notes:list'))
+
+
+def test_metrics_view(admin_client, author_client, note):
+    """Метрики доступны персоналу и содержат время ответа."""
+    author_client.get(reverse('notes:detail', args=(note.slug,)))
+    response = author_client.get(reverse('notes:metrics'))
+    assert response.status_code == HTTPStatus.FORBIDDEN
+    metrics = admin_client.get(reverse('notes:metrics')).json()
+    detail = metrics['notes:detail']
+    assert detail['total_ms']['count'] == 1
+    assert detail['render_ms']['sum'] > 0
+    assert detail['queries']['sum'] >= 1
@@ -0,0 +1,190 @@
+import pytest
+
+from http import HTTPStatus
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from pytest_django.asserts import assertRedirects
+
+from notes import jobs
+from notes.models import Job, Note, Tombstone
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def small_chunks(settings):
+    settings.NOTES_JOB_CHUNK_SIZE = 3
+    settings.NOTES_JOB_CHUNK_PAUSE = 0
+
+
+@pytest.fixture
+def many_notes_count():
+    return 10
+
+
+@pytest.fixture(autouse=True)
+def alien_note(not_author):
+    """Чужая заметка, которую задачи автора не должны затронуть."""
+    return Note.objects.create(
+        title='Чужая', text='Текст', slug='alien', author=not_author
+    )
+
+
+def test_job_is_claimed_once(author):
+    job = jobs.enqueue('delete_notes', user=author)
+    claimed = jobs.claim('worker-1')
+    assert claimed.pk == job.pk
+    assert claimed.status == Job.Status.RUNNING
+    assert claimed.worker == 'worker-1'
+    assert jobs.claim('worker-2') is None
+
+
+def test_unknown_job_kind(author):
+    with pytest.raises(ValueError):
+        jobs.enqueue('format_disk', user=author)
+
+
+def test_delete_notes_in_chunks(author, many_notes):
+    """Заметки удаляются пачками, с надгробиями и прогрессом."""
+    job = jobs.enqueue('delete_notes', user=author)
+    jobs.run(jobs.claim())
+    job.refresh_from_db()
+    assert job.status == Job.Status.DONE
+    assert (job.done, job.total, job.percent) == (10, 10, 100)
+    assert not Note.objects.filter(author=author).exists()
+    assert Note.objects.filter(slug='alien').exists()
+    assert Tombstone.objects.filter(author=author).count() == 10
+
+
+def test_delete_selected_notes(author, many_notes):
+    ids = list(Note.objects.filter(author=author).values_list('id', flat=True))
+    alien = Note.objects.get(slug='alien')
+    jobs.enqueue('delete_notes', user=author, note_ids=[ids[0], alien.id])
+    jobs.run(jobs.claim())
+    assert not Note.objects.filter(pk=ids[0]).exists()
+    assert Note.objects.filter(author=author).count() == 9
+    assert Note.objects.filter(pk=alien.pk).exists()
+
+
+def test_move_notes(author, not_author, many_notes):
+    """Перенос: надгробия старому владельцу, новые ревизии новому."""
+    revision = Note.objects.order_by('-revision').first().revision
+    job = jobs.enqueue('move_notes', user=author, to_user_id=not_author.id)
+    jobs.run(jobs.claim())
+    job.refresh_from_db()
+    assert job.status == Job.Status.DONE
+    assert Note.objects.filter(author=not_author).count() == 11
+    assert Tombstone.objects.filter(author=author).count() == 10
+    moved = Note.objects.filter(author=not_author).exclude(slug='alien')
+    assert all(note.revision > revision for note in moved)
+
+
+def test_failed_job_records_error(author):
+    job = jobs.enqueue('move_notes', user=author, to_user_id=author.id)
+    jobs.run(jobs.claim())
+    job.refresh_from_db()
+    assert job.status == Job.Status.FAILED
+    assert 'ValueError' in job.error
+
+
+def test_delete_account(author, many_notes):
+    user_model = get_user_model()
+    job = jobs.enqueue('delete_account', user=author, user_id=author.id)
+    jobs.run(jobs.claim())
+    job.refresh_from_db()
+    assert job.status == Job.Status.DONE
+    assert job.user is None
+    assert not user_model.objects.filter(pk=author.pk).exists()
+    assert Note.objects.count() == 1
+    assert not Tombstone.objects.exists()
+
+
+def test_stale_job_is_requeued(author):
+    job = jobs.enqueue('delete_notes', user=author)
+    jobs.claim()
+    assert jobs.requeue_stale(seconds=60) == 0
+    assert jobs.requeue_stale(seconds=-1) == 1
+    job.refresh_from_db()
+    assert job.status == Job.Status.QUEUED
+
+
+def test_work_loop_requeues_stale_jobs(author, settings):
+    job = jobs.enqueue('delete_notes', user=author)
+    jobs.claim('dead-worker')
+    settings.NOTES_JOB_STALE_SECONDS = -1
+    assert jobs.work(once=True) == 1
+    job.refresh_from_db()
+    assert job.status == Job.Status.DONE
+
+
+def test_admin_user_delete_enqueues_job(admin_client, author, many_notes):
+    url = reverse('admin:auth_user_delete', args=(author.pk,))
+    response = admin_client.post(url, {'post': 'yes'})
+    assert response.status_code == HTTPStatus.FOUND
+    author.refresh_from_db()
+    assert not author.is_active
+    job = Job.objects.get(kind='delete_account')
+    assert job.payload == {'user_id': author.pk}
+    jobs.run(jobs.claim())
+    assert not get_user_model().objects.filter(pk=author.pk).exists()
+
+
+@pytest.mark.parametrize('bulk', (False, True))
+def test_admin_user_delete_confirmation_does_not_load_notes(
+    admin_client, author, many_notes, bulk
+):
+    """Страница подтверждения показывает только число заметок."""
+    if bulk:
+        url = reverse('admin:auth_user_changelist')
+        data = {'action': 'delete_selected', '_selected_action': author.pk}
+    else:
+        url = reverse('admin:auth_user_delete', args=(author.pk,))
+        data = {}
+    with CaptureQueriesContext(connection) as context:
+        response = (admin_client.post if bulk else admin_client.get)(
+            url, data
+        )
+    assert response.status_code == HTTPStatus.OK
+    assert 'Заметок: 10' in response.content.decode()
+    assert not [
+        query for query in context.captured_queries
+        if '"notes_note"."text"' in query['sql']
+    ]
+
+
+def test_run_jobs_command(author, many_notes):
+    jobs.enqueue('delete_notes', user=author)
+    jobs.enqueue('delete_notes', user=author)
+    out = StringIO()
+    call_command('run_jobs', once=True, stdout=out)
+    assert 'Выполнено задач: 2' in out.getvalue()
+    assert not Job.objects.exclude(status=Job.Status.DONE).exists()
+
+
+def test_bulk_delete_view(author_client, author, many_notes):
+    """Массовое удаление ставит задачу и ведёт на страницу её состояния."""
+    url = reverse('notes:bulk-delete')
+    response = author_client.get(url)
+    assert response.context['count'] == 10
+    response = author_client.post(url)
+    job = Job.objects.get()
+    assert job.user == author
+    url_job = reverse('notes:job', args=(job.pk,))
+    assertRedirects(response, url_job)
+    assert Note.objects.filter(author=author).count() == 10
+    assert 'refresh' in author_client.get(url_job).content.decode()
+    jobs.run(jobs.claim())
+    response = author_client.get(url_job)
+    assert response.context['job'].percent == 100
+    assert 'refresh' not in response.content.decode()
+
+
+def test_job_page_is_private(author, not_author_client):
+    job = jobs.enqueue('delete_notes', user=author)
+    response = not_author_client.get(reverse('notes:job', args=(job.pk,)))
+    assert response.status_code == HTTPStatus.NOT_FOUND
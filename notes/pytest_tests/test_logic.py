@@ -4,10 +4,13 @@ from http import HTTPStatus
 from pytils.translit import slugify
 from pytest_django.asserts import assertRedirects, assertFormError
 
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
-from notes.models import Note
+from notes.models import Note, allocate_revisions
 from notes.forms import WARNING
+from notes.slugs import make_slug
 
 
 pytestmark = [pytest.mark.django_db]
@@ -93,3 +96,48 @@ def test_other_user_cant_delete_note(not_author_client, slug_for_args):
     response = not_author_client.post(url)
     assert response.status_code == HTTPStatus.NOT_FOUND
     assert Note.objects.count() == 1
+
+
+def test_empty_slug_gets_suffix(author_client, note, form_data):
+    """При совпадении slug из заголовка добавляется суффикс."""
+    form_data.pop('slug')
+    form_data['title'] = note.title
+    Note.objects.filter(pk=note.pk).update(slug=slugify(note.title))
+    for expected_slug in ('-2', '-3'):
+        response = author_client.post(URL_NOTE_ADD, data=form_data)
+        assertRedirects(response, URL_NOTE_SUCCESS)
+        assert Note.objects.latest('id').slug == (
+            slugify(note.title) + expected_slug
+        )
+
+
+def test_create_note_single_write(author_client, form_data):
+    """Создание заметки - один INSERT без проверочных запросов."""
+    with CaptureQueriesContext(connection) as context:
+        author_client.post(URL_NOTE_ADD, data=form_data)
+    note_queries = [
+        query['sql'] for query in context.captured_queries
+        if 'notes_note' in query['sql']
+    ]
+    assert len(note_queries) == 1
+    assert note_queries[0].startswith('INSERT')
+
+
+@pytest.mark.django_db
+def test_allocate_revisions_in_one_statement():
+    """Ревизии выделяются одним UPDATE ... RETURNING без точки сохранения."""
+    first = allocate_revisions(2)
+    with transaction.atomic():
+        with CaptureQueriesContext(connection) as context:
+            second = allocate_revisions(3)
+    assert second == range(first[-1] + 1, first[-1] + 4)
+    assert len(context.captured_queries) == 1
+    assert 'RETURNING' in context.captured_queries[0]['sql']
+
+
+def test_slug_transliteration_is_memoized():
+    """Транслитерация одинаковых заголовков выполняется один раз."""
+    make_slug.cache_clear()
+    make_slug('Заголовок', 100)
+    make_slug('Заголовок', 100)
+    assert make_slug.cache_info().hits == 1
@@ -0,0 +1,71 @@
+import re
+
+import pytest
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.skipif(
+        connection.vendor != 'sqlite', reason='План запроса SQLite.'
+    ),
+]
+
+NOTE_TABLE = 'notes_note'
+NOTE_TABLE_STEP = re.compile(rf'\b{NOTE_TABLE}\b')
+# Формулировки EXPLAIN QUERY PLAN меняются между версиями SQLite,
+# поэтому проверяется только, что шаг назвал индекс или первичный ключ.
+PRIMARY_KEY = 'PRIMARY KEY'
+
+
+def note_indexes():
+    """Имена индексов таблицы заметок, включая автоиндексы UNIQUE."""
+    with connection.cursor() as cursor:
+        cursor.execute(f'PRAGMA index_list({NOTE_TABLE})')
+        return [row[1] for row in cursor.fetchall()]
+
+
+def note_query_plans(client, url, params=None):
+    """Планы всех запросов к таблице заметок при GET-запросе к url."""
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url, params)
+        if response.streaming:
+            b''.join(response.streaming_content)
+    plans = {}
+    with connection.cursor() as cursor:
+        for query in context.captured_queries:
+            sql = query['sql']
+            if not sql.startswith('SELECT') or NOTE_TABLE not in sql:
+                continue
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            plans[sql] = [row[-1] for row in cursor.fetchall()]
+    return plans
+
+
+@pytest.mark.parametrize(
+    'name, args, params',
+    (
+        ('notes:list', None, None),
+        ('notes:list', None, {'after': 1, 'per_page': 1}),
+        ('notes:list', None, {'stream': 1}),
+        ('notes:detail', pytest.lazy_fixture('slug_for_args'), None),
+        ('notes:edit', pytest.lazy_fixture('slug_for_args'), None),
+        ('notes:delete', pytest.lazy_fixture('slug_for_args'), None),
+        ('notes:search', None, {'q': 'Текст'}),
+    ),
+)
+def test_note_queries_use_index(author_client, note, name, args, params):
+    """Запросы представлений к заметкам идут по индексу,
+    без полного сканирования таблицы.
+    """
+    indexes = note_indexes()
+    plans = note_query_plans(author_client, reverse(name, args=args), params)
+    assert plans
+    for sql, plan in plans.items():
+        for step in plan:
+            if NOTE_TABLE_STEP.search(step):
+                assert PRIMARY_KEY in step or any(
+                    index in step for index in indexes
+                ), (sql, plan)
@@ -0,0 +1,87 @@
+import json
+from http import HTTPStatus
+
+import pytest
+
+from django.urls import reverse
+
+from notes.models import Note
+from notes.ratelimit import take_token
+
+
+@pytest.fixture
+def limit(settings):
+    settings.NOTES_RATE_LIMIT_RATE = 1.0
+    settings.NOTES_RATE_LIMIT_BURST = 2
+
+
+@pytest.mark.usefixtures('limit')
+def test_token_bucket_refills():
+    assert take_token(1, now=100) == 0
+    assert take_token(1, now=100) == 0
+    assert take_token(1, now=100) == pytest.approx(1)
+    assert take_token(2, now=100) == 0
+    assert take_token(1, now=100.5) == pytest.approx(0.5)
+    assert take_token(1, now=101) == 0
+    assert take_token(1, now=101) == pytest.approx(1)
+
+
+def test_disabled_limit(settings):
+    settings.NOTES_RATE_LIMIT_RATE = None
+    assert all(take_token(1) == 0 for _ in range(100))
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('limit')
+def test_writes_are_limited(author_client, not_author_client, form_data):
+    url = reverse('notes:add')
+    for index in range(2):
+        response = author_client.post(url, {**form_data, 'slug': index})
+        assert response.status_code == HTTPStatus.FOUND
+    response = author_client.post(url, form_data)
+    assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+    assert response['Retry-After'] == '1'
+    assert Note.objects.count() == 2
+    assert author_client.get(reverse('notes:list')).status_code == (
+        HTTPStatus.OK
+    )
+    response = not_author_client.post(url, form_data)
+    assert response.status_code == HTTPStatus.FOUND
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('limit')
+def test_api_writes_are_limited(author_client, note):
+    url = reverse('notes:api-detail', args=(note.slug,))
+    for _ in range(2):
+        author_client.patch(url, '{}', content_type='application/json')
+    response = author_client.delete(url)
+    assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+    assert response['Retry-After'] == '1'
+    assert 'detail' in response.json()
+    assert Note.objects.filter(pk=note.pk).exists()
+
+
+@pytest.mark.django_db
+def test_unchanged_edit_is_not_saved(author_client, note):
+    """Повторная отправка той же правки не пишет в базу."""
+    url = reverse('notes:edit', args=(note.slug,))
+    data = {'title': note.title, 'text': note.text, 'slug': note.slug}
+    response = author_client.post(url, data)
+    assert response.status_code == HTTPStatus.FOUND
+    response = author_client.patch(
+        reverse('notes:api-detail', args=(note.slug,)),
+        json.dumps({'title': note.title}), content_type='application/json',
+    )
+    assert response.json()['revision'] == note.revision
+    revision, updated_at = note.revision, note.updated_at
+    note.refresh_from_db()
+    assert (note.revision, note.updated_at) == (revision, updated_at)
+
+
+@pytest.mark.django_db
+def test_changed_edit_is_saved(author_client, note, form_data):
+    author_client.post(reverse('notes:edit', args=(note.slug,)), form_data)
+    revision = note.revision
+    note.refresh_from_db()
+    assert note.revision > revision
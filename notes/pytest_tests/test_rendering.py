@@ -0,0 +1,167 @@
+import time
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+
+from django.core.management import call_command
+from django.urls import reverse
+
+from notes import rendering
+from notes.models import Note
+from notes.rendering import render, render_key, render_markdown
+
+
+@pytest.fixture(autouse=True)
+def clear_local_cache():
+    rendering.LOCAL_CACHE.clear()
+
+
+@pytest.fixture
+def shared_cache(settings, tmp_path):
+    settings.CACHES = {
+        **settings.CACHES,
+        'markdown': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': str(tmp_path),
+        },
+    }
+    settings.NOTES_MARKDOWN_CACHE_ALIAS = 'markdown'
+    return rendering.get_shared_cache()
+
+
+@pytest.fixture
+def render_calls(monkeypatch):
+    calls = []
+
+    def counting(text):
+        calls.append(text)
+        return f'<p>{text}</p>'
+
+    monkeypatch.setattr(rendering, 'render_markdown', counting)
+    return calls
+
+
+@pytest.mark.parametrize(
+    'text, html',
+    (
+        ('# Заголовок', '<h4>Заголовок</h4>'),
+        ('**жирный** и *курсив*',
+         '<p><strong>жирный</strong> и <em>курсив</em></p>'),
+        ('раз\nдва\n\nтри', '<p>раз<br>\nдва</p>\n<p>три</p>'),
+        ('- a\n- b', '<ul><li>a</li><li>b</li></ul>'),
+        ('1. a\n2. b', '<ol><li>a</li><li>b</li></ol>'),
+        ('> цитата', '<blockquote><p>цитата</p></blockquote>'),
+        ('```\n<b>*x*</b>\n```',
+         '<pre><code>&lt;b&gt;*x*&lt;/b&gt;</code></pre>'),
+        ('`<i>` a_b_c', '<p><code>&lt;i&gt;</code> a_b_c</p>'),
+        ('[сайт](https://ya.ru/?a=1&b=2)',
+         '<p><a href="https://ya.ru/?a=1&amp;b=2" rel="nofollow noopener">'
+         'сайт</a></p>'),
+    )
+)
+def test_markdown(text, html):
+    assert render_markdown(text) == html
+
+
+@pytest.mark.parametrize(
+    'text',
+    (
+        '<script>alert(1)</script>',
+        '<img src=x onerror=alert(1)>',
+        '[x](javascript:alert(1))',
+        '[x](JaVaScRiPt:alert(1))',
+        '[x](java\tscript:alert(1))',
+        '[x](data:text/html,<script>)',
+        '[x](https://a.b/" onclick="alert(1))',
+        '**<b>**',
+        '> ' * 1000 + 'глубоко',
+    )
+)
+def test_markdown_is_safe(text):
+    html = render_markdown(text)
+    assert '<script' not in html
+    assert '<img' not in html
+    assert '<b>' not in html
+    assert 'href="javascript' not in html.lower()
+    assert 'href="data' not in html
+    assert '" onclick' not in html
+
+
+@pytest.mark.parametrize(
+    'text',
+    (
+        '[a' * 50000,
+        '[x](' * 30000,
+        '[a](' + 'b' * 100000,
+        '_a ' * 50000,
+        '*a ' * 50000,
+        '**a ' * 50000,
+        '__a ' * 50000,
+        '`' * 100000,
+        '# ' + ' ' * 100000 + 'x',
+    )
+)
+def test_adversarial_text_renders_fast(text):
+    """Время рендеринга линейно, а не квадратично по длине строки."""
+    start = time.perf_counter()
+    render_markdown(text)
+    assert time.perf_counter() - start < 1
+
+
+def test_local_cache_by_content(render_calls, settings):
+    settings.NOTES_MARKDOWN_CACHE_SIZE = 2
+    assert render('a') == render('a') == '<p>a</p>'
+    assert render_calls == ['a']
+    render('b')
+    render('c')
+    render('a')
+    assert render_calls == ['a', 'b', 'c', 'a']
+
+
+def test_shared_cache(render_calls, shared_cache):
+    render('a')
+    assert shared_cache.get(render_key('a')) == '<p>a</p>'
+    rendering.LOCAL_CACHE.clear()
+    render('a')
+    assert render_calls == ['a']
+
+
+def test_renderer_version_changes_key(monkeypatch):
+    key = render_key('a')
+    monkeypatch.setattr(
+        rendering, 'RENDERER_VERSION', rendering.RENDERER_VERSION + 1
+    )
+    assert render_key('a') != key
+
+
+@pytest.mark.django_db
+def test_detail_renders_markdown(author_client, author):
+    note = Note.objects.create(
+        title='Заметка', text='**важно** <b>', slug='md', author=author
+    )
+    response = author_client.get(reverse('notes:detail', args=(note.slug,)))
+    assert response.status_code == HTTPStatus.OK
+    assert '<strong>важно</strong> &lt;b&gt;' in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_prerender_notes(author, shared_cache):
+    texts = [f'# Заметка {index}' for index in range(5)]
+    Note.objects.bulk_create(
+        Note(title='Заметка', text=text, slug=f'n-{index}', author=author)
+        for index, text in enumerate(texts[:1] + texts)
+    )
+    out = StringIO()
+    call_command('prerender_notes', workers=2, chunk_size=2, stdout=out)
+    assert 'заметок 6, отрендерено 5, пропущено 1' in out.getvalue()
+    for text in texts:
+        assert shared_cache.get(render_key(text)) == render_markdown(text)
+    call_command('prerender_notes', workers=1, stdout=out)
+    assert 'отрендерено 0, пропущено 6' in out.getvalue()
+
+
+def test_prerender_needs_shared_cache(settings):
+    settings.NOTES_MARKDOWN_CACHE_ALIAS = None
+    with pytest.raises(Exception, match='NOTES_MARKDOWN_CACHE_ALIAS'):
+        call_command('prerender_notes')
@@ -0,0 +1,131 @@
+from http import HTTPStatus
+
+import pytest
+
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
+from django.db import DEFAULT_DB_ALIAS
+from django.urls import reverse
+
+from notes import routers
+from notes.models import Note
+from notes.routers import PIN_COOKIE, ReplicaRouter, use_replicas
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def replicas(settings):
+    settings.NOTES_READ_REPLICAS = ['replica1', 'replica2']
+    return settings.NOTES_READ_REPLICAS
+
+
+@pytest.fixture
+def routed(settings, monkeypatch):
+    """Реплика - сама основная база, решения о чтении заметок записываются."""
+    settings.NOTES_READ_REPLICAS = [DEFAULT_DB_ALIAS]
+    decisions = []
+    db_for_read = ReplicaRouter.db_for_read
+
+    def spy(self, model, **hints):
+        if model is Note:
+            decisions.append(routers.replicas_allowed.get())
+        return db_for_read(self, model, **hints)
+
+    monkeypatch.setattr(ReplicaRouter, 'db_for_read', spy)
+    return decisions
+
+
+def test_reads_go_to_replicas_only_when_allowed(replicas):
+    router = ReplicaRouter()
+    assert router.db_for_read(Note) == DEFAULT_DB_ALIAS
+    with use_replicas():
+        assert router.db_for_read(Note) in replicas
+    assert router.db_for_read(Note) == DEFAULT_DB_ALIAS
+
+
+@pytest.mark.parametrize('model', (get_user_model(), Session))
+def test_users_and_sessions_are_read_from_primary(replicas, model):
+    with use_replicas():
+        assert ReplicaRouter().db_for_read(model) == DEFAULT_DB_ALIAS
+
+
+def test_writes_go_to_primary(replicas, note):
+    note._state.db = 'replica1'
+    router = ReplicaRouter()
+    with use_replicas():
+        assert router.db_for_write(Note, instance=note) == DEFAULT_DB_ALIAS
+
+
+def test_replicas_are_not_migrated(replicas):
+    router = ReplicaRouter()
+    assert router.allow_migrate('replica1', 'notes') is False
+    assert router.allow_migrate(DEFAULT_DB_ALIAS, 'notes') is None
+
+
+@pytest.mark.parametrize(
+    'name, args',
+    (
+        ('notes:list', None),
+        ('notes:detail', pytest.lazy_fixture('slug_for_args')),
+        ('notes:api-list', None),
+        ('notes:api-detail', pytest.lazy_fixture('slug_for_args')),
+    )
+)
+def test_safe_requests_read_from_replicas(
+    routed, author_client, name, args
+):
+    routed.clear()
+    response = author_client.get(reverse(name, args=args))
+    assert response.status_code == HTTPStatus.OK
+    assert routed and all(routed)
+    assert PIN_COOKIE not in response.cookies
+
+
+def test_search_reads_from_replicas(routed, author_client, note):
+    """Запрос поиска выполняется при рендеринге - тоже с реплики."""
+    routed.clear()
+    response = author_client.get(
+        reverse('notes:search'), {'q': note.title.split()[0]}
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert note.title in response.content.decode()
+    assert routed and all(routed)
+
+
+@pytest.mark.parametrize(
+    'name, args',
+    (
+        ('notes:edit', pytest.lazy_fixture('slug_for_args')),
+        ('notes:delete', pytest.lazy_fixture('slug_for_args')),
+        ('notes:bulk-edit', None),
+    )
+)
+def test_forms_read_from_primary(routed, author_client, name, args):
+    """Формы изменения показывают данные основной базы."""
+    routed.clear()
+    response = author_client.get(reverse(name, args=args))
+    assert response.status_code == HTTPStatus.OK
+    assert routed and not any(routed)
+
+
+@pytest.mark.parametrize(
+    'name, args',
+    (
+        ('notes:add', None),
+        ('notes:edit', pytest.lazy_fixture('slug_for_args')),
+    )
+)
+def test_write_pins_client_to_primary(
+    routed, author_client, form_data, name, args
+):
+    """После записи клиент читает свои изменения из основной базы."""
+    routed.clear()
+    response = author_client.post(reverse(name, args=args), form_data)
+    assert response.status_code == HTTPStatus.FOUND
+    assert not any(routed)
+    assert PIN_COOKIE in response.cookies
+    routed.clear()
+    response = author_client.get(reverse('notes:list'))
+    assert form_data['title'] in response.content.decode()
+    assert routed and not any(routed)
@@ -0,0 +1,111 @@
+import pytest
+
+from http import HTTPStatus
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.urls import reverse
+
+from notes import search
+from notes.models import Note
+from notes.search import make_match_query
+
+pytestmark = [pytest.mark.django_db]
+
+URL_SEARCH = reverse('notes:search')
+
+
+def found(client, query):
+    response = client.get(URL_SEARCH, {'q': query})
+    return [note.slug for note in response.context['object_list']]
+
+
+@pytest.fixture
+def notes(author, not_author):
+    """Заметки автора и чужая заметка с теми же словами."""
+    Note.objects.bulk_create((
+        Note(title='Рецепт борща', text='Свёкла, капуста', slug='borsch',
+             author=author),
+        Note(title='Список покупок', text='Купить свёклу для борща',
+             slug='shopping', author=author),
+        Note(title='Отпуск', text='Билеты на поезд', slug='trip',
+             author=author),
+        Note(title='Рецепт борща', text='Чужой борщ', slug='alien',
+             author=not_author),
+    ))
+
+
+def test_search_ranks_by_relevance(author_client, notes):
+    """Результаты отсортированы по релевантности bm25."""
+    assert found(author_client, 'борща') == ['borsch', 'shopping']
+
+
+def test_search_only_own_notes(author_client, not_author_client, notes):
+    """Поиск возвращает только заметки пользователя."""
+    assert 'alien' not in found(author_client, 'борщ')
+    assert found(not_author_client, 'борщ') == ['alien']
+
+
+def test_search_by_prefix(author_client, notes):
+    """Последнее слово запроса ищется по префиксу."""
+    assert found(author_client, 'поез') == ['trip']
+
+
+@pytest.mark.parametrize('query', ('"', 'title:*', 'NOT AND', '  '))
+def test_search_syntax_is_not_interpreted(author_client, notes, query):
+    """Синтаксис FTS5 в запросе не приводит к ошибке."""
+    response = author_client.get(URL_SEARCH, {'q': query})
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_search_index_follows_changes(author_client, notes):
+    """Индекс обновляется при изменении и удалении заметок."""
+    Note.objects.filter(slug='trip').update(text='Билеты на самолёт')
+    assert found(author_client, 'поезд') == []
+    assert found(author_client, 'самолёт') == ['trip']
+    Note.objects.filter(slug='trip').delete()
+    assert found(author_client, 'самолёт') == []
+
+
+def test_rebuild_search_index(author_client, notes):
+    """Команда перестраивает индекс по таблице заметок."""
+    with connection.cursor() as cursor:
+        cursor.execute('DELETE FROM notes_note_fts')
+    assert found(author_client, 'борща') == []
+    call_command('rebuild_search_index', stdout=StringIO())
+    assert found(author_client, 'борща') == ['borsch', 'shopping']
+
+
+def test_failed_rebuild_keeps_index(author_client, notes, monkeypatch):
+    """Прерванная перестройка не оставляет индекс пустым или неполным."""
+    monkeypatch.setattr(search, 'REBUILD_BATCH_SIZE', 1)
+    calls = []
+
+    def decompress(text):
+        calls.append(text)
+        if len(calls) > 1:
+            raise RuntimeError
+        return text
+
+    monkeypatch.setattr(search, 'decompress', decompress)
+    with pytest.raises(RuntimeError):
+        search.rebuild_index()
+    assert found(author_client, 'борща') == ['borsch', 'shopping']
+
+
+def test_match_query_is_partitioned_by_author():
+    assert make_match_query('борщ свёкл', author_id=7) == (
+        'author: "7" AND {title text}: ("борщ" "свёкл"*)'
+    )
+
+
+def test_search_does_not_match_author_id(author, author_client, notes):
+    """Слова запроса не ищутся в столбце автора."""
+    assert found(author_client, str(author.pk)) == []
+
+
+def test_search_index_follows_author_change(author, not_author,
+                                            not_author_client, notes):
+    Note.objects.filter(slug='trip').update(author=not_author)
+    assert found(not_author_client, 'поезд') == ['trip']
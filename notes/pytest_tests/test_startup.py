@@ -0,0 +1,26 @@
+import json
+from io import StringIO
+
+from django.core.management import call_command
+
+
+def test_profile_startup_slim_settings():
+    """Облегчённые настройки отвечают на запрос без админки."""
+    out = StringIO()
+    call_command(
+        'profile_startup', 'yanote.settings_slim',
+        repeat=1, top=10000, json=True, stdout=out,
+    )
+    profile = json.loads(out.getvalue())['yanote.settings_slim']
+    assert profile['status'] == '200 OK'
+    assert profile['first_request_ms'] > 0
+    modules = profile['slowest_modules']
+    assert len(modules) == profile['modules_imported']
+    assert 'django.contrib.auth.backends' in modules
+    assert not any(
+        name.startswith((
+            'django.contrib.admin', 'django.contrib.messages',
+            'django.contrib.staticfiles', 'notes.static',
+        ))
+        for name in modules
+    )
@@ -0,0 +1,128 @@
+import asyncio
+import gzip
+
+import pytest
+
+from http import HTTPStatus
+
+from asgiref.sync import async_to_sync
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import AsyncClient, Client, RequestFactory
+from django.urls import reverse
+
+from notes.static import IMMUTABLE_CACHE, StaticFilesMiddleware
+
+CSS = 'css/yanote.css'
+BIG_CSS = 'css/big.css'
+
+
+@pytest.fixture
+def collected(settings, tmp_path):
+    """Собранная статика проекта и большой CSS во временном STATIC_ROOT."""
+    source = tmp_path / 'source'
+    (source / 'css').mkdir(parents=True)
+    (source / BIG_CSS).write_text(
+        ''.join(f'.note-{index} {{ margin: {index}px; }}\n'
+                for index in range(500))
+    )
+    settings.STATICFILES_DIRS = [*settings.STATICFILES_DIRS, source]
+    settings.STATIC_ROOT = tmp_path / 'static'
+    settings.STATICFILES_FINDERS = [
+        'django.contrib.staticfiles.finders.FileSystemFinder',
+    ]
+    call_command('collectstatic', interactive=False, verbosity=0)
+    # Хранилище перечитывает манифест после смены STATIC_ROOT.
+    settings.STATICFILES_STORAGE = 'notes.static.CompressedManifestStorage'
+    return settings.STATIC_ROOT
+
+
+def get(path, **headers):
+    return Client().get(path, **headers)
+
+
+def test_collectstatic_hashes_and_compresses(collected):
+    assert staticfiles_storage.stored_name(CSS) != CSS
+    # Маленький файл сжатием не уменьшается и хранится как есть.
+    small = staticfiles_storage.stored_name(CSS)
+    assert not (collected / f'{small}.gz').exists()
+    hashed = staticfiles_storage.stored_name(BIG_CSS)
+    original = (collected / hashed).read_bytes()
+    assert gzip.decompress((collected / f'{hashed}.gz').read_bytes()) == (
+        original
+    )
+
+
+@pytest.mark.django_db
+def test_pages_link_hashed_assets(collected, client):
+    content = client.get(reverse('notes:home')).content.decode()
+    assert staticfiles_storage.url(CSS) in content
+    assert staticfiles_storage.url(CSS) != f'/static/{CSS}'
+
+
+def test_hashed_file_is_immutable(collected):
+    url = staticfiles_storage.url(BIG_CSS)
+    response = get(url, HTTP_ACCEPT_ENCODING='gzip, deflate')
+    assert response.status_code == HTTPStatus.OK
+    assert response['Cache-Control'] == IMMUTABLE_CACHE
+    assert response['Content-Type'].startswith('text/css')
+    assert response['Content-Encoding'] == 'gzip'
+    assert response['Vary'] == 'Accept-Encoding'
+    assert b'.note-499' in gzip.decompress(
+        b''.join(response.streaming_content)
+    )
+
+
+def test_plain_file_without_accept_encoding(collected):
+    response = get(staticfiles_storage.url(BIG_CSS))
+    assert not response.has_header('Content-Encoding')
+    assert b'.note-499' in b''.join(response.streaming_content)
+
+
+def test_unhashed_file_is_revalidated(collected, settings):
+    response = get(f'/static/{CSS}')
+    assert response['Cache-Control'] == (
+        f'public, max-age={settings.NOTES_STATIC_MAX_AGE}'
+    )
+    response = get(
+        f'/static/{CSS}', HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+    )
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+
+@pytest.mark.parametrize('path', ('missing.css', '../settings.py'))
+def test_missing_file(collected, path):
+    assert get(f'/static/{path}').status_code == HTTPStatus.NOT_FOUND
+
+
+def test_brotli(collected):
+    pytest.importorskip('brotli')
+    response = get(
+        staticfiles_storage.url(BIG_CSS), HTTP_ACCEPT_ENCODING='gzip, br'
+    )
+    assert response['Content-Encoding'] == 'br'
+
+
+def test_middleware_is_async_capable(collected):
+    """Под ASGI middleware не переводит цепочку в синхронный режим."""
+    async def view(request):
+        return HttpResponse('view')
+
+    middleware = StaticFilesMiddleware(view)
+    assert asyncio.iscoroutinefunction(middleware)
+    factory = RequestFactory()
+    response = async_to_sync(middleware)(
+        factory.get(staticfiles_storage.url(BIG_CSS))
+    )
+    assert response['Cache-Control'] == IMMUTABLE_CACHE
+    assert async_to_sync(middleware)(factory.get('/')).content == b'view'
+
+
+def test_asgi_serves_static(collected):
+    async def request():
+        return await AsyncClient().get(staticfiles_storage.url(BIG_CSS))
+
+    response = async_to_sync(request)()
+    assert response.status_code == HTTPStatus.OK
+    assert response['Cache-Control'] == IMMUTABLE_CACHE
@@ -0,0 +1,48 @@
+import pytest
+
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.template import engines
+from django.urls import reverse
+
+from notes.templating import warm_templates
+
+URL_HOME = reverse('notes:home')
+
+
+def test_templates_are_warmed():
+    """После прогрева шаблоны notes берутся из кеша загрузчика."""
+    loader = engines['django'].engine.template_loaders[0]
+    loader.reset()
+    assert warm_templates() > 0
+    cached = loader.get_template_cache
+    for name in ('base.html', 'includes/header.html', 'notes/list.html'):
+        assert name in cached
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    'client_fixture, vary_on',
+    (
+        ('client', (False, '')),
+        ('author_client', (True, 'Автор')),
+    )
+)
+def test_header_fragment_is_cached(request, client_fixture, vary_on):
+    client = request.getfixturevalue(client_fixture)
+    key = make_template_fragment_key('header', vary_on)
+    assert cache.get(key) is None
+    client.get(URL_HOME)
+    assert cache.get(key) is not None
+
+
+@pytest.mark.django_db
+def test_header_varies_by_user(client, author_client, not_author_client):
+    """Закешированная шапка не показывается другим пользователям."""
+    assert 'Автор' in author_client.get(URL_HOME).content.decode()
+    content = not_author_client.get(URL_HOME).content.decode()
+    assert 'Не автор' in content
+    assert 'пользователя Автор' not in content
+    content = client.get(URL_HOME).content.decode()
+    assert reverse('users:login') in content
+    assert reverse('notes:add') not in content
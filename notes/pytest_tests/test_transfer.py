@@ -0,0 +1,80 @@
+import json
+from io import StringIO
+
+import pytest
+
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from notes.models import Note
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def jsonl_file(tmp_path, author):
+    """Файл JSON Lines с пятью заметками, одна со slug существующей."""
+    path = tmp_path / 'notes.jsonl'
+    rows = [
+        {'title': f'Заметка {index}', 'text': 'Текст', 'slug': ''}
+        for index in range(4)
+    ]
+    rows.append({'title': 'Заголовок', 'text': 'Текст', 'slug': 'note-slug'})
+    path.write_text(
+        ''.join(json.dumps(row, ensure_ascii=False) + '\n' for row in rows),
+        encoding='utf-8',
+    )
+    return path
+
+
+def test_import_notes(jsonl_file, author, note):
+    """Импорт пачками с разрешением конфликтов slug."""
+    with CaptureQueriesContext(connection) as context:
+        call_command(
+            'import_notes', str(jsonl_file), author=author.username,
+            chunk_size=2, stdout=StringIO(),
+        )
+    inserts = [
+        query for query in context.captured_queries
+        if query['sql'].startswith('INSERT INTO "notes_note"')
+    ]
+    assert len(inserts) == 3
+    assert Note.objects.filter(author=author).count() == 6
+    assert Note.objects.filter(slug='note-slug-2').exists()
+    assert Note.objects.filter(slug='zametka-0').exists()
+
+
+def test_import_skips_malformed_rows(tmp_path, author):
+    """Испорченные строки пропускаются, а не прерывают импорт."""
+    path = tmp_path / 'notes.jsonl'
+    path.write_text(
+        '{"title": "Первая", "text": "Текст"}\n'
+        '{"title": "Оборванная", "te\n'
+        '["не", "объект"]\n'
+        '{"title": ["Заголовок"], "text": "Текст"}\n'
+        '{"title": "Вторая", "text": "Текст"}\n',
+        encoding='utf-8',
+    )
+    stdout = StringIO()
+    call_command(
+        'import_notes', str(path), author=author.username, stdout=stdout
+    )
+    assert 'Импортировано: 2, пропущено: 3' in stdout.getvalue()
+    assert set(Note.objects.values_list('title', flat=True)) == {
+        'Первая', 'Вторая'
+    }
+
+
+@pytest.mark.parametrize('fmt', ('jsonl', 'csv'))
+def test_export_import_roundtrip(tmp_path, author, not_author, note, fmt):
+    """Экспортированные заметки импортируются другому пользователю."""
+    path = tmp_path / f'notes.{fmt}'
+    call_command('export_notes', str(path), stdout=StringIO())
+    Note.objects.all().delete()
+    call_command('import_notes', str(path), stdout=StringIO())
+    imported = Note.objects.get()
+    assert (imported.title, imported.text, imported.slug) == (
+        note.title, note.text, note.slug
+    )
+    assert imported.author == author
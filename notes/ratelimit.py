@@ -0,0 +1,49 @@
+"""Ограничение частоты изменяющих запросов пользователя.
+
+Ведро токенов на пользователя: в нём до NOTES_RATE_LIMIT_BURST токенов,
+каждый изменяющий запрос забирает один, а ведро пополняется
+на NOTES_RATE_LIMIT_RATE токенов в секунду. Если ведро пусто, запрос
+отклоняется с ответом 429 и заголовком Retry-After до того, как
+дойдёт до базы.
+
+Ведро хранится в кеше одним числом - моментом, когда оно снова станет
+полным (алгоритм GCRA): проверка - одно чтение и одна запись без
+счётчиков. Чтение и запись не атомарны, поэтому параллельные запросы
+одного пользователя из разных процессов могут изредка пройти сверх
+лимита; для защиты базы от перегрузки это допустимо.
+"""
+import math
+import time
+
+from django.conf import settings
+
+from .cache import get_cache
+
+BUCKET_KEY = 'notes:ratelimit:{user_id}'
+
+
+def take_token(user_id, now=None):
+    """Забирает токен из ведра пользователя.
+
+    Возвращает 0, если запрос разрешён, иначе сколько секунд ждать
+    следующего токена.
+    """
+    rate = settings.NOTES_RATE_LIMIT_RATE
+    if not rate:
+        return 0
+    now = time.time() if now is None else now
+    interval = 1 / rate
+    burst = settings.NOTES_RATE_LIMIT_BURST * interval
+    cache = get_cache()
+    key = BUCKET_KEY.format(user_id=user_id)
+    full_at = max(cache.get(key, now), now) + interval
+    wait = full_at - burst - now
+    if wait > 0:
+        return wait
+    cache.set(key, full_at, timeout=math.ceil(full_at - now))
+    return 0
+
+
+def retry_after(wait):
+    """Значение заголовка Retry-After: целое число секунд."""
+    return str(max(math.ceil(wait), 1))
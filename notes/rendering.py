@@ -0,0 +1,244 @@
+"""Markdown в тексте заметок и кеш готового HTML.
+
+Поддерживается безопасное подмножество Markdown без внешних
+зависимостей: заголовки, абзацы, списки, цитаты, блоки и фрагменты
+кода, горизонтальная линия, полужирный и курсив, ссылки. Весь текст
+пользователя экранируется, а теги создаёт только рендерер, поэтому
+HTML из заметки в страницу не попадает. Ссылки допускаются только
+http, https, mailto и относительные.
+
+Готовый HTML кешируется по SHA-256 текста и RENDERER_VERSION:
+в LRU процесса на NOTES_MARKDOWN_CACHE_SIZE записей и, если задан
+NOTES_MARKDOWN_CACHE_ALIAS, в общем кеше. При изменении рендерера
+версия увеличивается, и старые записи просто перестают находиться;
+общий кеш заранее заполняет команда prerender_notes.
+"""
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from html import escape, unescape
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.cache import caches
+
+RENDERER_VERSION = 1
+RENDER_KEY = 'notes:markdown:{version}:{digest}'
+SAFE_SCHEMES = ('', 'http', 'https', 'mailto')
+# Заголовки заметки - внутри страницы, где уже есть h2 и h3.
+HEADING_OFFSET = 3
+MAX_QUOTE_DEPTH = 5
+
+FENCE = re.compile(r'^\s*(```|~~~)')
+HEADING = re.compile(r'^(#{1,6})\s+(.*?)(?:\s+#+)?\s*$')
+RULE = re.compile(r'^\s*(?:-{3,}|\*{3,}|_{3,})\s*$')
+QUOTE = re.compile(r'^\s*>\s?(.*)$')
+LISTS = (
+    (re.compile(r'^\s*[-*+]\s+(.*)$'), 'ul'),
+    (re.compile(r'^\s*\d{1,9}[.)]\s+(.*)$'), 'ol'),
+)
+# Выделение и ссылки не содержат своих разделителей внутри, а длина
+# частей ссылки ограничена: каждый символ строки просматривается
+# ограниченное число раз, и время рендеринга линейно по длине текста.
+CODE_SPAN = re.compile(r'`([^`]+)`')
+LINK = re.compile(r'\[([^\[\]]{1,500})\]\(([^()\s]{1,2000})\)')
+STRONG = re.compile(
+    r'\*\*([^*\s](?:[^*]*[^*\s])?)\*\*|__([^_\s](?:[^_]*[^_\s])?)__'
+)
+EMPHASIS = re.compile(
+    r'\*([^*\s](?:[^*]*[^*\s])?)\*'
+    r'|(?<!\w)_([^_\s](?:[^_]*[^_\s])?)_(?!\w)'
+)
+PLACEHOLDER = re.compile('\x00(\\d+)\x00')
+
+
+def is_safe_url(url):
+    try:
+        scheme = urlsplit(unescape(url)).scheme
+    except ValueError:
+        return False
+    return scheme.lower() in SAFE_SCHEMES
+
+
+def render_emphasis(text):
+    text = STRONG.sub(
+        lambda match: f'<strong>{match.group(1) or match.group(2)}</strong>',
+        text,
+    )
+    return EMPHASIS.sub(
+        lambda match: f'<em>{match.group(1) or match.group(2)}</em>', text
+    )
+
+
+def render_text(text):
+    """Ссылки и выделение в тексте без фрагментов кода."""
+    links = []
+
+    def link(match):
+        label, url = match.groups()
+        if not is_safe_url(url):
+            return match.group(0)
+        links.append(
+            f'<a href="{escape(url)}" rel="nofollow noopener">'
+            f'{render_emphasis(escape(label))}</a>'
+        )
+        return f'\x00{len(links) - 1}\x00'
+
+    text = render_emphasis(escape(LINK.sub(link, text)))
+    return PLACEHOLDER.sub(lambda match: links[int(match.group(1))], text)
+
+
+def render_inline(text):
+    parts = CODE_SPAN.split(text)
+    return ''.join(
+        f'<code>{escape(part)}</code>' if index % 2 else render_text(part)
+        for index, part in enumerate(parts)
+    )
+
+
+def collect(lines, index, pattern):
+    """Содержимое строк подряд с index, подходящих под pattern."""
+    items = []
+    while index < len(lines):
+        match = pattern.match(lines[index])
+        if not match:
+            break
+        items.append(match.group(1))
+        index += 1
+    return items, index
+
+
+def render_fence(lines, index):
+    marker = FENCE.match(lines[index]).group(1)
+    code = []
+    index += 1
+    while index < len(lines) and not lines[index].lstrip().startswith(marker):
+        code.append(lines[index])
+        index += 1
+    html = '<pre><code>' + escape('\n'.join(code)) + '</code></pre>'
+    return html, index + 1
+
+
+def render_block(lines, index, depth):
+    """HTML блока со строки index и индекс строки после него.
+
+    None, если строка относится к абзацу.
+    """
+    line = lines[index]
+    if FENCE.match(line):
+        return render_fence(lines, index)
+    heading = HEADING.match(line)
+    if heading:
+        level = min(len(heading.group(1)) + HEADING_OFFSET, 6)
+        html = f'<h{level}>{render_inline(heading.group(2))}</h{level}>'
+        return html, index + 1
+    if RULE.match(line):
+        return '<hr>', index + 1
+    if depth < MAX_QUOTE_DEPTH and QUOTE.match(line):
+        quoted, index = collect(lines, index, QUOTE)
+        html = render_blocks(quoted, depth + 1)
+        return f'<blockquote>{html}</blockquote>', index
+    for pattern, tag in LISTS:
+        if pattern.match(line):
+            items, index = collect(lines, index, pattern)
+            html = ''.join(f'<li>{render_inline(item)}</li>' for item in items)
+            return f'<{tag}>{html}</{tag}>', index
+    return None
+
+
+def render_blocks(lines, depth=0):
+    blocks = []
+    paragraph = []
+
+    def end_paragraph():
+        if paragraph:
+            # Переводы строк внутри абзаца сохраняются, как в тексте.
+            blocks.append('<p>' + '<br>\n'.join(paragraph) + '</p>')
+            paragraph.clear()
+
+    index = 0
+    while index < len(lines):
+        if not lines[index].strip():
+            end_paragraph()
+            index += 1
+            continue
+        block = render_block(lines, index, depth)
+        if block is None:
+            paragraph.append(render_inline(lines[index].strip()))
+            index += 1
+            continue
+        end_paragraph()
+        html, index = block
+        blocks.append(html)
+    end_paragraph()
+    return '\n'.join(blocks)
+
+
+def render_markdown(text):
+    """HTML из Markdown-текста заметки, безопасный для вывода."""
+    text = text.replace('\r\n', '\n').replace('\r', '\n')
+    # \x00 отмечает в рендерере места ссылок.
+    return render_blocks(text.replace('\x00', '\ufffd').split('\n'))
+
+
+class LRUCache:
+    """Кеш процесса, вытесняющий давно не использованные записи."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.data = OrderedDict()
+
+    def get(self, key):
+        with self.lock:
+            value = self.data.get(key)
+            if value is not None:
+                self.data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self.lock:
+            self.data[key] = value
+            self.data.move_to_end(key)
+            while len(self.data) > settings.NOTES_MARKDOWN_CACHE_SIZE:
+                self.data.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.data.clear()
+
+
+LOCAL_CACHE = LRUCache()
+
+
+def render_key(text):
+    digest = hashlib.sha256(text.encode()).hexdigest()
+    return RENDER_KEY.format(version=RENDERER_VERSION, digest=digest)
+
+
+def get_shared_cache():
+    """Общий кеш готового HTML или None, если он не настроен."""
+    alias = settings.NOTES_MARKDOWN_CACHE_ALIAS
+    return caches[alias] if alias else None
+
+
+def render(text):
+    """HTML текста заметки из кеша процесса, общего кеша или рендерера."""
+    key = render_key(text)
+    html = LOCAL_CACHE.get(key)
+    if html is not None:
+        return html
+    shared = get_shared_cache()
+    if shared is not None:
+        html = shared.get(key)
+    if html is None:
+        html = render_markdown(text)
+        if shared is not None:
+            shared.set(key, html, settings.NOTES_MARKDOWN_CACHE_TIMEOUT)
+    LOCAL_CACHE.set(key, html)
+    return html
+
+
+def render_batch(items):
+    """Пары (ключ, HTML) для пар (ключ, текст), для пула процессов."""
+    return [(key, render_markdown(text)) for key, text in items]
@@ -0,0 +1,81 @@
+"""Чтение заметок с реплик базы данных.
+
+Реплики - псевдонимы из DATABASES, перечисленные в NOTES_READ_REPLICAS.
+ReplicaRouter отправляет чтение моделей приложения notes (но не
+пользователей и сессий) на случайную реплику только внутри
+use_replicas(): так помечены безопасные запросы к списку, странице
+и поиску заметок и к API (NoteBase.read_from_replicas). Формы изменения
+и всё остальное, включая любую запись, идут в основную базу.
+
+Реплика может отставать от основной базы, поэтому после изменяющего
+запроса клиент получает cookie PIN_COOKIE на NOTES_PRIMARY_PIN_SECONDS
+секунд, и пока она есть, его чтение тоже идёт в основную базу:
+пользователь сразу видит свои изменения.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+PIN_COOKIE = 'notes_primary'
+REPLICA_APP_LABEL = 'notes'
+
+replicas_allowed = ContextVar('notes_replicas_allowed', default=False)
+
+
+@contextmanager
+def use_replicas():
+    """Разрешает чтение с реплик в текущем контексте."""
+    token = replicas_allowed.set(True)
+    try:
+        yield
+    finally:
+        replicas_allowed.reset(token)
+
+
+def is_pinned(request):
+    return PIN_COOKIE in request.COOKIES
+
+
+def pin_to_primary(response):
+    """Закрепляет клиента за основной базой после записи."""
+    response.set_cookie(
+        PIN_COOKIE, '1',
+        max_age=settings.NOTES_PRIMARY_PIN_SECONDS,
+        httponly=True,
+        samesite='Lax',
+    )
+    return response
+
+
+class ReplicaRouter:
+    """Чтение с реплик внутри use_replicas(), запись в основную базу."""
+
+    def db_for_read(self, model, **hints):
+        replicas = settings.NOTES_READ_REPLICAS
+        # Пользователи и сессии - только из основной базы: на отстающей
+        # реплике нового пользователя или сессии ещё нет.
+        if (
+            replicas and replicas_allowed.get()
+            and model._meta.app_label == REPLICA_APP_LABEL
+        ):
+            return random.choice(replicas)
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        # Объект, прочитанный с реплики, сохраняется в основную базу.
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.NOTES_READ_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Схема реплик копируется с основной базы.
+        if db in settings.NOTES_READ_REPLICAS:
+            return False
+        return None
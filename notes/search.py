@@ -0,0 +1,194 @@
+"""Полнотекстовый поиск по заметкам на SQLite FTS5.
+
+Таблица ``notes_note_fts`` хранит заголовок, несжатый текст и автора
+заметок (rowid = id). Поиск по заметкам пользователя ограничивает
+выборку столбцом author внутри самого FTS5, и bm25 считается только
+для заметок этого пользователя.
+
+Индекс поддерживают триггеры на чистом SQL, поэтому он актуален
+и после записи из других программ, bulk_create, update и удаления.
+Сжатый текст (notes.fields) триггеры распаковать не могут и записывают
+пустую строку, а настоящий текст дописывает index_texts при сохранении
+заметки через ORM.
+На других СУБД поиск выполняется обычным icontains.
+"""
+from django.db import connection, connections, transaction
+from django.db.models import Q
+
+from .fields import decompress, stored_as_is
+
+FTS_TABLE = 'notes_note_fts'
+REBUILD_BATCH_SIZE = 1000
+
+# Значение с маркером \x01 в начале хранится сжатым или экранированным.
+INDEXED_TEXT = "CASE WHEN substr({0}, 1, 1) = char(1) THEN '' ELSE {0} END"
+
+CREATE_SQL = (
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, text, author,
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    # Автор не влияет на релевантность.
+    f"""
+    INSERT INTO {FTS_TABLE}({FTS_TABLE}, rank)
+    VALUES ('rank', 'bm25(1.0, 1.0, 0.0)')
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert
+    AFTER INSERT ON notes_note BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, text, author)
+        VALUES (
+            new.id, new.title, {INDEXED_TEXT.format('new.text')},
+            new.author_id
+        );
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete
+    AFTER DELETE ON notes_note BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.id;
+    END
+    """,
+    # Заголовок и текст обновляются отдельно: UPDATE только заголовка
+    # не должен стирать из индекса текст, дописанный index_texts.
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update_title
+    AFTER UPDATE OF title ON notes_note BEGIN
+        UPDATE {FTS_TABLE} SET title = new.title WHERE rowid = new.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update_text
+    AFTER UPDATE OF text ON notes_note BEGIN
+        UPDATE {FTS_TABLE} SET text = {INDEXED_TEXT.format('new.text')}
+        WHERE rowid = new.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update_author
+    AFTER UPDATE OF author_id ON notes_note BEGIN
+        UPDATE {FTS_TABLE} SET author = new.author_id WHERE rowid = new.id;
+    END
+    """,
+)
+
+DROP_SQL = (
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_insert',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_delete',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_update_title',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_update_text',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_update_author',
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+)
+
+
+def is_supported(using=connection):
+    return using.vendor == 'sqlite'
+
+
+def install(schema_editor):
+    """Создаёт индекс и триггеры и заполняет индекс."""
+    if not is_supported(schema_editor.connection):
+        return
+    for sql in CREATE_SQL:
+        schema_editor.execute(sql)
+    rebuild_index(schema_editor.connection)
+
+
+def uninstall(schema_editor):
+    if not is_supported(schema_editor.connection):
+        return
+    for sql in DROP_SQL:
+        schema_editor.execute(sql)
+
+
+def rebuild_index(using=connection):
+    """Перестраивает индекс целиком, распаковывая тексты в Python.
+
+    Перестройка идёт в одной транзакции: поиск до её конца видит
+    старый индекс, а запись заметок ждёт, а не попадает в середину.
+    """
+    last_id = 0
+    with transaction.atomic(using=using.alias), using.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        while True:
+            cursor.execute(
+                'SELECT id, title, text, author_id FROM notes_note '
+                'WHERE id > %s ORDER BY id LIMIT %s',
+                [last_id, REBUILD_BATCH_SIZE],
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                return
+            cursor.executemany(
+                f'INSERT INTO {FTS_TABLE}(rowid, title, text, author) '
+                'VALUES (%s, %s, %s, %s)',
+                [
+                    (note_id, title, decompress(text), author_id)
+                    for note_id, title, text, author_id in rows
+                ],
+            )
+            last_id = rows[-1][0]
+
+
+def index_texts(notes, using='default'):
+    """Записывает в индекс тексты заметок, которые хранятся сжатыми.
+
+    Тексты, которые хранятся как есть, уже записали триггеры.
+    """
+    rows = [
+        (note.text, note.pk) for note in notes
+        if not stored_as_is(note.text)
+    ]
+    if not rows or not is_supported(connections[using]):
+        return
+    with connections[using].cursor() as cursor:
+        cursor.executemany(
+            f'UPDATE {FTS_TABLE} SET text = %s WHERE rowid = %s', rows
+        )
+
+
+def make_match_query(query, author_id=None):
+    """Запрос FTS5 из пользовательской строки.
+
+    Каждое слово берётся в кавычки, поэтому синтаксис FTS5
+    в пользовательском вводе не интерпретируется; последнее слово
+    ищется по префиксу. Слова ищутся только в заголовке и тексте,
+    с author_id - только среди заметок этого автора.
+    """
+    words = ['"{}"'.format(word.replace('"', '""')) for word in query.split()]
+    if not words:
+        return ''
+    words[-1] += '*'
+    match = '{title text}: (' + ' '.join(words) + ')'
+    if author_id is not None:
+        match = f'author: "{int(author_id)}" AND {match}'
+    return match
+
+
+def search(queryset, query, author_id=None):
+    """Заметки из queryset, подходящие под запрос, по убыванию bm25.
+
+    author_id ограничивает поиск заметками автора в самом индексе;
+    queryset при этом всё равно должен фильтровать по автору.
+    """
+    match = make_match_query(query, author_id)
+    if not match:
+        return queryset.none()
+    if not is_supported(connections[queryset.db]):
+        return queryset.filter(
+            Q(title__icontains=query) | Q(text__icontains=query)
+        )
+    # Сортировка по скрытому столбцу rank (это bm25) выполняется
+    # самим FTS5, без временного B-дерева.
+    return queryset.extra(
+        tables=[FTS_TABLE],
+        where=[
+            f'{FTS_TABLE}.rowid = notes_note.id',
+            f'{FTS_TABLE} MATCH %s',
+        ],
+        params=[match],
+        order_by=[f'{FTS_TABLE}.rank'],
+    )
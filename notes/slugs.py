@@ -0,0 +1,76 @@
+"""Генерация уникальных slug заметок.
+
+Уникальность обеспечивает ограничение UNIQUE в базе данных: запись
+сразу выполняется с подходящим slug, а при конфликте повторяется
+с суффиксом ``-2``, ``-3`` и т.д. Отдельный запрос на проверку
+существования slug не нужен, и параллельные записи не приводят
+к ошибке.
+"""
+from functools import lru_cache
+from uuid import uuid4
+
+from django.conf import settings
+from pytils.translit import slugify
+
+DEFAULT_SLUG = 'note'
+RANDOM_ATTEMPTS = 3
+
+
+@lru_cache(maxsize=settings.NOTES_SLUG_CACHE_SIZE)
+def make_slug(title, max_length):
+    """Транслитерирует заголовок в slug, результат запоминается."""
+    return slugify(title)[:max_length] or DEFAULT_SLUG
+
+
+def with_suffix(slug, suffix, max_length):
+    suffix = f'-{suffix}'
+    return slug[:max_length - len(suffix)] + suffix
+
+
+def slug_candidates(slug, max_length):
+    """Варианты slug в порядке перебора при конфликтах."""
+    yield slug
+    for number in range(2, settings.NOTES_SLUG_ATTEMPTS + 1):
+        yield with_suffix(slug, number, max_length)
+    # Длинная серия одинаковых заголовков: случайный суффикс.
+    for _ in range(RANDOM_ATTEMPTS):
+        yield with_suffix(slug, uuid4().hex[:8], max_length)
+
+
+def is_slug_conflict(error):
+    """Ошибка IntegrityError вызвана неуникальным slug."""
+    return 'slug' in str(error)
+
+
+def resolve_slugs(queryset, slugs, max_length):
+    """Уникальные slug для пачки заметок за несколько запросов.
+
+    На каждом шаге одним запросом проверяются текущие варианты всех
+    ещё не разрешённых slug, занятые заменяются следующими вариантами
+    из slug_candidates. Обычно хватает одного-двух запросов на пачку.
+    Повторы внутри пачки тоже разрешаются: выигрывает первый.
+    """
+    candidates = {
+        index: slug_candidates(slug, max_length)
+        for index, slug in enumerate(slugs)
+    }
+    current = {index: next(options) for index, options in candidates.items()}
+    resolved = [None] * len(slugs)
+    taken = set()
+    while current:
+        existing = set(queryset.filter(
+            slug__in=set(current.values())
+        ).values_list('slug', flat=True))
+        for index, slug in sorted(current.items()):
+            if slug in existing or slug in taken:
+                try:
+                    current[index] = next(candidates[index])
+                except StopIteration:
+                    raise ValueError(
+                        f'Не удалось подобрать уникальный slug: {slugs[index]}'
+                    )
+            else:
+                taken.add(slug)
+                resolved[index] = slug
+                del current[index]
+    return resolved
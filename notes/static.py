@@ -0,0 +1,162 @@
+"""Статические файлы с хешами в именах, сжатием и долгим кешированием.
+
+Сборка: ``python manage.py collectstatic``. CompressedManifestStorage
+сохраняет файлы под именами с хешем содержимого (``yanote.3f2a1c.css``)
+и рядом кладёт сжатые копии ``.gz`` и, если установлен пакет brotli,
+``.br``. StaticFilesMiddleware отдаёт файлы из STATIC_ROOT: сжатую
+копию по Accept-Encoding, а файлы с хешем - с заголовком
+``Cache-Control: immutable`` на год, так что повторный визит
+не скачивает их и не проверяет их актуальность.
+
+Middleware работает и в синхронной, и в асинхронной цепочке: под ASGI
+чтение файла выполняется в потоке, а остальные запросы передаются
+дальше без переключения в синхронный режим.
+"""
+import asyncio
+import gzip
+import mimetypes
+from pathlib import Path
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.staticfiles.storage import (
+    ManifestStaticFilesStorage, staticfiles_storage
+)
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import FileResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = {
+    '.css', '.js', '.json', '.map', '.svg', '.txt', '.html', '.xml',
+}
+IMMUTABLE_CACHE = 'public, max-age=31536000, immutable'
+
+
+def compress_file(path):
+    """Пишет сжатые копии файла, если они меньше исходного."""
+    data = path.read_bytes()
+    encoders = {'.gz': lambda data: gzip.compress(data, 9, mtime=0)}
+    if brotli is not None:
+        encoders['.br'] = brotli.compress
+    for suffix, encode in encoders.items():
+        compressed = encode(data)
+        if len(compressed) < len(data):
+            Path(f'{path}{suffix}').write_bytes(compressed)
+
+
+class CompressedManifestStorage(ManifestStaticFilesStorage):
+    """Манифест с хешами имён и сжатые копии файлов."""
+
+    def stored_name(self, name):
+        # До первого collectstatic (разработка, тесты) манифеста нет,
+        # и шаблоны ссылаются на файлы без хеша.
+        if not self.hashed_files:
+            return name
+        return super().stored_name(name)
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        for name in set(self.hashed_files.values()):
+            if Path(name).suffix in COMPRESSIBLE_EXTENSIONS:
+                compress_file(Path(self.path(name)))
+
+
+class StaticFilesMiddleware:
+    """Отдаёт собранные статические файлы из STATIC_ROOT."""
+
+    encodings = (('br', '.br'), ('gzip', '.gz'))
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.NOTES_SERVE_STATIC or not settings.STATIC_ROOT:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.is_async = asyncio.iscoroutinefunction(get_response)
+        if self.is_async:
+            # Так Django узнаёт, что экземпляр вызывается как корутина.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+        self.root = Path(settings.STATIC_ROOT).resolve()
+        self.prefix = settings.STATIC_URL
+        self.immutable = None
+
+    def static_name(self, request):
+        """Имя файла внутри STATIC_ROOT или None для остальных запросов."""
+        if (
+            request.method in ('GET', 'HEAD')
+            and request.path_info.startswith(self.prefix)
+        ):
+            return request.path_info[len(self.prefix):]
+        return None
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        name = self.static_name(request)
+        if name is not None:
+            response = self.serve(request, name)
+            if response is not None:
+                return response
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        name = self.static_name(request)
+        if name is not None:
+            response = await sync_to_async(
+                self.serve, thread_sensitive=False
+            )(request, name)
+            if response is not None:
+                return response
+        return await self.get_response(request)
+
+    def is_immutable(self, name):
+        """Имя файла с хешем из манифеста."""
+        if self.immutable is None:
+            hashed_files = getattr(staticfiles_storage, 'hashed_files', {})
+            self.immutable = frozenset(hashed_files.values())
+        return name in self.immutable
+
+    def find(self, name):
+        path = (self.root / name).resolve()
+        if self.root not in path.parents or not path.is_file():
+            return None
+        return path
+
+    def serve(self, request, name):
+        path = self.find(name)
+        if path is None:
+            return None
+        stat = path.stat()
+        response = get_conditional_response(
+            request, last_modified=int(stat.st_mtime)
+        )
+        if response is None:
+            accepted = request.META.get('HTTP_ACCEPT_ENCODING', '')
+            encoding = None
+            for candidate, suffix in self.encodings:
+                compressed = Path(f'{path}{suffix}')
+                if candidate in accepted and compressed.is_file():
+                    path, encoding = compressed, candidate
+                    break
+            content_type, _ = mimetypes.guess_type(name)
+            response = FileResponse(
+                path.open('rb'),
+                content_type=content_type or 'application/octet-stream',
+            )
+            if encoding:
+                response['Content-Encoding'] = encoding
+        response['Last-Modified'] = http_date(stat.st_mtime)
+        response['Vary'] = 'Accept-Encoding'
+        response['Cache-Control'] = (
+            IMMUTABLE_CACHE if self.is_immutable(name)
+            else f'public, max-age={settings.NOTES_STATIC_MAX_AGE}'
+        )
+        return response
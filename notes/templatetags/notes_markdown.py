@@ -0,0 +1,12 @@
+from django import template
+from django.utils.safestring import mark_safe
+
+from notes.rendering import render
+
+register = template.Library()
+
+
+@register.filter
+def markdown(text):
+    """Текст заметки в HTML: Markdown, экранированный рендерером."""
+    return mark_safe(render(text))
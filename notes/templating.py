@@ -0,0 +1,49 @@
+"""Прогрев кеша скомпилированных шаблонов.
+
+Шаблоны загружает django.template.loaders.cached.Loader: каждый
+шаблон компилируется один раз на процесс. warm_templates компилирует
+все шаблоны при запуске процесса, чтобы первые запросы после
+развёртывания не платили за разбор шаблонов.
+"""
+import logging
+from pathlib import Path
+
+from django.template import TemplateDoesNotExist, TemplateSyntaxError, engines
+from django.template.backends.django import DjangoTemplates
+
+logger = logging.getLogger(__name__)
+
+
+def template_dirs(engine):
+    """Каталоги, из которых загрузчики движка берут шаблоны."""
+    for loader in engine.template_loaders:
+        for inner in getattr(loader, 'loaders', (loader,)):
+            yield from inner.get_dirs()
+
+
+def template_names(engine):
+    """Имена всех HTML-шаблонов в каталогах шаблонов движка."""
+    names = set()
+    for directory in template_dirs(engine):
+        directory = Path(directory)
+        names.update(
+            path.relative_to(directory).as_posix()
+            for path in directory.rglob('*.html')
+        )
+    return sorted(names)
+
+
+def warm_templates():
+    """Компилирует шаблоны всех движков Django, возвращает их число."""
+    count = 0
+    for backend in engines.all():
+        if not isinstance(backend, DjangoTemplates):
+            continue
+        for name in template_names(backend.engine):
+            try:
+                backend.engine.get_template(name)
+            except (TemplateDoesNotExist, TemplateSyntaxError) as error:
+                logger.debug('Шаблон %s не прогрет: %s', name, error)
+            else:
+                count += 1
+    return count
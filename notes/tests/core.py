@@ -1,4 +1,6 @@
 from django.contrib.auth import get_user_model
+from django.conf import settings
+from django.core.cache import caches
 from django.test import Client, TestCase
 
 from notes.models import Note
@@ -49,3 +51,7 @@ class CoreTestCase(TestCase):
             slug=NOTE_DATA['slug'],
             author=cls.author,
         )
+
+    def setUp(self):
+        for alias in settings.CACHES:
+            caches[alias].clear()
@@ -0,0 +1,40 @@
+"""Токены JSON API.
+
+Клиенты синхронизации не хранят cookie сессии и CSRF-токен, поэтому
+API принимает заголовок ``Authorization: Token <токен>``. Токен - id
+пользователя, подписанный SECRET_KEY с солью из хеша его пароля:
+хранить токены в базе не нужно, смена пароля отзывает все токены
+пользователя, а заблокированный пользователь не проходит проверку
+CachedModelBackend. Токен выдаёт команда api_token.
+"""
+from django.core import signing
+
+from .backends import CachedModelBackend
+
+TOKEN_SALT = 'notes.api.token'
+
+
+def get_signer(user):
+    return signing.Signer(
+        salt=f'{TOKEN_SALT}:{user.get_session_auth_hash()}'
+    )
+
+
+def make_token(user):
+    return get_signer(user).sign(str(user.pk))
+
+
+def get_token_user(token):
+    """Пользователь по токену или None, если токен неверный."""
+    user_id, _, _ = token.partition(':')
+    try:
+        user = CachedModelBackend().get_user(int(user_id))
+    except ValueError:
+        return None
+    if user is None:
+        return None
+    try:
+        get_signer(user).unsign(token)
+    except signing.BadSignature:
+        return None
+    return user
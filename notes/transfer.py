@@ -0,0 +1,160 @@
+"""Потоковый импорт и экспорт заметок в JSON Lines и CSV.
+
+Строки читаются и пишутся по одной, а в базу попадают пачками
+через bulk_create в отдельных транзакциях, поэтому расход памяти
+не зависит от размера файла.
+"""
+import csv
+import json
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.core.validators import validate_slug
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+
+from .cache import invalidate
+from .models import Note, allocate_revisions
+from .slugs import is_slug_conflict, make_slug, resolve_slugs
+
+FORMATS = ('jsonl', 'csv')
+FIELDS = ('title', 'text', 'slug', 'author')
+CHUNK_ATTEMPTS = 3
+
+
+def guess_format(path, default='jsonl'):
+    for fmt in FORMATS:
+        if path.endswith(f'.{fmt}'):
+            return fmt
+    return default
+
+
+def read_rows(file, fmt):
+    """Словари заметок из открытого файла, по одному."""
+    if fmt == 'csv':
+        yield from csv.DictReader(file)
+        return
+    for line in file:
+        if line.strip():
+            try:
+                row = json.loads(line)
+            except ValueError:
+                # Испорченная строка пропускается, как некорректная заметка.
+                row = None
+            yield row
+
+
+def write_rows(file, fmt, rows):
+    """Записывает словари заметок в открытый файл, возвращает их число."""
+    count = 0
+    if fmt == 'csv':
+        writer = csv.DictWriter(file, fieldnames=FIELDS)
+        writer.writeheader()
+        for count, row in enumerate(rows, 1):
+            writer.writerow(row)
+        return count
+    for count, row in enumerate(rows, 1):
+        file.write(json.dumps(row, ensure_ascii=False) + '\n')
+    return count
+
+
+def export_rows(queryset, chunk_size):
+    """Заметки из queryset в виде словарей для записи в файл."""
+    rows = queryset.order_by('id').values_list(
+        'title', 'text', 'slug', 'author__username'
+    )
+    for row in rows.iterator(chunk_size=chunk_size):
+        yield dict(zip(FIELDS, row))
+
+
+class Importer:
+    """Импорт заметок пачками по chunk_size строк."""
+
+    def __init__(self, default_author=None, chunk_size=1000):
+        self.default_author = default_author
+        self.chunk_size = chunk_size
+        self.authors = {}
+        self.imported = 0
+        self.skipped = 0
+        self.renamed = 0
+
+    def get_author(self, username):
+        if not username:
+            return self.default_author
+        if username not in self.authors:
+            self.authors[username] = get_user_model().objects.filter(
+                username=username
+            ).first()
+        return self.authors[username]
+
+    def build_note(self, row):
+        """Заметка из строки файла или None для некорректной строки."""
+        if not isinstance(row, dict):
+            return None
+        values = [row.get(field) or '' for field in FIELDS]
+        if not all(isinstance(value, str) for value in values):
+            return None
+        title, text, slug, username = values
+        author = self.get_author(username)
+        title = title.strip()
+        if author is None or not title or not text:
+            return None
+        note = Note(title=title[:100], text=text, author=author)
+        note.requested_slug = slug.strip()
+        return note
+
+    def save_chunk(self, notes):
+        """Сохраняет пачку в одной транзакции.
+
+        При гонке с параллельной записью slug разрешаются заново.
+        """
+        max_length = Note._meta.get_field('slug').max_length
+        requested = []
+        for note in notes:
+            slug = note.requested_slug
+            try:
+                validate_slug(slug)
+            except ValidationError:
+                slug = make_slug(note.title, max_length)
+            requested.append(slug[:max_length])
+        for attempt in range(1, CHUNK_ATTEMPTS + 1):
+            slugs = resolve_slugs(Note.objects.all(), requested, max_length)
+            for note, slug in zip(notes, slugs):
+                note.slug = slug
+            try:
+                with transaction.atomic():
+                    revisions = allocate_revisions(len(notes))
+                    for note, revision in zip(notes, revisions):
+                        note.revision = revision
+                    Note.objects.bulk_create(notes)
+                break
+            except IntegrityError as error:
+                if not is_slug_conflict(error) or attempt == CHUNK_ATTEMPTS:
+                    raise
+        self.renamed += sum(
+            note.slug != note.requested_slug
+            for note in notes if note.requested_slug
+        )
+        self.imported += len(notes)
+
+    def run(self, rows):
+        """Импортирует строки, возвращает число импортированных заметок."""
+        rows = iter(rows)
+        author_ids = set()
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                break
+            notes = []
+            for row in chunk:
+                note = self.build_note(row)
+                if note is None:
+                    self.skipped += 1
+                else:
+                    notes.append(note)
+            if notes:
+                self.save_chunk(notes)
+                author_ids.update(note.author_id for note in notes)
+        if author_ids:
+            invalidate(*author_ids)
+        return self.imported
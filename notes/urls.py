@@ -1,6 +1,6 @@
 from django.urls import path
 
-from notes import views
+from notes import api, instrumentation, views
 
 app_name = 'notes'
 
@@ -11,5 +11,21 @@ urlpatterns = [
     path('note/<slug:slug>/', views.NoteDetail.as_view(), name='detail'),
     path('delete/<slug:slug>/', views.NoteDelete.as_view(), name='delete'),
     path('notes/', views.NotesList.as_view(), name='list'),
+    path('search/', views.NoteSearch.as_view(), name='search'),
+    path(
+        'bulk-delete/',
+        views.NoteBulkDelete.as_view(),
+        name='bulk-delete',
+    ),
+    path('bulk-edit/', views.NoteBulkEdit.as_view(), name='bulk-edit'),
+    path('jobs/<int:pk>/', views.JobDetail.as_view(), name='job'),
     path('done/', views.NoteSuccess.as_view(), name='success'),
+    path('metrics/', instrumentation.metrics_view, name='metrics'),
+    path('api/notes/', api.NoteListApi.as_view(), name='api-list'),
+    path(
+        'api/notes/<slug:slug>/',
+        api.NoteDetailApi.as_view(),
+        name='api-detail',
+    ),
+    path('api/changes/', api.NoteChangesApi.as_view(), name='api-changes'),
 ]
@@ -1,9 +1,30 @@
+from http import HTTPStatus
+
+from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.db import IntegrityError
+from django.http import (
+    HttpResponse, HttpResponseRedirect, StreamingHttpResponse
+)
+from django.template.loader import get_template, render_to_string
+from django.template.response import SimpleTemplateResponse
+from django.shortcuts import redirect
 from django.urls import reverse_lazy
 from django.views import generic
 
-from .forms import NoteForm
-from .models import Note
+from .cache import get_page, page_key, set_page
+from .db import retry_on_locked
+from .forms import NoteBulkFormSet, NoteForm
+from .jobs import enqueue
+from .models import Job, Note
+from .pagination import KeysetPaginator
+from .ratelimit import retry_after, take_token
+from .routers import is_pinned, pin_to_primary, use_replicas
+from .search import search
+from .slugs import is_slug_conflict
+
+STREAM_MARKER = '<!-- notes-stream -->'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
 
 
 class Home(generic.TemplateView):
@@ -20,28 +41,91 @@ class NoteBase(LoginRequiredMixin):
     """Базовый класс для остальных CBV."""
     model = Note
     success_url = reverse_lazy('notes:success')
+    # Только страницы чтения: формы изменения открываются перед записью
+    # и должны показывать актуальные данные основной базы.
+    read_from_replicas = False
+
+    def dispatch(self, request, *args, **kwargs):
+        """Чтение идёт с реплик, если клиент не закреплён за основной базой.
+
+        Изменяющие запросы ограничены по частоте, повторяются при
+        занятой базе SQLite и закрепляют клиента за основной базой.
+        """
+        if request.method in SAFE_METHODS:
+            if not self.read_from_replicas or is_pinned(request):
+                return super().dispatch(request, *args, **kwargs)
+            with use_replicas():
+                response = super().dispatch(request, *args, **kwargs)
+                # Ленивые queryset контекста выполняются при рендеринге,
+                # он должен пройти внутри use_replicas().
+                if isinstance(response, SimpleTemplateResponse):
+                    response.render()
+                return response
+        if request.user.is_authenticated:
+            wait = take_token(request.user.pk)
+            if wait:
+                return self.rate_limited(wait)
+        response = retry_on_locked(super().dispatch)(request, *args, **kwargs)
+        return pin_to_primary(response)
 
     def get_queryset(self):
         """Пользователь может работать только со своими заметками."""
         return self.model.objects.filter(author=self.request.user)
 
+    def rate_limited(self, wait):
+        response = HttpResponse(
+            'Слишком много изменений, повторите позже.',
+            content_type='text/plain; charset=utf-8',
+            status=HTTPStatus.TOO_MANY_REQUESTS,
+        )
+        response['Retry-After'] = retry_after(wait)
+        return response
 
-class NoteCreate(NoteBase, generic.CreateView):
-    """Добавление заметки."""
+
+class CachedPageMixin:
+    """Кеширует готовую страницу до изменения заметок пользователя."""
+
+    def get(self, request, *args, **kwargs):
+        key = page_key(request.user.pk, request.get_full_path())
+        content = get_page(key)
+        if content is not None:
+            return HttpResponse(content)
+        response = super().get(request, *args, **kwargs)
+        if response.status_code == HTTPStatus.OK and not response.streaming:
+            response.add_post_render_callback(
+                lambda rendered: set_page(key, rendered.content)
+            )
+        return response
+
+
+class NoteFormMixin:
+    """Сохранение заметки из формы с обработкой конфликта slug."""
     template_name = 'notes/form.html'
     form_class = NoteForm
 
     def form_valid(self, form):
-        new_note = form.save(commit=False)
-        new_note.author = self.request.user
-        new_note.save()
+        if form.is_unchanged():
+            self.object = form.instance
+            return HttpResponseRedirect(self.get_success_url())
+        try:
+            return super().form_valid(form)
+        except IntegrityError as error:
+            if not is_slug_conflict(error):
+                raise
+            form.add_slug_conflict()
+            return self.form_invalid(form)
+
+
+class NoteCreate(NoteFormMixin, NoteBase, generic.CreateView):
+    """Добавление заметки."""
+
+    def form_valid(self, form):
+        form.instance.author = self.request.user
         return super().form_valid(form)
 
 
-class NoteUpdate(NoteBase, generic.UpdateView):
+class NoteUpdate(NoteFormMixin, NoteBase, generic.UpdateView):
     """Редактирование заметки."""
-    template_name = 'notes/form.html'
-    form_class = NoteForm
 
 
 class NoteDelete(NoteBase, generic.DeleteView):
@@ -49,11 +133,156 @@ class NoteDelete(NoteBase, generic.DeleteView):
     template_name = 'notes/delete.html'
 
 
-class NotesList(NoteBase, generic.ListView):
-    """Список всех заметок пользователя."""
+class NoteBulkDelete(NoteBase, generic.TemplateView):
+    """Удаление всех заметок пользователя фоновой задачей."""
+    template_name = 'notes/bulk_delete.html'
+
+    def get_context_data(self, **kwargs):
+        return super().get_context_data(
+            count=self.get_queryset().count(), **kwargs
+        )
+
+    def post(self, request):
+        job = enqueue('delete_notes', user=request.user)
+        return redirect('notes:job', pk=job.pk)
+
+
+class NoteBulkEdit(NoteBase, generic.TemplateView):
+    """Изменение нескольких заметок одним запросом.
+
+    Заметки выводятся страницами по NOTES_BULK_EDIT_SIZE. Изменённые
+    сохраняются вместе: slug проверяются одним запросом, запись -
+    одним bulk_update в одной транзакции.
+    """
+    template_name = 'notes/bulk_edit.html'
+    formset_class = NoteBulkFormSet
+
+    def posted_ids(self):
+        """Идентификаторы заметок из отправленных форм набора."""
+        prefix = self.formset_class.get_default_prefix()
+        return [
+            value for key, value in self.request.POST.items()
+            if key.startswith(f'{prefix}-') and key.endswith('-id')
+            and value.isdigit()
+        ]
+
+    def get_formset(self):
+        return self.formset_class(
+            self.request.POST,
+            queryset=self.get_queryset().filter(pk__in=self.posted_ids()),
+        )
+
+    def get(self, request):
+        paginator = KeysetPaginator(
+            self.get_queryset(), settings.NOTES_BULK_EDIT_SIZE
+        )
+        page = paginator.get_page(request.GET.get(paginator.cursor_kwarg))
+        return self.render_to_response(self.get_context_data(
+            formset=self.formset_class(queryset=page.object_list),
+            page_obj=page,
+        ))
+
+    def post(self, request):
+        formset = self.get_formset()
+        if formset.is_valid():
+            try:
+                formset.save()
+            except IntegrityError as error:
+                if not is_slug_conflict(error):
+                    raise
+                # Slug заняли параллельно: повторная проверка
+                # покажет, какой именно.
+                formset = self.get_formset()
+                formset.is_valid()
+            else:
+                return redirect(self.success_url)
+        return self.render_to_response(
+            self.get_context_data(formset=formset)
+        )
+
+
+class JobDetail(LoginRequiredMixin, generic.DetailView):
+    """Состояние фоновой задачи пользователя."""
+    template_name = 'notes/job.html'
+
+    def get_queryset(self):
+        return Job.objects.filter(user=self.request.user)
+
+
+class NotesList(CachedPageMixin, NoteBase, generic.ListView):
+    """Список заметок пользователя с постраничным выводом по курсору.
+
+    Параметр ``after`` - id последней заметки предыдущей страницы,
+    ``per_page`` - размер страницы (не больше NOTES_MAX_PAGE_SIZE).
+    С параметром ``stream=1`` заметки отдаются потоком по мере чтения
+    из курсора базы данных, без пагинации.
+    """
+    read_from_replicas = True
     template_name = 'notes/list.html'
+    item_template_name = 'includes/note_item.html'
+    paginate_by = settings.NOTES_PAGE_SIZE
+    page_kwarg = 'after'
+
+    def get_queryset(self):
+        return super().get_queryset().for_list()
+
+    def get_paginate_by(self, queryset):
+        try:
+            per_page = int(self.request.GET['per_page'])
+        except (KeyError, ValueError):
+            return self.paginate_by
+        return min(max(per_page, 1), settings.NOTES_MAX_PAGE_SIZE)
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator = KeysetPaginator(
+            queryset, page_size, cursor_kwarg=self.page_kwarg
+        )
+        page = paginator.get_page(self.request.GET.get(self.page_kwarg))
+        return paginator, page, page.object_list, page.has_next()
 
+    def get(self, request, *args, **kwargs):
+        if request.GET.get('stream'):
+            return StreamingHttpResponse(self.stream())
+        return super().get(request, *args, **kwargs)
 
-class NoteDetail(NoteBase, generic.DetailView):
+    def stream(self):
+        """Отдаёт страницу частями: шапку, заметки по одной и подвал."""
+        page = render_to_string(
+            self.template_name,
+            {'streaming': True, 'stream_marker': STREAM_MARKER},
+            request=self.request,
+        )
+        head, tail = page.split(STREAM_MARKER, 1)
+        yield head
+        item_template = get_template(self.item_template_name)
+        queryset = self.get_queryset().order_by('id').iterator(
+            chunk_size=settings.NOTES_STREAM_CHUNK_SIZE
+        )
+        for note in queryset:
+            yield item_template.render({'note': note})
+        yield tail
+
+
+class NoteDetail(CachedPageMixin, NoteBase, generic.DetailView):
     """Заметка подробно."""
+    read_from_replicas = True
     template_name = 'notes/detail.html'
+
+
+class NoteSearch(NoteBase, generic.ListView):
+    """Полнотекстовый поиск по заметкам пользователя."""
+    read_from_replicas = True
+    template_name = 'notes/search.html'
+
+    def get_query(self):
+        return self.request.GET.get('q', '').strip()
+
+    def get_queryset(self):
+        notes = search(
+            super().get_queryset().for_list(), self.get_query(),
+            author_id=self.request.user.pk,
+        )
+        return notes[:settings.NOTES_PAGE_SIZE]
+
+    def get_context_data(self, **kwargs):
+        return super().get_context_data(query=self.get_query(), **kwargs)
@@ -9,8 +9,14 @@ https://docs.djangoproject.com/en/3.2/howto/deployment/asgi/
 
 import os
 
+from django.conf import settings
 from django.core.asgi import get_asgi_application
 
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanote.settings')
+from notes.templating import warm_templates
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanote.settings_asgi')
 
 application = get_asgi_application()
+
+if settings.NOTES_WARM_TEMPLATES:
+    warm_templates()
@@ -22,7 +22,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'notes.instrumentation.InstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'notes.static.StaticFilesMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -37,8 +39,15 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
-        'APP_DIRS': True,
         'OPTIONS': {
+            # Шаблоны компилируются один раз на процесс и прогреваются
+            # при запуске (notes.templating.warm_templates).
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -51,14 +60,60 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'yanote.wsgi.application'
 
+# Компилировать все шаблоны при запуске WSGI/ASGI-процесса.
+NOTES_WARM_TEMPLATES = True
+
 
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': 60,
+        'OPTIONS': {
+            # Сколько секунд ждать освобождения блокировки записи.
+            'timeout': 20,
+        },
     }
 }
 
+NOTES_SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+    'temp_store': 'MEMORY',
+}
+NOTES_SQLITE_LOCK_RETRIES = 3
+NOTES_SQLITE_LOCK_RETRY_DELAY = 0.05
+
+DATABASE_ROUTERS = ['notes.routers.ReplicaRouter']
+
+# Псевдонимы реплик из DATABASES для чтения заметок
+# (см. yanote/settings_replicas.py).
+NOTES_READ_REPLICAS = []
+# Сколько секунд после записи читать из основной базы.
+NOTES_PRIMARY_PIN_SECONDS = 5
+
+
+# Новые пароли хэшируются первым хэшером списка. Хэши других
+# алгоритмов и с другими параметрами пересчитываются при входе.
+# Стоимость на ядро: python manage.py benchmark_hashers.
+PASSWORD_HASHERS = [
+    'notes.hashers.ScryptPasswordHasher',
+    'notes.hashers.Argon2PasswordHasher',
+    'notes.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+]
+# scrypt: память 128 * N * R * P байт (16 МБ) на хэш.
+NOTES_SCRYPT_N = 2 ** 14
+NOTES_SCRYPT_R = 8
+NOTES_SCRYPT_P = 1
+# Argon2: память в КБ, один поток на хэш.
+NOTES_ARGON2_TIME_COST = 2
+NOTES_ARGON2_MEMORY_COST = 64 * 1024
+NOTES_ARGON2_PARALLELISM = 1
+NOTES_PBKDF2_ITERATIONS = 260000
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -82,8 +137,92 @@ USE_TZ = True
 
 
 STATIC_URL = '/static/'
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+STATICFILES_DIRS = [BASE_DIR / 'static']
+# collectstatic сохраняет файлы с хешем в имени и сжатые копии,
+# их отдаёт notes.static.StaticFilesMiddleware.
+STATICFILES_STORAGE = 'notes.static.CompressedManifestStorage'
+NOTES_SERVE_STATIC = True
+# Кеширование файлов без хеша в имени, секунды.
+NOTES_STATIC_MAX_AGE = 60
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 LOGIN_URL = reverse_lazy('users:login')
 LOGIN_REDIRECT_URL = reverse_lazy('notes:home')
+
+NOTES_PAGE_SIZE = 100
+NOTES_MAX_PAGE_SIZE = 1000
+NOTES_STREAM_CHUNK_SIZE = 2000
+# Сколько заметок изменяется одним запросом notes:bulk-edit.
+NOTES_BULK_EDIT_SIZE = 50
+
+# Кеши сессий и заметок обязаны быть общими для рабочих процессов
+# (Memcached, Redis или файловый), иначе выход и смена пароля,
+# версии страниц и ограничение частоты действуют только в одном
+# процессе. 'default' - только для фрагментов шаблонов.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'sessions': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache' / 'sessions',
+    },
+    'notes': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache' / 'notes',
+    },
+}
+
+# Страницы, версии заметок пользователей и вёдра ограничения частоты.
+NOTES_CACHE_ALIAS = 'notes'
+NOTES_CACHE_TIMEOUT = 60 * 10
+
+# Сессии и пользователь сессии читаются из кеша, база - только
+# при промахе.
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+SESSION_CACHE_ALIAS = 'sessions'
+# ModelBackend оставлен, чтобы не разлогинить сессии, созданные до
+# CachedModelBackend: в сессии записан путь бэкенда входа.
+AUTHENTICATION_BACKENDS = [
+    'notes.backends.CachedModelBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+NOTES_USER_CACHE_TIMEOUT = 60 * 10
+
+# Тексты заметок длиннее порога в байтах хранятся сжатыми
+# ('zlib' или 'lzma'), None отключает сжатие.
+NOTES_COMPRESS_THRESHOLD = 8 * 1024
+NOTES_COMPRESS_ALGORITHM = 'zlib'
+
+# Готовый HTML из Markdown заметок: записей в LRU процесса и псевдоним
+# общего кеша (None - только кеш процесса), его заполняет prerender_notes.
+NOTES_MARKDOWN_CACHE_SIZE = 512
+NOTES_MARKDOWN_CACHE_ALIAS = None
+NOTES_MARKDOWN_CACHE_TIMEOUT = 60 * 60 * 24 * 30
+
+# Изменяющие запросы пользователя: до NOTES_RATE_LIMIT_BURST подряд,
+# дальше NOTES_RATE_LIMIT_RATE в секунду, None отключает ограничение.
+NOTES_RATE_LIMIT_RATE = 2.0
+NOTES_RATE_LIMIT_BURST = 30
+# Правка без изменений не записывается в базу.
+NOTES_SKIP_UNCHANGED_WRITES = True
+
+NOTES_SLUG_CACHE_SIZE = 4096
+NOTES_SLUG_ATTEMPTS = 20
+
+# До скольких строк админка считает заметки точно.
+NOTES_ADMIN_COUNT_LIMIT = 10000
+
+# Фоновые задачи (команда run_jobs).
+NOTES_JOB_CHUNK_SIZE = 500
+# Пауза между пачками, чтобы запросы пользователей успевали писать.
+NOTES_JOB_CHUNK_PAUSE = 0.01
+NOTES_JOB_POLL_INTERVAL = 1.0
+NOTES_JOB_STALE_SECONDS = 5 * 60
+
+# Метрики SQL-запросов и времени ответа по маршрутам.
+NOTES_INSTRUMENTATION = False
+NOTES_QUERY_BUDGETS = {}
+NOTES_QUERY_BUDGET_STRICT = False
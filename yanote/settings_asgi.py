@@ -0,0 +1,4 @@
+"""Настройки для запуска через ASGI с асинхронными представлениями."""
+from .settings import *  # noqa: F401,F403
+
+ROOT_URLCONF = 'yanote.urls_async'
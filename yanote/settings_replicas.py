@@ -0,0 +1,17 @@
+"""Настройки с локальными репликами для чтения заметок.
+
+Роль реплик играют копии основной базы SQLite, которые обновляет
+команда ``python manage.py sync_replicas``. В тестах реплики
+объявлены зеркалами тестовой основной базы.
+"""
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR, DATABASES
+
+NOTES_READ_REPLICAS = ['replica1', 'replica2']
+
+for alias in NOTES_READ_REPLICAS:
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'NAME': BASE_DIR / f'db.{alias}.sqlite3',
+        'TEST': {'MIRROR': 'default'},
+    }
@@ -0,0 +1,38 @@
+"""Облегчённые настройки для быстрого запуска рабочих процессов.
+
+Без админки, сообщений и staticfiles: эти приложения и их зависимости
+не импортируются при старте, как и notes.static, поэтому статику
+эти процессы не отдают. Шаблоны не прогреваются при запуске,
+а компилируются при первом использовании. Админку и статику
+обслуживают узлы с полными настройками yanote.settings.
+"""
+from .settings import *  # noqa: F401,F403
+from .settings import INSTALLED_APPS, MIDDLEWARE, TEMPLATES
+
+SLIM_EXCLUDED_APPS = (
+    'django.contrib.admin',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+)
+
+INSTALLED_APPS = [
+    app for app in INSTALLED_APPS if app not in SLIM_EXCLUDED_APPS
+]
+MIDDLEWARE = [
+    middleware for middleware in MIDDLEWARE
+    if not middleware.startswith('django.contrib.messages.')
+    and middleware != 'notes.static.StaticFilesMiddleware'
+]
+TEMPLATES = [{
+    **TEMPLATES[0],
+    'OPTIONS': {
+        **TEMPLATES[0]['OPTIONS'],
+        'context_processors': [
+            processor
+            for processor in TEMPLATES[0]['OPTIONS']['context_processors']
+            if not processor.startswith('django.contrib.messages.')
+        ],
+    },
+}]
+
+NOTES_WARM_TEMPLATES = False
@@ -0,0 +1,10 @@
+"""Маршруты проекта для ASGI: notes заменены асинхронной версией."""
+from django.urls import include, path
+
+from yanote import urls
+
+urlpatterns = [
+    path('', include('notes.async_urls'))
+    if getattr(pattern, 'namespace', None) == 'notes' else pattern
+    for pattern in urls.urlpatterns
+]